@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from .cache import CellsetCache
+from .cache import CellsetCache, CellsetView
 from .server import mcp
 from .runtime import get_cache, set_cache
 
-__all__ = ["mcp", "CellsetCache", "get_cache", "set_cache"]
+__all__ = ["mcp", "CellsetCache", "CellsetView", "get_cache", "set_cache"]
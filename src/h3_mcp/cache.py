@@ -1,27 +1,395 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from collections import OrderedDict
-from dataclasses import dataclass
+from collections.abc import Sequence
+from itertools import islice
+from dataclasses import asdict, dataclass, replace
+import functools
 from hashlib import sha256
-from typing import Callable, Iterable
+import heapq
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, TypeVar, cast, overload
+import sys
+import threading
 import time
 
+import numpy as np
+from numpy.typing import NDArray
+
+from .cell_arrays import (
+    cell_resolutions,
+    empty_indexes,
+    member_mask,
+    pack_cells,
+    try_pack_cells,
+    unpack_cells,
+)
+from .compaction import (
+    compact_indexes,
+    contains_mask,
+    descendant_at,
+    descendant_counts,
+    descendant_rank,
+    first_descendants,
+    iter_uncompacted,
+    uncompact_indexes,
+)
+
+if TYPE_CHECKING:
+    from .cellset_store import CellsetBackend
+
+
+# Each id scheme hashes a distinct tag first, so a packed cellset and a string cellset can
+# never share an id.
+_PACKED_ID_TAG = b"h3-u64\n"
+_STRING_ID_TAG = b"str\n"
+_HASH_CHUNK_SIZE = 1 << 16
+_MIN_COMPACT_CELLS = 4096
+
+T = TypeVar("T")
+
 
 def normalize_cells(cells: Iterable[str]) -> list[str]:
-    return sorted(set(cells))
+    cell_list = cells if isinstance(cells, list) else list(cells)
+    if _is_sorted_unique(cell_list):
+        return cell_list
+    return sorted(set(cell_list))
+
+
+def _is_sorted_unique(cells: list[str]) -> bool:
+    return all(a < b for a, b in zip(cells, islice(cells, 1, None)))
 
 
 def make_cellset_id(cells: Iterable[str]) -> str:
-    normalized = normalize_cells(cells)
-    digest = sha256("\n".join(normalized).encode("utf-8")).hexdigest()
-    return f"cellset_{digest}"
+    cell_list = cells if isinstance(cells, list) else list(cells)
+    packed = try_pack_cells(cell_list)
+    if packed is None:
+        return _sorted_cellset_id(normalize_cells(cell_list))
+    return _packed_cellset_id(packed)
+
+
+def view_cellset_id(view: CellsetView) -> str:
+    # Ids hash the expanded cells, so a compacted view shares the id of its plain form; it
+    # is hashed one chunk at a time rather than expanded whole.
+    if view.compact is not None:
+        return _packed_chunks_id(view.iter_packed())
+    if view.packed is None:
+        return _sorted_cellset_id(view.sorted_cells())
+    return _packed_cellset_id(view.packed)
+
+
+def _packed_cellset_id(packed: NDArray[np.uint64]) -> str:
+    return _packed_chunks_id([packed])
+
+
+def _packed_chunks_id(chunks: Iterable[NDArray[np.uint64]]) -> str:
+    # hashlib reads the little-endian index buffers in place; no strings are built.
+    digest = sha256(_PACKED_ID_TAG)
+    for chunk in chunks:
+        digest.update(np.ascontiguousarray(chunk, dtype="<u8").data)
+    return f"cellset_{digest.hexdigest()}"
+
+
+def _sorted_cellset_id(normalized: Sequence[str]) -> str:
+    digest = sha256(_STRING_ID_TAG)
+    for start in range(0, len(normalized), _HASH_CHUNK_SIZE):
+        if start:
+            digest.update(b"\n")
+        chunk = normalized[start : start + _HASH_CHUNK_SIZE]
+        digest.update("\n".join(chunk).encode("utf-8"))
+    return f"cellset_{digest.hexdigest()}"
+
+
+class CellsetView(Sequence[str]):
+    """Immutable, sorted view over a cellset."""
+
+    # Backed by a read-only uint64 array, a compacted uint64 array standing for all of its
+    # descendants at one resolution, or a sorted tuple for values that cannot be packed.
+    # Compacted views expand on each `packed` access rather than keeping the full array, so
+    # callers fetch it once per call; indexing and iteration never expand the whole set.
+    # Otherwise string and frozenset forms are built on first use and memoized, as are
+    # values derived through `derived` (geometry summaries and the like). Memoized forms
+    # count towards `nbytes`, and the owning cache is told when they are built.
+
+    __slots__ = (
+        "_packed",
+        "_compact",
+        "_resolution",
+        "_layout",
+        "_sorted",
+        "_frozen",
+        "_derived",
+        "_memo_nbytes",
+        "_on_memo",
+    )
+
+    def __init__(self, cells: NDArray[np.uint64] | tuple[str, ...]) -> None:
+        self._compact: NDArray[np.uint64] | None = None
+        self._resolution = -1
+        self._layout: _CompactLayout | None = None
+        if isinstance(cells, tuple):
+            self._packed: NDArray[np.uint64] | None = None
+            self._sorted: tuple[str, ...] | None = cells
+        else:
+            cells.flags.writeable = False
+            self._packed = cells
+            self._sorted = None
+        self._frozen: frozenset[str] | None = None
+        self._derived: dict[str, object] = {}
+        self._memo_nbytes = 0
+        self._on_memo: Callable[[CellsetView], None] | None = None
+
+    @classmethod
+    def from_cells(cls, cells: Iterable[str]) -> CellsetView:
+        cell_list = list(cells)
+        packed = try_pack_cells(cell_list)
+        if packed is None:
+            return cls(tuple(normalize_cells(cell_list)))
+        return cls(packed)
+
+    @classmethod
+    def from_compact(cls, compact: NDArray[np.uint64], resolution: int) -> CellsetView:
+        # `compact` must be canonical (see compaction.canonical_compact). Sets that did not
+        # compact at all are kept as plain packed arrays.
+        resolutions = cell_resolutions(compact)
+        if not len(compact) or bool((resolutions == resolution).all()):
+            return cls(compact)
+        view = cls(empty_indexes())
+        compact.flags.writeable = False
+        view._packed = None
+        view._compact = compact
+        view._resolution = resolution
+        return view
+
+    @property
+    def packed(self) -> NDArray[np.uint64] | None:
+        if self._compact is not None:
+            expanded = uncompact_indexes(self._compact, self._resolution)
+            expanded.flags.writeable = False
+            return expanded
+        return self._packed
+
+    @property
+    def compact(self) -> NDArray[np.uint64] | None:
+        return self._compact
+
+    @property
+    def resolution(self) -> int | None:
+        # The shared resolution of a compacted view; None for other views.
+        return self._resolution if self._compact is not None else None
+
+    @property
+    def nbytes(self) -> int:
+        # Backing storage plus memoized string and frozenset forms.
+        if self._compact is not None:
+            return int(self._compact.nbytes)
+        if self._packed is not None:
+            return int(self._packed.nbytes) + self._memo_nbytes
+        assert self._sorted is not None
+        return _tuple_nbytes(self._sorted) + self._memo_nbytes
+
+    def iter_packed(self) -> Iterator[NDArray[np.uint64]]:
+        # Sorted chunks of the packed cells, expanding a compacted view a chunk at a time.
+        if self._compact is not None:
+            yield from iter_uncompacted(self._compact, self._resolution)
+        elif self._packed is not None:
+            yield self._packed
+
+    def sorted_cells(self) -> tuple[str, ...]:
+        if self._compact is not None:
+            return tuple(unpack_cells(uncompact_indexes(self._compact, self._resolution)))
+        if self._sorted is None:
+            assert self._packed is not None
+            self._sorted = tuple(unpack_cells(self._packed))
+            self._memoized(_tuple_nbytes(self._sorted))
+        return self._sorted
+
+    def as_frozenset(self) -> frozenset[str]:
+        if self._compact is not None:
+            return frozenset(self.sorted_cells())
+        if self._frozen is None:
+            # Members are the strings of sorted_cells(), already counted there.
+            self._frozen = frozenset(self.sorted_cells())
+            self._memoized(sys.getsizeof(self._frozen))
+        return self._frozen
+
+    def _memoized(self, nbytes: int) -> None:
+        self._memo_nbytes += nbytes
+        if self._on_memo is not None:
+            self._on_memo(self)
+
+    def contains_mask(self, indexes: NDArray[np.uint64]) -> NDArray[np.bool_]:
+        # Membership of packed cells, without expanding a compacted view.
+        if self._compact is not None:
+            at_resolution = cell_resolutions(indexes) == self._resolution
+            return at_resolution & contains_mask(self._compact, indexes)
+        if self._packed is not None:
+            return member_mask(indexes, self._packed)
+        return np.zeros(len(indexes), dtype=np.bool_)
+
+    def derived(self, key: str, build: Callable[[CellsetView], T]) -> T:
+        # Views are immutable, so a value built from the cells stays valid for the life of
+        # the view. Concurrent first calls may both build; either result is kept.
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return cast(T, self._derived[key])
+
+    def take(self, positions: NDArray[np.int64]) -> NDArray[np.uint64]:
+        # Packed cells at the given positions; a compacted view is streamed once, in chunks.
+        if self._compact is None:
+            assert self._packed is not None
+            return self._packed[positions]
+        order = np.argsort(positions, kind="stable")
+        wanted = positions[order]
+        taken = np.empty(len(positions), dtype=np.uint64)
+        found = offset = 0
+        for chunk in self.iter_packed():
+            stop = int(np.searchsorted(wanted, offset + len(chunk)))
+            taken[order[found:stop]] = chunk[wanted[found:stop] - offset]
+            found, offset = stop, offset + len(chunk)
+            if found == len(wanted):
+                break
+        return taken
+
+    def _compact_layout(self) -> _CompactLayout:
+        if self._layout is None:
+            assert self._compact is not None
+            firsts = first_descendants(self._compact, self._resolution)
+            order = np.argsort(firsts, kind="stable")
+            counts = descendant_counts(self._compact[order], self._resolution)
+            self._layout = _CompactLayout(self._compact[order], firsts[order], np.cumsum(counts))
+        return self._layout
+
+    def _position(self, cell: str) -> int | None:
+        if cell not in self:
+            return None
+        if self._compact is not None:
+            index = int(pack_cells([cell])[0])
+            layout = self._compact_layout()
+            pos = int(np.searchsorted(layout.firsts, index, side="right")) - 1
+            base = int(layout.ends[pos - 1]) if pos else 0
+            return base + descendant_rank(int(layout.cells[pos]), self._resolution, index)
+        if self._packed is not None:
+            return int(np.searchsorted(self._packed, pack_cells([cell])[0]))
+        return bisect_left(self.sorted_cells(), cell)
+
+    def index(self, value: object, start: int = 0, stop: int | None = None) -> int:
+        low, high, _ = slice(start, stop).indices(len(self))
+        position = self._position(value) if isinstance(value, str) else None
+        if position is None or not low <= position < high:
+            raise ValueError(f"{value!r} is not in the cellset")
+        return position
+
+    def count(self, value: object) -> int:
+        return int(value in self)
+
+    def __len__(self) -> int:
+        if self._compact is not None:
+            return int(self._compact_layout().ends[-1])
+        if self._packed is not None:
+            return len(self._packed)
+        assert self._sorted is not None
+        return len(self._sorted)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._compact is not None:
+            return (cell for chunk in self.iter_packed() for cell in unpack_cells(chunk))
+        return iter(self.sorted_cells())
+
+    def __reversed__(self) -> Iterator[str]:
+        return reversed(self.sorted_cells())
+
+    def __contains__(self, cell: object) -> bool:
+        if not isinstance(cell, str):
+            return False
+        if self._frozen is not None:
+            return cell in self._frozen
+        if self._compact is not None or self._packed is not None:
+            packed = try_pack_cells([cell])
+            return packed is not None and bool(self.contains_mask(packed)[0])
+        cells = self.sorted_cells()
+        pos = bisect_left(cells, cell)
+        return pos < len(cells) and cells[pos] == cell
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | Sequence[str]:
+        if self._compact is not None:
+            if isinstance(index, slice):
+                positions = np.arange(*index.indices(len(self)), dtype=np.int64)
+                return unpack_cells(self.take(positions))
+            return unpack_cells(np.array([self._compact_cell(index)], dtype=np.uint64))[0]
+        if self._sorted is None and self._packed is not None:
+            if isinstance(index, slice):
+                return unpack_cells(self._packed[index])
+            return unpack_cells(self._packed[index : index + 1 or None])[0]
+        return self.sorted_cells()[index]
+
+    def _compact_cell(self, index: int) -> int:
+        size = len(self)
+        if not -size <= index < size:
+            raise IndexError("cellset index out of range")
+        index %= size
+        layout = self._compact_layout()
+        pos = int(np.searchsorted(layout.ends, index, side="right"))
+        base = int(layout.ends[pos - 1]) if pos else 0
+        return descendant_at(int(layout.cells[pos]), self._resolution, index - base)
+
+
+def _tuple_nbytes(cells: tuple[str, ...]) -> int:
+    return sys.getsizeof(cells) + sum(map(sys.getsizeof, cells))
+
+
+@dataclass(frozen=True)
+class _CompactLayout:
+    # Compacted cells in the order of their first descendant, with running descendant
+    # totals, so a position maps to one compacted cell by binary search.
+    cells: NDArray[np.uint64]
+    firsts: NDArray[np.uint64]
+    ends: NDArray[np.int64]
+
+
+def compact_view(view: CellsetView) -> CellsetView:
+    # Stores large single-resolution sets compacted when that at least halves them.
+    packed = view.packed if view.compact is None else None
+    if packed is None or len(packed) < _MIN_COMPACT_CELLS:
+        return view
+    resolutions = cell_resolutions(packed)
+    if resolutions[0] != resolutions.min() or resolutions[0] != resolutions.max():
+        return view
+    compact = compact_indexes(packed)
+    if 2 * len(compact) > len(packed):
+        return view
+    compacted = CellsetView.from_compact(compact, int(resolutions[0]))
+    compacted._derived.update(view._derived)
+    return compacted
 
 
 @dataclass(frozen=True)
 class CacheEntry:
-    cells: tuple[str, ...]
+    cells: CellsetView
     created_at: float
     expires_at: float
+    nbytes: int
+
+
+@dataclass
+class CacheCounters:
+    hits: int = 0
+    misses: int = 0
+    expired_lookups: int = 0
+    backend_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    puts: int = 0
+    # Puts of content that was already cached, i.e. work an agent could have skipped by
+    # passing the cellset_id it already had.
+    repeat_puts: int = 0
+    inline_cellsets: int = 0
 
 
 class CellsetCache:
@@ -30,19 +398,78 @@ class CellsetCache:
         max_items: int = 1024,
         ttl_seconds: int | None = 3600,
         time_fn: Callable[[], float] | None = None,
+        backend: CellsetBackend | None = None,
+        max_bytes: int | None = None,
     ) -> None:
         if max_items < 1:
             raise ValueError("max_items must be >= 1.")
         if ttl_seconds is not None and ttl_seconds <= 0:
             raise ValueError("ttl_seconds must be > 0 when set.")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1 when set.")
         self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._nbytes = 0
+        self._cells = 0
+        self.counters = CacheCounters()
         self._ttl_seconds = ttl_seconds
         self._time_fn = time_fn or time.time
         self._store: OrderedDict[str, CacheEntry] = OrderedDict()
+        # Min-heap of (expires_at, cellset_id). Entries that were replaced, evicted or read
+        # after expiry leave stale items behind; they are skipped when popped.
+        self._expiry_heap: list[tuple[float, str]] = []
+        # Optional lower tier; the in-memory LRU stays the hot layer above it.
+        self._backend = backend
+        # Tools may run on worker threads. Hashing and backend I/O happen outside the lock.
+        self._lock = threading.RLock()
 
     def __len__(self) -> int:
-        self._purge_expired(self._time_fn())
-        return len(self._store)
+        with self._lock:
+            self._purge_expired(self._time_fn())
+            return len(self._store)
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            self._purge_expired(self._time_fn())
+            return self._nbytes
+
+    def stats(self, largest: int = 10) -> dict[str, object]:
+        with self._lock:
+            self._purge_expired(self._time_fn())
+            by_size = sorted(self._store.items(), key=lambda item: item[1].nbytes, reverse=True)
+            return {
+                "items": len(self._store),
+                "cells": self._cells,
+                "nbytes": self._nbytes,
+                "max_items": self._max_items,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl_seconds,
+                **asdict(self.counters),
+                "largest_entries": [
+                    {"cellset_id": key, "cells": len(entry.cells), "nbytes": entry.nbytes}
+                    for key, entry in by_size[:largest]
+                ],
+            }
+
+    def note_inline_cellset(self) -> None:
+        with self._lock:
+            self.counters.inline_cellsets += 1
+
+    def peek_size(self, cellset_id: str) -> int | None:
+        # Cell count of a live in-memory entry, without touching LRU order or counters.
+        with self._lock:
+            entry = self._store.get(cellset_id)
+            if entry is None or entry.expires_at <= self._time_fn():
+                return None
+            return len(entry.cells)
+
+    def _pop(self, cellset_id: str) -> CacheEntry | None:
+        entry = self._store.pop(cellset_id, None)
+        if entry is not None:
+            self._nbytes -= entry.nbytes
+            self._cells -= len(entry.cells)
+        return entry
 
     def _expires_at(self, now: float) -> float:
         if self._ttl_seconds is None:
@@ -50,42 +477,139 @@ class CellsetCache:
         return now + self._ttl_seconds
 
     def _purge_expired(self, now: float) -> None:
-        expired_keys = [
-            key for key, entry in self._store.items() if entry.expires_at <= now
-        ]
-        for key in expired_keys:
-            self._store.pop(key, None)
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._store.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._pop(key)
+                self.counters.expirations += 1
+
+    def _track_expiry(self, cellset_id: str, expires_at: float) -> None:
+        if expires_at == float("inf"):
+            return
+        heapq.heappush(self._expiry_heap, (expires_at, cellset_id))
+        if len(self._expiry_heap) > 2 * len(self._store) + 64:
+            self._expiry_heap = [
+                (entry.expires_at, key)
+                for key, entry in self._store.items()
+                if entry.expires_at != float("inf")
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _over_budget(self) -> bool:
+        if len(self._store) > self._max_items:
+            return True
+        # The newest entry is kept even when it alone exceeds max_bytes, so the id just
+        # returned to the caller still resolves.
+        return (
+            self._max_bytes is not None
+            and self._nbytes > self._max_bytes
+            and len(self._store) > 1
+        )
 
     def _enforce_limits(self) -> None:
-        while len(self._store) > self._max_items:
-            self._store.popitem(last=False)
+        while self._over_budget():
+            self._pop(next(iter(self._store)))
+            self.counters.evictions += 1
 
     def prune(self) -> None:
-        now = self._time_fn()
-        self._purge_expired(now)
-        self._enforce_limits()
+        with self._lock:
+            self._purge_expired(self._time_fn())
+            self._enforce_limits()
+        if self._backend is not None:
+            self._backend.prune()
 
     def put_cells(self, cells: Iterable[str]) -> str:
-        normalized = normalize_cells(cells)
-        cellset_id = make_cellset_id(normalized)
+        return self.put_view(CellsetView.from_cells(cells))
+
+    def put_view(self, view: CellsetView) -> str:
+        # Views are sorted and unique by construction; large ones are compacted (outside the
+        # lock) unless the same content is already cached and live.
+        cellset_id = view_cellset_id(view)
+        with self._lock:
+            cached = self._live_view(cellset_id)
+        self._put(cellset_id, compact_view(view) if cached is None else cached)
+        return cellset_id
+
+    def _live_view(self, cellset_id: str) -> CellsetView | None:
+        entry = self._store.get(cellset_id)
+        if entry is None or entry.expires_at <= self._time_fn():
+            return None
+        return entry.cells
+
+    def _put(self, cellset_id: str, view: CellsetView) -> None:
+        with self._lock:
+            self.counters.puts += 1
+            cached = self._live_view(cellset_id)
+            if cached is not None:
+                self.counters.repeat_puts += 1
+                # Same content: keep the cached view and whatever it has already derived.
+                view = cached
+            self._insert(cellset_id, view)
+        if self._backend is not None:
+            self._backend.put(cellset_id, view)
+
+    def _charge_memo(self, cellset_id: str, view: CellsetView) -> None:
+        # A cached view memoized its string or frozenset form: charge the entry holding it
+        # and evict if that pushes the cache over max_bytes.
+        with self._lock:
+            entry = self._store.get(cellset_id)
+            if entry is None or entry.cells is not view:
+                return
+            self._store[cellset_id] = replace(entry, nbytes=view.nbytes)
+            self._nbytes += view.nbytes - entry.nbytes
+            self._enforce_limits()
+
+    def _insert(self, cellset_id: str, view: CellsetView) -> None:
+        view._on_memo = functools.partial(self._charge_memo, cellset_id)
         now = self._time_fn()
         entry = CacheEntry(
-            cells=tuple(normalized),
+            cells=view,
             created_at=now,
             expires_at=self._expires_at(now),
+            nbytes=view.nbytes,
         )
+        self._pop(cellset_id)
         self._store[cellset_id] = entry
+        self._nbytes += entry.nbytes
+        self._cells += len(view)
         self._store.move_to_end(cellset_id)
+        self._track_expiry(cellset_id, entry.expires_at)
         self._enforce_limits()
-        return cellset_id
 
-    def get_cells(self, cellset_id: str) -> list[str] | None:
-        now = self._time_fn()
-        entry = self._store.get(cellset_id)
-        if not entry:
+    def get_view(self, cellset_id: str) -> CellsetView | None:
+        with self._lock:
+            now = self._time_fn()
+            entry = self._store.get(cellset_id)
+            if entry and entry.expires_at <= now:
+                self._pop(cellset_id)
+                self.counters.expired_lookups += 1
+                entry = None
+            if entry:
+                self.counters.hits += 1
+                self._store.move_to_end(cellset_id)
+                return entry.cells
+        view = self._load_from_backend(cellset_id)
+        with self._lock:
+            if view is None:
+                self.counters.misses += 1
+            else:
+                self.counters.backend_hits += 1
+        return view
+
+    def _load_from_backend(self, cellset_id: str) -> CellsetView | None:
+        if self._backend is None:
             return None
-        if entry.expires_at <= now:
-            self._store.pop(cellset_id, None)
+        view = self._backend.get(cellset_id)
+        if view is not None:
+            view = compact_view(view)
+            with self._lock:
+                self._insert(cellset_id, view)
+        return view
+
+    def get_cells(self, cellset_id: str) -> list[str] | None:
+        view = self.get_view(cellset_id)
+        if view is None:
             return None
-        self._store.move_to_end(cellset_id)
-        return list(entry.cells)
+        return list(view)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import h3
+import numpy as np
+from numpy.typing import NDArray
+
+# H3 cell indexes render as exactly 15 lowercase hex digits (the top nibble is always 0).
+CELL_HEX_LENGTH = 15
+_CHUNK_SIZE = 1 << 16
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_HEX_VALUES = np.full(128, 0xFF, dtype=np.uint8)
+_HEX_VALUES[_HEX_DIGITS] = np.arange(16, dtype=np.uint8)
+# Uppercase digits parse too; packed cells always render back in lowercase.
+_HEX_VALUES[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16, dtype=np.uint8)
+_NIBBLE_SHIFTS = np.arange(4 * (CELL_HEX_LENGTH - 1), -1, -4, dtype=np.uint64)
+
+
+def empty_indexes() -> NDArray[np.uint64]:
+    return np.empty(0, dtype=np.uint64)
+
+
+def _parse_chunk(cells: list[str]) -> NDArray[np.uint64] | None:
+    raw = np.array(cells, dtype=np.str_)
+    if raw.dtype.itemsize != 4 * CELL_HEX_LENGTH:
+        return None
+    codepoints = raw.view(np.uint32).reshape(len(cells), CELL_HEX_LENGTH)
+    if (codepoints >= 128).any():
+        return None
+    nibbles = _HEX_VALUES[codepoints]
+    # Padding NULs from shorter strings and non-hex characters both map to 0xFF; a leading
+    # zero would not survive the round trip back to a string.
+    if (nibbles == 0xFF).any() or (nibbles[:, 0] == 0).any():
+        return None
+    return np.bitwise_or.reduce(nibbles.astype(np.uint64) << _NIBBLE_SHIFTS, axis=1)
+
+
+def _parse_with_h3(cells: list[str]) -> NDArray[np.uint64] | None:
+    # Slow path for other spellings h3 accepts (leading zeros, "0x", padding); stops at the
+    # first value that is not a valid cell.
+    indexes = np.empty(len(cells), dtype=np.uint64)
+    for position, cell in enumerate(cells):
+        if not isinstance(cell, str) or not h3.is_valid_cell(cell):
+            return None
+        indexes[position] = h3.str_to_int(cell)
+    return indexes
+
+
+def _try_encode(cell_list: list[str]) -> NDArray[np.uint64] | None:
+    # Returns None when any value is not an H3 cell. Valid cells are packed whatever their
+    # spelling and render back in canonical lowercase form.
+    if not cell_list:
+        return empty_indexes()
+    chunks: list[NDArray[np.uint64]] = []
+    for start in range(0, len(cell_list), _CHUNK_SIZE):
+        cells = cell_list[start : start + _CHUNK_SIZE]
+        chunk = _parse_chunk(cells)
+        if chunk is None:
+            chunk = _parse_with_h3(cells)
+        if chunk is None:
+            return None
+        chunks.append(chunk)
+    return np.concatenate(chunks)
+
+
+def sort_unique(indexes: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    # Input that is already strictly increasing (cache reads, set-op results) skips the sort.
+    if len(indexes) < 2 or bool((indexes[1:] > indexes[:-1]).all()):
+        return indexes
+    return np.unique(indexes)
+
+
+def try_pack_cells(cells: Iterable[str]) -> NDArray[np.uint64] | None:
+    encoded = _try_encode(cells if isinstance(cells, list) else list(cells))
+    return None if encoded is None else sort_unique(encoded)
+
+
+def encode_cells(cells: Iterable[str]) -> NDArray[np.uint64]:
+    # Unlike pack_cells, keeps input order and duplicates.
+    encoded = _try_encode(cells if isinstance(cells, list) else list(cells))
+    if encoded is None:
+        raise ValueError("Cells must be valid H3 cell IDs.")
+    return encoded
+
+
+def pack_cells(cells: Iterable[str]) -> NDArray[np.uint64]:
+    indexes = try_pack_cells(cells)
+    if indexes is None:
+        raise ValueError("Cells must be valid H3 cell IDs.")
+    return indexes
+
+
+def unpack_cells(indexes: NDArray[np.uint64]) -> list[str]:
+    cells: list[str] = []
+    for start in range(0, len(indexes), _CHUNK_SIZE):
+        chunk = indexes[start : start + _CHUNK_SIZE]
+        nibbles = (chunk[:, None] >> _NIBBLE_SHIFTS) & np.uint64(0xF)
+        chars = _HEX_DIGITS[nibbles]
+        cells.extend(chars.view(f"S{CELL_HEX_LENGTH}").ravel().astype(np.str_).tolist())
+    return cells
+
+
+def split_sorted(
+    a: NDArray[np.uint64], b: NDArray[np.uint64]
+) -> tuple[NDArray[np.uint64], NDArray[np.uint64], NDArray[np.uint64]]:
+    # Both inputs must be sorted and unique; the outputs (overlap, only_a, only_b) are too.
+    if not len(a) or not len(b):
+        return empty_indexes(), a.copy(), b.copy()
+    in_b = member_mask(a, b)
+    in_a = member_mask(b, a)
+    return a[in_b], a[~in_b], b[~in_a]
+
+
+def member_mask(values: NDArray[np.uint64], sorted_pool: NDArray[np.uint64]) -> NDArray[np.bool_]:
+    if not len(sorted_pool):
+        return np.zeros(len(values), dtype=np.bool_)
+    positions = np.searchsorted(sorted_pool, values)
+    positions[positions == len(sorted_pool)] = 0
+    return sorted_pool[positions] == values
+
+
+def cell_resolutions(indexes: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    # The resolution occupies bits 52-55 of an H3 cell index.
+    return (indexes >> np.uint64(52)) & np.uint64(0xF)
+
+
+def cell_base_cells(indexes: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    # The base cell number occupies bits 45-51.
+    return (indexes >> np.uint64(45)) & np.uint64(0x7F)
+
+
+def cell_parents(indexes: NDArray[np.uint64], resolution: int) -> NDArray[np.uint64]:
+    # Same as h3.cell_to_parent for cells at or below `resolution`: set the resolution field
+    # and mark every digit past it as unused (7).
+    unused_digits = np.uint64((1 << (3 * (15 - resolution))) - 1)
+    resolution_bits = np.uint64(resolution << 52)
+    return (indexes & ~np.uint64(0xF << 52)) | resolution_bits | unused_digits
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Callable, Iterable, Protocol
+
+import numpy as np
+
+from .cache import CellsetView
+
+_CELLSET_ID_PATTERN = re.compile(r"cellset_[0-9a-f]{64}")
+_SUFFIX = ".u64"
+
+
+class CellsetBackend(Protocol):
+    """Storage tier below the in-memory CellsetCache."""
+
+    def put(self, cellset_id: str, view: CellsetView) -> None: ...
+
+    def get(self, cellset_id: str) -> CellsetView | None: ...
+
+    def delete(self, cellset_id: str) -> None: ...
+
+    def prune(self) -> None: ...
+
+
+class DiskCellsetStore:
+    """Persistent cellset tier: one sorted little-endian uint64 file per cellset_id."""
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl_seconds: int | None = 3600,
+        time_fn: Callable[[], float] | None = None,
+    ) -> None:
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0 when set.")
+        self._directory = directory
+        self._ttl_seconds = ttl_seconds
+        self._time_fn = time_fn or time.time
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, cellset_id: str) -> Path | None:
+        # cellset_ids come from clients, so only well-formed ids may touch the filesystem.
+        if not _CELLSET_ID_PATTERN.fullmatch(cellset_id):
+            return None
+        return self._directory / f"{cellset_id}{_SUFFIX}"
+
+    def _is_expired(self, path: Path, now: float) -> bool:
+        if self._ttl_seconds is None:
+            return False
+        return path.stat().st_mtime + self._ttl_seconds <= now
+
+    def put(self, cellset_id: str, view: CellsetView) -> None:
+        # Only packed H3 cellsets are persisted; other values stay in memory.
+        path = self._path(cellset_id)
+        if path is None or (view.compact is None and view.packed is None):
+            return
+        now = self._time_fn()
+        if not path.exists():
+            fd, tmp_name = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                for chunk in view.iter_packed():
+                    handle.write(chunk.astype("<u8", copy=False).tobytes())
+            os.replace(tmp_name, path)
+        os.utime(path, (now, now))
+
+    def get(self, cellset_id: str) -> CellsetView | None:
+        path = self._path(cellset_id)
+        if path is None:
+            return None
+        try:
+            if self._is_expired(path, self._time_fn()):
+                path.unlink(missing_ok=True)
+                return None
+            if path.stat().st_size == 0:
+                return CellsetView(np.empty(0, dtype=np.uint64))
+            packed = np.memmap(path, dtype="<u8", mode="r")
+        except FileNotFoundError:
+            return None
+        return CellsetView(np.asarray(packed).astype(np.uint64, copy=False))
+
+    def delete(self, cellset_id: str) -> None:
+        path = self._path(cellset_id)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def prune(self) -> None:
+        now = self._time_fn()
+        for path in self._directory.glob(f"cellset_*{_SUFFIX}"):
+            try:
+                if self._is_expired(path, now):
+                    path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
+
+
+class SqliteCellsetStore:
+    """Cellset tier in a SQLite file, shareable by every process on the host."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_items: int = 1024,
+        ttl_seconds: int | None = 3600,
+        time_fn: Callable[[], float] | None = None,
+    ) -> None:
+        if max_items < 1:
+            raise ValueError("max_items must be >= 1.")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0 when set.")
+        self._max_items = max_items
+        self._ttl_seconds = ttl_seconds
+        self._time_fn = time_fn or time.time
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cellsets ("
+                "cellset_id TEXT PRIMARY KEY, packed INTEGER NOT NULL, cells BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, touched INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS cellsets_touched ON cellsets (touched)"
+            )
+
+    def _expires_at(self, now: float) -> float:
+        if self._ttl_seconds is None:
+            return float("inf")
+        return now + self._ttl_seconds
+
+    def put(self, cellset_id: str, view: CellsetView) -> None:
+        # ids are content hashes, so a repeat put only refreshes the expiry. New packed
+        # cellsets are written into a preallocated blob one chunk at a time, so a compacted
+        # view is never expanded whole; other values are stored as a JSON array.
+        now = self._time_fn()
+        with self._lock, self._conn:
+            refreshed = self._conn.execute(
+                "UPDATE cellsets SET expires_at = ?, "
+                "touched = (SELECT COALESCE(MAX(touched), 0) + 1 FROM cellsets) "
+                "WHERE cellset_id = ?",
+                (self._expires_at(now), cellset_id),
+            )
+            if refreshed.rowcount:
+                return
+            packed = view.compact is not None or view.packed is not None
+            chunks: Iterable[bytes]
+            if packed:
+                chunks = (
+                    chunk.astype("<u8", copy=False).tobytes() for chunk in view.iter_packed()
+                )
+                size = 8 * len(view)
+            else:
+                text = json.dumps(view.sorted_cells()).encode("utf-8")
+                chunks, size = [text], len(text)
+            cursor = self._conn.execute(
+                "INSERT INTO cellsets VALUES (?, ?, zeroblob(?), ?, "
+                "(SELECT COALESCE(MAX(touched), 0) + 1 FROM cellsets))",
+                (cellset_id, int(packed), size, self._expires_at(now)),
+            )
+            assert cursor.lastrowid is not None
+            with self._conn.blobopen("cellsets", "cells", cursor.lastrowid) as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+            self._conn.execute(
+                "DELETE FROM cellsets WHERE cellset_id IN ("
+                "SELECT cellset_id FROM cellsets ORDER BY touched DESC LIMIT -1 OFFSET ?)",
+                (self._max_items,),
+            )
+
+    def get(self, cellset_id: str) -> CellsetView | None:
+        now = self._time_fn()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT packed, cells, expires_at FROM cellsets WHERE cellset_id = ?",
+                (cellset_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            packed, blob, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM cellsets WHERE cellset_id = ?", (cellset_id,))
+                return None
+            self._conn.execute(
+                "UPDATE cellsets SET touched = "
+                "(SELECT COALESCE(MAX(touched), 0) + 1 FROM cellsets) WHERE cellset_id = ?",
+                (cellset_id,),
+            )
+        if packed:
+            return CellsetView(np.frombuffer(blob, dtype="<u8").astype(np.uint64, copy=False))
+        return CellsetView(tuple(json.loads(blob)))
+
+    def delete(self, cellset_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cellsets WHERE cellset_id = ?", (cellset_id,))
+
+    def prune(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cellsets WHERE expires_at <= ?", (self._time_fn(),)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM cellsets WHERE expires_at > ?", (self._time_fn(),)
+            ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
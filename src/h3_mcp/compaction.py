@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import h3.api.basic_int as h3_int
+import h3.api.numpy_int as h3_np
+import numpy as np
+from numpy.typing import NDArray
+
+from .cell_arrays import (
+    cell_base_cells,
+    cell_parents,
+    cell_resolutions,
+    empty_indexes,
+    member_mask,
+    sort_unique,
+)
+
+# Compacted cellsets are sorted, disjoint uint64 arrays of mixed-resolution cells standing
+# for all of their descendants at one target resolution. Every function here keeps that
+# form canonical: no complete sibling group survives without being merged into its parent.
+
+# Cells per chunk when streaming a compacted set (8 MiB of uint64).
+STREAM_CHUNK_CELLS = 1 << 20
+
+_PENTAGON_BASE_CELLS = np.array(
+    sorted(h3_int.get_base_cell_number(cell) for cell in h3_int.get_pentagons(0)),
+    dtype=np.uint64,
+)
+
+
+def compact_indexes(indexes: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    # Input must be sorted, unique and at one resolution.
+    if not len(indexes):
+        return empty_indexes()
+    return np.sort(h3_np.compact_cells(indexes).astype(np.uint64, copy=False))
+
+
+def uncompact_indexes(compact: NDArray[np.uint64], resolution: int) -> NDArray[np.uint64]:
+    # Descendants of one cell are contiguous among cells of the target resolution, so
+    # expanding cells in order of their first descendant yields a sorted array.
+    if not len(compact):
+        return empty_indexes()
+    order = np.argsort(first_descendants(compact, resolution), kind="stable")
+    return h3_np.uncompact_cells(compact[order], resolution).astype(np.uint64, copy=False)
+
+
+def iter_uncompacted(
+    compact: NDArray[np.uint64], resolution: int, chunk_cells: int = STREAM_CHUNK_CELLS
+) -> Iterator[NDArray[np.uint64]]:
+    # Same cells as uncompact_indexes, as sorted chunks of at most chunk_cells. Runs of small
+    # cells are expanded together; a cell with more descendants than that is split into its
+    # children first.
+    order = np.argsort(first_descendants(compact, resolution), kind="stable")
+    cells = compact[order]
+    counts = descendant_counts(cells, resolution)
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(cells):
+        if counts[start] > chunk_cells:
+            children = _children(cells[start : start + 1])
+            yield from iter_uncompacted(children, resolution, chunk_cells)
+            start += 1
+            continue
+        limit = ends[start] - counts[start] + chunk_cells
+        stop = int(np.searchsorted(ends, limit, side="right"))
+        yield h3_np.uncompact_cells(cells[start:stop], resolution).astype(np.uint64, copy=False)
+        start = stop
+
+
+def first_descendants(compact: NDArray[np.uint64], resolution: int) -> NDArray[np.uint64]:
+    # Digits below a cell's own resolution become 0 (the center child) down to `resolution`.
+    firsts = cell_parents(compact, resolution)
+    resolutions = cell_resolutions(compact)
+    for level in np.unique(resolutions).tolist():
+        at_level = resolutions == level
+        digits = np.uint64(((1 << (3 * (resolution - level))) - 1) << (3 * (15 - resolution)))
+        firsts[at_level] &= ~digits
+    return firsts
+
+
+def descendant_counts(compact: NDArray[np.uint64], resolution: int) -> NDArray[np.int64]:
+    # 7^d descendants d levels down, or 1 + 5 (7^d - 1) / 6 under a pentagon.
+    depth = resolution - cell_resolutions(compact).astype(np.int64)
+    hexagon = np.power(7, depth)
+    return np.where(_is_pentagon(compact), 1 + 5 * (hexagon - 1) // 6, hexagon)
+
+
+def descendant_at(cell: int, resolution: int, offset: int) -> int:
+    # The offset-th descendant of `cell` at `resolution`, in sorted order, found by walking
+    # down one level at a time instead of expanding every descendant.
+    for _ in range(h3_int.get_resolution(cell), resolution):
+        children = np.array(sorted(h3_int.cell_to_children(cell)), dtype=np.uint64)
+        ends = np.cumsum(descendant_counts(children, resolution))
+        child = int(np.searchsorted(ends, offset, side="right"))
+        offset -= int(ends[child - 1]) if child else 0
+        cell = int(children[child])
+    return cell
+
+
+def descendant_rank(cell: int, resolution: int, descendant: int) -> int:
+    # Position of `descendant` among the sorted descendants of `cell` at `resolution`.
+    rank = 0
+    for level in range(h3_int.get_resolution(cell), resolution):
+        children = np.array(sorted(h3_int.cell_to_children(cell)), dtype=np.uint64)
+        cell = h3_int.cell_to_parent(descendant, level + 1)
+        child = int(np.searchsorted(children, cell))
+        rank += int(descendant_counts(children[:child], resolution).sum())
+    return rank
+
+
+def contains_mask(compact: NDArray[np.uint64], indexes: NDArray[np.uint64]) -> NDArray[np.bool_]:
+    # True where an index equals or descends from a compacted cell.
+    mask = np.zeros(len(indexes), dtype=np.bool_)
+    if not len(compact) or not len(indexes):
+        return mask
+    compact_resolutions = cell_resolutions(compact)
+    index_resolutions = cell_resolutions(indexes)
+    for level in np.unique(compact_resolutions).tolist():
+        candidates = np.flatnonzero(index_resolutions >= level)
+        pool = compact[compact_resolutions == level]
+        mask[candidates] |= member_mask(cell_parents(indexes[candidates], level), pool)
+    return mask
+
+
+def intersect_compact(a: NDArray[np.uint64], b: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    # Two H3 cells are either nested or disjoint, so the overlap is every cell of one set that
+    # lies inside a cell of the other.
+    inside = np.concatenate([a[contains_mask(b, a)], b[contains_mask(a, b)]])
+    return canonical_compact(sort_unique(np.sort(inside)))
+
+
+def subtract_compact(a: NDArray[np.uint64], b: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    # Cells of `a` inside `b` drop out; cells that only partly cover `b` split into their
+    # children, level by level, until every piece is either inside or clear of `b`.
+    kept: list[NDArray[np.uint64]] = []
+    pending = a[~contains_mask(b, a)]
+    while len(pending):
+        partial = _covers_part_of(pending, b)
+        kept.append(pending[~partial])
+        pending = _children(pending[partial])
+        pending = pending[~contains_mask(b, pending)]
+    if not kept:
+        return empty_indexes()
+    return canonical_compact(np.sort(np.concatenate(kept)))
+
+
+def canonical_compact(cells: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    # Merges complete sibling groups into their parents, finest level first, so that equal
+    # cellsets always compact to the same array.
+    if not len(cells):
+        return empty_indexes()
+    resolutions = cell_resolutions(cells)
+    levels: dict[int, list[NDArray[np.uint64]]] = {}
+    for level in np.unique(resolutions).tolist():
+        levels[level] = [cells[resolutions == level]]
+    merged: list[NDArray[np.uint64]] = []
+    for level in range(max(levels), -1, -1):
+        group = np.sort(np.concatenate(levels.pop(level, [empty_indexes()])))
+        if level == 0 or not len(group):
+            merged.append(group)
+            continue
+        parents = cell_parents(group, level - 1)
+        keys, starts, counts = np.unique(parents, return_index=True, return_counts=True)
+        complete = counts == descendant_counts(keys, level)
+        whole = np.repeat(complete, counts)
+        merged.append(group[~whole])
+        if complete.any():
+            levels.setdefault(level - 1, []).append(keys[complete])
+    return np.sort(np.concatenate(merged))
+
+
+def _covers_part_of(cells: NDArray[np.uint64], b: NDArray[np.uint64]) -> NDArray[np.bool_]:
+    # True where some cell of `b` lies strictly inside the cell.
+    mask = np.zeros(len(cells), dtype=np.bool_)
+    resolutions = cell_resolutions(cells)
+    b_resolutions = cell_resolutions(b)
+    for level in np.unique(resolutions).tolist():
+        finer = b[b_resolutions > level]
+        at_level = np.flatnonzero(resolutions == level)
+        if len(finer):
+            ancestors = sort_unique(np.sort(cell_parents(finer, level)))
+            mask[at_level] = member_mask(cells[at_level], ancestors)
+    return mask
+
+
+def _children(cells: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    if not len(cells):
+        return empty_indexes()
+    resolutions = cell_resolutions(cells)
+    parts = [
+        h3_np.uncompact_cells(cells[resolutions == level], level + 1).astype(np.uint64)
+        for level in np.unique(resolutions).tolist()
+    ]
+    return np.sort(np.concatenate(parts))
+
+
+def _is_pentagon(cells: NDArray[np.uint64]) -> NDArray[np.bool_]:
+    # A pentagon sits on a pentagon base cell with every used digit 0 (the center child).
+    pentagon = member_mask(cell_base_cells(cells), _PENTAGON_BASE_CELLS)
+    resolutions = cell_resolutions(cells)
+    for level in np.unique(resolutions[pentagon]).tolist():
+        digits = np.uint64(((1 << (3 * level)) - 1) << (3 * (15 - level)))
+        at_level = pentagon & (resolutions == level)
+        pentagon[at_level] = (cells[at_level] & digits) == 0
+    return pentagon
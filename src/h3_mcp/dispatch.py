@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import functools
+import sys
+from typing import Any, Callable, TypeVar
+
+import anyio
+import anyio.to_thread
+from pydantic import BaseModel
+
+from .models.schemas import CellsetRef
+from .runtime import get_cache
+
+DEFAULT_TOOL_THREADS = 8
+DEFAULT_TOOL_CONCURRENCY = 4
+DEFAULT_INLINE_CELL_LIMIT = 1000
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class ToolDispatcher:
+    """Runs heavy tool calls on a bounded thread pool so the event loop keeps serving."""
+
+    def __init__(
+        self,
+        threads: int = DEFAULT_TOOL_THREADS,
+        tool_concurrency: int = DEFAULT_TOOL_CONCURRENCY,
+        inline_cell_limit: int = DEFAULT_INLINE_CELL_LIMIT,
+    ) -> None:
+        if threads < 1:
+            raise ValueError("threads must be >= 1.")
+        if tool_concurrency < 1:
+            raise ValueError("tool_concurrency must be >= 1.")
+        if inline_cell_limit < 0:
+            raise ValueError("inline_cell_limit must be >= 0.")
+        self._threads = threads
+        self._tool_concurrency = tool_concurrency
+        self._inline_cell_limit = inline_cell_limit
+        # Limiters bind to the running event loop, so they are created on first use.
+        self._thread_limiter: anyio.CapacityLimiter | None = None
+        self._tool_limiters: dict[str, anyio.CapacityLimiter] = {}
+
+    def _limiters(self, name: str) -> tuple[anyio.CapacityLimiter, anyio.CapacityLimiter]:
+        if self._thread_limiter is None:
+            self._thread_limiter = anyio.CapacityLimiter(self._threads)
+        tool_limiter = self._tool_limiters.get(name)
+        if tool_limiter is None:
+            tool_limiter = anyio.CapacityLimiter(self._tool_concurrency)
+            self._tool_limiters[name] = tool_limiter
+        return tool_limiter, self._thread_limiter
+
+    def offload(self, fn: F, always: bool = False) -> F:
+        # Calls whose inputs hold at most inline_cell_limit cells run inline; anything
+        # larger, or unknown in size, waits for a per-tool slot and then a worker thread.
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not always and _input_cells(args, kwargs) <= self._inline_cell_limit:
+                return fn(*args, **kwargs)
+            tool_limiter, thread_limiter = self._limiters(name)
+            async with tool_limiter:
+                return await anyio.to_thread.run_sync(
+                    functools.partial(fn, *args, **kwargs), limiter=thread_limiter
+                )
+
+        return wrapper  # type: ignore[return-value]
+
+
+def _input_cells(args: tuple[Any, ...], kwargs: dict[str, Any]) -> int:
+    return sum(_count_cells(value) for value in (*args, *kwargs.values()))
+
+
+def _count_cells(value: Any) -> int:
+    if isinstance(value, CellsetRef):
+        if value.cells is not None:
+            return len(value.cells)
+        size = get_cache().peek_size(value.cellset_id or "")
+        return sys.maxsize if size is None else size
+    if isinstance(value, BaseModel):
+        return sum(_count_cells(getattr(value, name)) for name in type(value).model_fields)
+    if isinstance(value, list):
+        return sum(max(1, _count_cells(item)) for item in value)
+    if isinstance(value, dict):
+        return len(value)
+    return 0
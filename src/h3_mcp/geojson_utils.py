@@ -1,6 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Iterable, Iterator, cast
+from dataclasses import dataclass
+import json
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+# RFC 8142 GeoJSON text sequences prefix each record with an ASCII record separator.
+_RECORD_SEPARATOR = "\x1e"
+_GEOMETRY_TYPES = {
+    "Point",
+    "MultiPoint",
+    "LineString",
+    "MultiLineString",
+    "Polygon",
+    "MultiPolygon",
+}
 
 
 def iter_features(geojson: dict[str, Any]) -> Iterator[dict[str, Any]]:
@@ -15,49 +31,129 @@ def iter_features(geojson: dict[str, Any]) -> Iterator[dict[str, Any]]:
         raise ValueError("GeoJSON must be a FeatureCollection or Feature.")
 
 
-def _iter_coords(geometry: dict[str, Any]) -> Iterable[tuple[float, float]]:
+def iter_feature_lines(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for line_number, line in enumerate(lines, start=1):
+        text = line.strip().lstrip(_RECORD_SEPARATOR).strip()
+        if not text:
+            continue
+        try:
+            feature = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid GeoJSON on line {line_number}: {exc.msg}.") from None
+        if not isinstance(feature, dict) or feature.get("type") != "Feature":
+            raise ValueError(f"GeoJSON sequence line {line_number} is not a Feature.")
+        yield feature
+
+
+Bounds = tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class PreparedGeometry:
+    geom_type: str
+    # All vertices as one contiguous (n, 2) lng/lat array. Ring (or line) i spans
+    # coords[ring_offsets[i]:ring_offsets[i + 1]]; polygon j owns rings
+    # polygon_offsets[j]:polygon_offsets[j + 1].
+    coords: NDArray[np.float64]
+    ring_offsets: NDArray[np.int64]
+    polygon_offsets: NDArray[np.int64]
+    geometry_count: int
+
+    def bounds(self) -> Bounds | None:
+        if not len(self.coords):
+            return None
+        min_lng, min_lat = self.coords.min(axis=0).tolist()
+        max_lng, max_lat = self.coords.max(axis=0).tolist()
+        return min_lng, min_lat, max_lng, max_lat
+
+    def rings(self) -> list[NDArray[np.float64]]:
+        offsets = self.ring_offsets.tolist()
+        return [self.coords[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    def polygons(self) -> list[list[NDArray[np.float64]]]:
+        rings = self.rings()
+        offsets = self.polygon_offsets.tolist()
+        return [rings[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def _coord_array(ring: Any) -> NDArray[np.float64]:
+    coords = np.asarray(ring, dtype=np.float64)
+    if coords.size == 0:
+        return np.empty((0, 2), dtype=np.float64)
+    if coords.ndim != 2 or coords.shape[1] != 2:
+        raise ValueError("Coordinates must be [lng, lat] pairs.")
+    return coords
+
+
+def prepare_geometry(geometry: dict[str, Any]) -> PreparedGeometry:
     geom_type = geometry.get("type")
+    if geom_type not in _GEOMETRY_TYPES:
+        raise ValueError(f"Unsupported geometry type: {geom_type}")
     coords = geometry.get("coordinates")
     if coords is None:
         raise ValueError("Geometry missing coordinates.")
+
+    polygon_sizes: list[int] = []
     if geom_type == "Point":
-        point = cast(list[float], coords)
-        lng, lat = point
-        yield lng, lat
+        rings = [[coords]]
+        geometry_count = 1
     elif geom_type in {"MultiPoint", "LineString"}:
-        line = cast(list[list[float]], coords)
-        for lng, lat in line:
-            yield lng, lat
-    elif geom_type in {"MultiLineString", "Polygon"}:
-        lines = cast(list[list[list[float]]], coords)
-        for ring in lines:
-            for lng, lat in ring:
-                yield lng, lat
-    elif geom_type == "MultiPolygon":
-        polygons = cast(list[list[list[list[float]]]], coords)
-        for polygon in polygons:
-            for ring in polygon:
-                for lng, lat in ring:
-                    yield lng, lat
+        rings = [coords]
+        geometry_count = len(coords)
+    elif geom_type == "MultiLineString":
+        rings = coords
+        geometry_count = len(coords)
+    elif geom_type == "Polygon":
+        rings = coords
+        geometry_count = len(coords)
+        polygon_sizes = [len(coords)]
     else:
-        raise ValueError(f"Unsupported geometry type: {geom_type}")
+        rings = [ring for polygon in coords for ring in polygon]
+        geometry_count = len(coords)
+        polygon_sizes = [len(polygon) for polygon in coords]
+
+    arrays = [_coord_array(ring) for ring in rings]
+    ring_offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([len(array) for array in arrays], out=ring_offsets[1:])
+    polygon_offsets = np.zeros(len(polygon_sizes) + 1, dtype=np.int64)
+    np.cumsum(polygon_sizes, out=polygon_offsets[1:])
+    return PreparedGeometry(
+        geom_type=geom_type,
+        coords=np.concatenate(arrays) if arrays else np.empty((0, 2), dtype=np.float64),
+        ring_offsets=ring_offsets,
+        polygon_offsets=polygon_offsets,
+        geometry_count=geometry_count,
+    )
+
+
+class BoundsAccumulator:
+    def __init__(self) -> None:
+        self.min_lng = self.min_lat = float("inf")
+        self.max_lng = self.max_lat = float("-inf")
+
+    def add_bounds(self, bounds: Bounds | None) -> None:
+        if bounds is None:
+            return
+        min_lng, min_lat, max_lng, max_lat = bounds
+        self.min_lng = min(self.min_lng, min_lng)
+        self.min_lat = min(self.min_lat, min_lat)
+        self.max_lng = max(self.max_lng, max_lng)
+        self.max_lat = max(self.max_lat, max_lat)
+
+    def bounding_box(self) -> list[float]:
+        if self.min_lng == float("inf"):
+            raise ValueError("GeoJSON contains no coordinates.")
+        return [self.min_lng, self.min_lat, self.max_lng, self.max_lat]
 
 
 def bounding_box_from_geojson(geojson: dict[str, Any]) -> list[float]:
-    min_lng = min_lat = float("inf")
-    max_lng = max_lat = float("-inf")
+    bounds = BoundsAccumulator()
     for feature in iter_features(geojson):
         geometry = feature.get("geometry")
         if not geometry:
             continue
-        for lng, lat in _iter_coords(geometry):
-            min_lng = min(min_lng, lng)
-            max_lng = max(max_lng, lng)
-            min_lat = min(min_lat, lat)
-            max_lat = max(max_lat, lat)
-    if min_lng == float("inf"):
-        raise ValueError("GeoJSON contains no coordinates.")
-    return [min_lng, min_lat, max_lng, max_lat]
+        bounds.add_bounds(prepare_geometry(geometry).bounds())
+    return bounds.bounding_box()
 
 
 def geometry_type(feature: dict[str, Any]) -> str:
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .cache import CellsetView
+from .cell_arrays import cell_resolutions
+from .h3_ops import cell_areas_km2, cell_centers
+from .neighborhoods import DiskAdjacency, component_labels
+
+
+@dataclass(frozen=True)
+class CellsetGeometry:
+    # None when the cells mix resolutions.
+    resolution: int | None
+    # Mean of the cell centers, (lat, lng).
+    center: tuple[float, float]
+    # (min lng, min lat, max lng, max lat) over the cell centers.
+    bounding_box: tuple[float, float, float, float]
+    # Sum of the exact area of every cell.
+    total_area_km2: float
+
+
+def cellset_geometry(cells: CellsetView) -> CellsetGeometry:
+    # Memoized on the view, which the cache keeps per cellset_id, so repeat calls on the
+    # same handle skip the per-cell walk.
+    return cells.derived("geometry", _compute_geometry)
+
+
+def is_contiguous(cells: CellsetView) -> bool:
+    return cells.derived("contiguous", _compute_contiguous)
+
+
+def remember_geometry(
+    cells: CellsetView, geometry: CellsetGeometry, contiguous: bool | None = None
+) -> None:
+    # For tools that computed a summary some other way (grouped over many cellsets at once).
+    cells.derived("geometry", lambda _: geometry)
+    if contiguous is not None:
+        cells.derived("contiguous", lambda _: contiguous)
+
+
+def _packed(cells: CellsetView) -> NDArray[np.uint64]:
+    packed = cells.packed if len(cells) else None
+    if packed is None:
+        raise ValueError("Cells must be a non-empty set of valid H3 cell IDs.")
+    return packed
+
+
+def _compute_geometry(cells: CellsetView) -> CellsetGeometry:
+    indexes = _packed(cells)
+    resolutions = np.unique(cell_resolutions(indexes))
+    centers = cell_centers(indexes)
+    lats, lngs = centers[:, 0], centers[:, 1]
+    return CellsetGeometry(
+        resolution=int(resolutions[0]) if len(resolutions) == 1 else None,
+        center=(float(lats.mean()), float(lngs.mean())),
+        bounding_box=(float(lngs.min()), float(lats.min()), float(lngs.max()), float(lats.max())),
+        total_area_km2=float(cell_areas_km2(indexes).sum()),
+    )
+
+
+def _compute_contiguous(cells: CellsetView) -> bool:
+    labels = component_labels(DiskAdjacency.build(_packed(cells), 1))
+    return not labels.any()
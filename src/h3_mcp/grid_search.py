@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import chain
+import math
+from typing import Iterator
+
+import h3
+import h3.api.basic_int as h3_int
+import numpy as np
+from numpy.typing import NDArray
+
+from .cell_arrays import (
+    cell_base_cells,
+    cell_parents,
+    cell_resolutions,
+    empty_indexes,
+    member_mask,
+)
+
+# Nearest-destination results are parallel to the origins: the hop distance (-1 when no
+# destination was found) and the nearest destination. Ties go to the smallest index,
+# which is also the smallest cell string.
+NearestResult = tuple[NDArray[np.int64], NDArray[np.uint64]]
+# Local IJ coordinates of the origins and of the destinations, in one shared frame.
+LocalFrame = tuple[NDArray[np.int32], NDArray[np.int32]]
+
+_BFS_PREPASS_RADIUS = 4
+_MIN_INDEXED_DESTINATIONS = 64
+_BLOCK_ENTRIES = 1 << 22
+_PENTAGON_BASE_CELLS = np.array(
+    sorted(h3_int.get_base_cell_number(cell) for cell in h3_int.get_pentagons(0)), dtype=np.uint64
+)
+
+
+def grid_neighbors(
+    cells: NDArray[np.uint64], k: int = 1
+) -> tuple[NDArray[np.uint64], NDArray[np.int64]]:
+    # Returns every cell of each k-disk (the cell itself included) and the position of the
+    # cell it came from.
+    disks = [h3_int.grid_disk(cell, k) for cell in cells.tolist()]
+    sizes = np.fromiter(map(len, disks), dtype=np.int64, count=len(disks))
+    neighbors = np.fromiter(
+        chain.from_iterable(disks), dtype=np.uint64, count=int(sizes.sum())
+    )
+    owners = np.repeat(np.arange(len(cells), dtype=np.int64), sizes)
+    return neighbors, owners
+
+
+def nearest_within(
+    origins: NDArray[np.uint64],
+    destinations: NDArray[np.uint64],
+    max_distance: int | None,
+) -> NearestResult:
+    # Multi-source BFS from all destinations at once. On the grid graph a level-d cell only
+    # touches levels d-1, d and d+1, so excluding the previous two levels is enough to
+    # keep the walk moving outwards and memory stays proportional to one ring.
+    # Rings grow with the distance, not the input: once the walk has cost as many grid_disk
+    # calls as measuring every pair would, the origins still pending are measured pairwise.
+    budget = len(origins) * len(destinations)
+    if budget <= len(destinations):
+        return nearest_pairwise(origins, destinations, max_distance)
+    distances = np.full(len(origins), -1, dtype=np.int64)
+    nearest = np.zeros(len(origins), dtype=np.uint64)
+    previous = empty_indexes()
+    frontier = destinations
+    labels = destinations
+    remaining = len(origins)
+    distance = spent = 0
+    while True:
+        remaining -= _label_reached(origins, frontier, labels, distance, distances, nearest)
+        if not remaining or not len(frontier):
+            break
+        if max_distance is not None and distance >= max_distance:
+            break
+        spent += len(frontier)
+        if spent > budget:
+            pending = np.flatnonzero(distances < 0)
+            rest = nearest_pairwise(origins[pending], destinations, max_distance)
+            distances[pending], nearest[pending] = rest
+            break
+        distance += 1
+        cells, owners = grid_neighbors(frontier)
+        cell_labels = labels[owners]
+        fresh = ~(member_mask(cells, frontier) | member_mask(cells, previous))
+        cells = cells[fresh]
+        cell_labels = cell_labels[fresh]
+        order = np.lexsort((cell_labels, cells))
+        cells = cells[order]
+        cell_labels = cell_labels[order]
+        first = np.ones(len(cells), dtype=np.bool_)
+        first[1:] = cells[1:] != cells[:-1]
+        previous = frontier
+        frontier = cells[first]
+        labels = cell_labels[first]
+    return distances, nearest
+
+
+def _label_reached(
+    origins: NDArray[np.uint64],
+    level: NDArray[np.uint64],
+    labels: NDArray[np.uint64],
+    distance: int,
+    distances: NDArray[np.int64],
+    nearest: NDArray[np.uint64],
+) -> int:
+    if not len(level):
+        return 0
+    positions = np.searchsorted(level, origins)
+    positions[positions == len(level)] = 0
+    reached = (level[positions] == origins) & (distances < 0)
+    distances[reached] = distance
+    nearest[reached] = labels[positions[reached]]
+    return int(reached.sum())
+
+
+def nearest_pairwise(
+    origins: NDArray[np.uint64],
+    destinations: NDArray[np.uint64],
+    max_distance: int | None = None,
+) -> NearestResult:
+    distances = np.full(len(origins), -1, dtype=np.int64)
+    nearest = np.zeros(len(origins), dtype=np.uint64)
+    destination_list = destinations.tolist()
+    for position, origin in enumerate(origins.tolist()):
+        best = _closest(origin, destination_list, None)
+        if best is not None and (max_distance is None or best[0] <= max_distance):
+            distances[position], nearest[position] = best
+    return distances, nearest
+
+
+def nearest_indexed(
+    origins: NDArray[np.uint64], destinations: NDArray[np.uint64]
+) -> NearestResult:
+    # Unbounded search. A short BFS settles origins that sit among destinations; the rest
+    # go through parent buckets, visited in order of a proven lower bound until no
+    # unvisited bucket can hold anything closer than the best hit so far.
+    distances, nearest = nearest_within(origins, destinations, _BFS_PREPASS_RADIUS)
+    pending = np.flatnonzero(distances < 0)
+    if not len(pending):
+        return distances, nearest
+    resolution = int(cell_resolutions(destinations[:1])[0])
+    parent_resolution = _bucket_resolution(destinations, resolution)
+    if parent_resolution is None:
+        rest = nearest_pairwise(origins[pending], destinations)
+    else:
+        rest = _nearest_by_bucket(origins[pending], destinations, resolution, parent_resolution)
+    distances[pending], nearest[pending] = rest
+    return distances, nearest
+
+
+@dataclass(frozen=True)
+class _Buckets:
+    centers: list[int]
+    # Members sorted by hop distance from the bucket's center child, with those distances
+    # alongside. Members h3 cannot measure from the center are kept apart and always scanned.
+    members: list[list[int]]
+    member_hops: list[list[int]]
+    unmeasured: list[list[int]]
+
+    @classmethod
+    def build(
+        cls, cells: NDArray[np.uint64], resolution: int, parent_resolution: int
+    ) -> _Buckets:
+        parents = cell_parents(cells, parent_resolution)
+        order = np.argsort(parents, kind="stable")
+        keys, starts = np.unique(parents[order], return_index=True)
+        centers = [h3_int.cell_to_center_child(key, resolution) for key in keys.tolist()]
+        buckets = cls(centers=centers, members=[], member_hops=[], unmeasured=[])
+        for center, group in zip(centers, np.split(cells[order], starts[1:])):
+            measured: list[tuple[int, int]] = []
+            unmeasured: list[int] = []
+            for member in group.tolist():
+                hops = _grid_distance(center, member)
+                if hops is None:
+                    unmeasured.append(member)
+                else:
+                    measured.append((hops, member))
+            measured.sort()
+            buckets.members.append([member for _, member in measured])
+            buckets.member_hops.append([hops for hops, _ in measured])
+            buckets.unmeasured.append(unmeasured)
+        return buckets
+
+    def radius(self, bucket: int) -> float:
+        if self.unmeasured[bucket]:
+            return math.inf
+        return self.member_hops[bucket][-1]
+
+    def closest(
+        self, bucket: int, origin: int, best: tuple[int, int] | None
+    ) -> tuple[int, int] | None:
+        # hops(o, d) >= |hops(o, c) - hops(c, d)|, so only members whose distance from the
+        # center c lies within best of the origin's own can win (ties included).
+        best = _closest(origin, self.unmeasured[bucket], best)
+        members = self.members[bucket]
+        member_hops = self.member_hops[bucket]
+        center_hops = _grid_distance(origin, self.centers[bucket])
+        if not members or center_hops is None:
+            return _closest(origin, members, best)
+        if best is None:
+            # Seed with the member at the origin's own distance from the center.
+            pivot = min(bisect_left(member_hops, center_hops), len(members) - 1)
+            best = _closest(origin, members[pivot : pivot + 1], None)
+            if best is None:
+                return _closest(origin, members, None)
+        low = bisect_left(member_hops, center_hops - best[0])
+        high = bisect_right(member_hops, center_hops + best[0])
+        for position in range(low, high):
+            if abs(center_hops - member_hops[position]) > best[0]:
+                continue
+            hops = _grid_distance(origin, members[position])
+            if hops is not None and (hops, members[position]) < best:
+                best = (hops, members[position])
+        return best
+
+
+def _nearest_by_bucket(
+    origins: NDArray[np.uint64],
+    destinations: NDArray[np.uint64],
+    resolution: int,
+    parent_resolution: int,
+) -> NearestResult:
+    # grid_distance is a shortest-path metric, so for an origin o, a destination d and the
+    # center c of d's bucket, hops(o, d) >= hops(o, c) - radius(bucket). The same bound
+    # lifted to origin buckets orders the destination buckets once per origin bucket.
+    targets = _Buckets.build(destinations, resolution, parent_resolution)
+    sources = _Buckets.build(origins, resolution, parent_resolution)
+    target_radii = [targets.radius(bucket) for bucket in range(len(targets.centers))]
+    position_of = {origin: position for position, origin in enumerate(origins.tolist())}
+    distances = np.full(len(origins), -1, dtype=np.int64)
+    nearest = np.zeros(len(origins), dtype=np.uint64)
+    for source in range(len(sources.centers)):
+        source_center = sources.centers[source]
+        source_radius = sources.radius(source)
+        bounds = [
+            _lower_bound(_grid_distance(source_center, center), source_radius + radius)
+            for center, radius in zip(targets.centers, target_radii)
+        ]
+        order = sorted(range(len(bounds)), key=bounds.__getitem__)
+        for origin in sources.members[source] + sources.unmeasured[source]:
+            best: tuple[int, int] | None = None
+            for bucket in order:
+                if best is not None and bounds[bucket] > best[0]:
+                    break
+                best = targets.closest(bucket, origin, best)
+            if best is not None:
+                position = position_of[origin]
+                distances[position], nearest[position] = best
+    return distances, nearest
+
+
+def _bucket_resolution(destinations: NDArray[np.uint64], resolution: int) -> int | None:
+    # The finest parent resolution averaging at least 8 destinations per bucket; finer
+    # buckets multiply the bucket-pair bounds, coarser ones widen the member scans.
+    if len(destinations) < _MIN_INDEXED_DESTINATIONS or resolution == 0:
+        return None
+    target = len(destinations) // 8
+    for parent_resolution in range(resolution - 1, -1, -1):
+        if len(np.unique(cell_parents(destinations, parent_resolution))) <= target:
+            return parent_resolution
+    return 0
+
+
+def _lower_bound(hops: int | None, slack: float) -> float:
+    return 0.0 if hops is None else max(0.0, hops - slack)
+
+
+def _closest(
+    origin: int, destinations: list[int], best: tuple[int, int] | None
+) -> tuple[int, int] | None:
+    # Compares (hops, destination) so ties go to the smallest destination. Pairs h3 cannot
+    # measure (far apart across icosahedron faces) are skipped.
+    for destination in destinations:
+        hops = _grid_distance(origin, destination)
+        if hops is not None and (best is None or (hops, destination) < best):
+            best = (hops, destination)
+    return best
+
+
+def _grid_distance(cell_a: int, cell_b: int) -> int | None:
+    try:
+        return int(h3_int.grid_distance(cell_a, cell_b))
+    except h3.H3FailedError:
+        return None
+
+
+def distance_blocks(
+    origins: NDArray[np.uint64],
+    destinations: NDArray[np.uint64],
+    block_entries: int = _BLOCK_ENTRIES,
+) -> Iterator[tuple[int, NDArray[np.int32]]]:
+    # Yields (first row, rows x destinations hop distances), -1 where h3 cannot measure a
+    # pair.
+    return frame_distance_blocks(
+        local_frame(origins, destinations), origins, destinations, block_entries
+    )
+
+
+def local_frame(
+    origins: NDArray[np.uint64], destinations: NDArray[np.uint64]
+) -> LocalFrame | None:
+    # None when the cells do not fit one local IJ frame; distances then need grid_distance
+    # for every pair.
+    anchor = int(origins[0]) if len(origins) else 0
+    origin_ij = local_ij(anchor, origins)
+    if origin_ij is None:
+        return None
+    destination_ij = local_ij(anchor, destinations)
+    if destination_ij is None:
+        return None
+    return origin_ij, destination_ij
+
+
+def frame_distance_blocks(
+    frame: LocalFrame | None,
+    origins: NDArray[np.uint64],
+    destinations: NDArray[np.uint64],
+    block_entries: int = _BLOCK_ENTRIES,
+) -> Iterator[tuple[int, NDArray[np.int32]]]:
+    # In a local IJ frame the hop distance is max(di, dj, 0) - min(di, dj, 0), so each block
+    # is a single broadcast; without one, every pair is measured separately.
+    rows_per_block = max(1, block_entries // max(1, len(destinations)))
+    for start in range(0, len(origins), rows_per_block):
+        stop = min(start + rows_per_block, len(origins))
+        if frame is None:
+            yield start, _pairwise_block(origins[start:stop], destinations)
+            continue
+        origin_ij, destination_ij = frame
+        di = destination_ij[None, :, 0] - origin_ij[start:stop, None, 0]
+        dj = destination_ij[None, :, 1] - origin_ij[start:stop, None, 1]
+        zero = np.zeros_like(di)
+        hops = np.maximum(np.maximum(di, dj), zero) - np.minimum(np.minimum(di, dj), zero)
+        yield start, hops.astype(np.int32)
+
+
+def local_ij(anchor: int, cells: NDArray[np.uint64]) -> NDArray[np.int32] | None:
+    # None when any cell lies outside the anchor's frame (other faces) or inside a pentagon
+    # base cell, where h3 still converts but the frame is warped and IJ steps no longer
+    # match grid adjacency.
+    if member_mask(cell_base_cells(cells), _PENTAGON_BASE_CELLS).any():
+        return None
+    try:
+        coordinates = [h3_int.cell_to_local_ij(anchor, cell) for cell in cells.tolist()]
+    except h3.H3BaseException:
+        return None
+    return np.array(coordinates, dtype=np.int32).reshape(len(cells), 2)
+
+
+def _pairwise_block(
+    origins: NDArray[np.uint64], destinations: NDArray[np.uint64]
+) -> NDArray[np.int32]:
+    destination_list = destinations.tolist()
+    block = np.empty((len(origins), len(destinations)), dtype=np.int32)
+    for row, origin in enumerate(origins.tolist()):
+        for column, destination in enumerate(destination_list):
+            hops = _grid_distance(origin, destination)
+            block[row, column] = -1 if hops is None else hops
+    return block
@@ -1,8 +1,17 @@
 from __future__ import annotations
 
-from typing import Any, Iterable
+import functools
+from typing import Iterable
 
 import h3
+import h3.api.basic_int as h3_int
+import numpy as np
+from numpy.typing import NDArray
+
+from .geojson_utils import PreparedGeometry
+
+
+_cell_area_km2 = functools.partial(h3_int.cell_area, unit="km^2")
 
 
 def latlng_to_cell(lat: float, lng: float, res: int) -> str:
@@ -33,6 +42,16 @@ def cell_to_latlng(cell: str) -> tuple[float, float]:
     return h3.cell_to_latlng(cell)
 
 
+def cell_centers(indexes: NDArray[np.uint64]) -> NDArray[np.float64]:
+    # (lat, lng) rows for packed cells.
+    centers = np.fromiter(
+        (coordinate for cell in indexes.tolist() for coordinate in h3_int.cell_to_latlng(cell)),
+        dtype=np.float64,
+        count=2 * len(indexes),
+    )
+    return centers.reshape(len(indexes), 2)
+
+
 def cell_to_boundary(cell: str) -> list[tuple[float, float]]:
     return h3.cell_to_boundary(cell)
 
@@ -41,6 +60,14 @@ def cell_area_km2(cell: str) -> float:
     return float(h3.cell_area(cell, unit="km^2"))
 
 
+def cell_areas_km2(indexes: NDArray[np.uint64]) -> NDArray[np.float64]:
+    # Exact spherical area of every packed cell. h3 has no array API for areas, so this is
+    # still one h3_int.cell_area call per cell; packing only saves the string conversions.
+    return np.fromiter(
+        map(_cell_area_km2, indexes.tolist()), dtype=np.float64, count=len(indexes)
+    )
+
+
 def average_edge_length_km(res: int) -> float:
     return float(h3.average_hexagon_edge_length(res, unit="km"))
 
@@ -49,51 +76,36 @@ def compact_cells(cells: Iterable[str]) -> list[str]:
     return list(h3.compact_cells(list(cells)))
 
 
-def _latlng_ring_from_geojson(ring: list[list[float]]) -> list[tuple[float, float]]:
-    return [(lat, lng) for lng, lat in ring]
+def points_to_cells(geometry: PreparedGeometry, res: int) -> list[str]:
+    return [latlng_to_cell(lat, lng, res) for lng, lat in geometry.coords.tolist()]
 
 
-def _latlng_poly_from_geojson(geometry: dict[str, Any]) -> h3.LatLngPoly:
-    coords = geometry.get("coordinates", [])
-    outer = _latlng_ring_from_geojson(coords[0])
-    holes = [_latlng_ring_from_geojson(ring) for ring in coords[1:]]
+def _latlng_poly(rings: list[NDArray[np.float64]]) -> h3.LatLngPoly:
+    if not rings:
+        raise ValueError("Polygon geometry has no rings.")
+    outer, *holes = (ring[:, ::-1].tolist() for ring in rings)
     return h3.LatLngPoly(outer, *holes)
 
 
-def _latlng_multipoly_from_geojson(geometry: dict[str, Any]) -> h3.LatLngMultiPoly:
-    polys = []
-    for polygon in geometry.get("coordinates", []):
-        outer = _latlng_ring_from_geojson(polygon[0])
-        holes = [_latlng_ring_from_geojson(ring) for ring in polygon[1:]]
-        polys.append(h3.LatLngPoly(outer, *holes))
-    return h3.LatLngMultiPoly(*polys)
-
-
-def polygon_to_cells(geometry: dict[str, Any], res: int) -> list[str]:
-    geom_type = geometry.get("type")
-    if geom_type == "Polygon":
-        shape = _latlng_poly_from_geojson(geometry)
-        return list(h3.polygon_to_cells(shape, res))
-    if geom_type == "MultiPolygon":
-        shape = _latlng_multipoly_from_geojson(geometry)
-        return list(h3.polygon_to_cells(shape, res))
-    raise ValueError(f"Unsupported polygon geometry type: {geom_type}")
-
-
-def line_to_cells(geometry: dict[str, Any], res: int) -> list[str]:
-    geom_type = geometry.get("type")
-    if geom_type == "LineString":
-        line_strings = [geometry.get("coordinates", [])]
-    elif geom_type == "MultiLineString":
-        line_strings = geometry.get("coordinates", [])
+def polygon_to_cells(geometry: PreparedGeometry, res: int) -> list[str]:
+    if geometry.geom_type == "Polygon":
+        shape: h3.H3Shape = _latlng_poly(geometry.polygons()[0])
+    elif geometry.geom_type == "MultiPolygon":
+        shape = h3.LatLngMultiPoly(*(_latlng_poly(rings) for rings in geometry.polygons()))
     else:
-        raise ValueError(f"Unsupported line geometry type: {geom_type}")
+        raise ValueError(f"Unsupported polygon geometry type: {geometry.geom_type}")
+    return list(h3.polygon_to_cells(shape, res))
+
+
+def line_to_cells(geometry: PreparedGeometry, res: int) -> list[str]:
+    if geometry.geom_type not in {"LineString", "MultiLineString"}:
+        raise ValueError(f"Unsupported line geometry type: {geometry.geom_type}")
 
     cells: set[str] = set()
-    for line in line_strings:
+    for line in geometry.rings():
         if len(line) == 0:
             continue
-        line_cells = [latlng_to_cell(lat, lng, res) for lng, lat in line]
+        line_cells = [latlng_to_cell(lat, lng, res) for lng, lat in line.tolist()]
         for start, end in zip(line_cells, line_cells[1:]):
             cells.update(h3.grid_path_cells(start, end))
         cells.update(line_cells)
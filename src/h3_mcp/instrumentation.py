@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+import cProfile
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import functools
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+import pydantic_core
+
+# Upper bounds in seconds; calls slower than the last bound land in the overflow bucket.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class ToolCall:
+    input_cells: int = 0
+    output_cells: int = 0
+
+
+@dataclass
+class ToolStats:
+    calls: int = 0
+    errors: int = 0
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    input_cells: int = 0
+    output_cells: int = 0
+    response_bytes: int = 0
+
+
+class ToolMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tools: dict[str, ToolStats] = {}
+
+    def record(
+        self, name: str, seconds: float, call: ToolCall, response_bytes: int, failed: bool
+    ) -> None:
+        with self._lock:
+            stats = self._tools.setdefault(name, ToolStats())
+            stats.calls += 1
+            stats.errors += int(failed)
+            stats.latency_sum += seconds
+            stats.latency_max = max(stats.latency_max, seconds)
+            stats.latency_buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.input_cells += call.input_cells
+            stats.output_cells += call.output_cells
+            stats.response_bytes += response_bytes
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "latency_seconds_sum": stats.latency_sum,
+                    "latency_seconds_max": stats.latency_max,
+                    "latency_buckets": {
+                        _bucket_label(index): count
+                        for index, count in enumerate(stats.latency_buckets)
+                    },
+                    "input_cells": stats.input_cells,
+                    "output_cells": stats.output_cells,
+                    "response_bytes": stats.response_bytes,
+                }
+                for name, stats in sorted(self._tools.items())
+            }
+
+    def prometheus(self) -> str:
+        with self._lock:
+            tools = sorted(self._tools.items())
+        lines = ["# TYPE h3_mcp_tool_latency_seconds histogram"]
+        for name, stats in tools:
+            cumulative = 0
+            for index, count in enumerate(stats.latency_buckets):
+                cumulative += count
+                lines.append(
+                    f'h3_mcp_tool_latency_seconds_bucket{{tool="{name}",le="{_bucket_label(index)}"}}'
+                    f" {cumulative}"
+                )
+            lines.append(f'h3_mcp_tool_latency_seconds_sum{{tool="{name}"}} {stats.latency_sum}')
+            lines.append(f'h3_mcp_tool_latency_seconds_count{{tool="{name}"}} {stats.calls}')
+        for metric, attr in _PROMETHEUS_COUNTERS:
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in tools:
+                lines.append(f'{metric}{{tool="{name}"}} {getattr(stats, attr)}')
+        return "\n".join(lines) + "\n"
+
+
+_PROMETHEUS_COUNTERS = (
+    ("h3_mcp_tool_errors_total", "errors"),
+    ("h3_mcp_tool_input_cells_total", "input_cells"),
+    ("h3_mcp_tool_output_cells_total", "output_cells"),
+    ("h3_mcp_tool_response_bytes_total", "response_bytes"),
+)
+
+
+def _bucket_label(index: int) -> str:
+    return "+Inf" if index == len(LATENCY_BUCKETS) else str(LATENCY_BUCKETS[index])
+
+
+_current_call: ContextVar[ToolCall | None] = ContextVar("h3_mcp_tool_call", default=None)
+_tool_metrics = ToolMetrics()
+_profile_dir: Path | None = None
+_profile_threshold_seconds = 1.0
+# Measuring response bytes serializes every result a second time, so it is opt-in.
+_count_response_bytes = False
+
+
+def get_tool_metrics() -> ToolMetrics:
+    return _tool_metrics
+
+
+def set_tool_metrics(metrics: ToolMetrics) -> None:
+    global _tool_metrics
+    _tool_metrics = metrics
+
+
+def set_profiling(directory: Path | None, threshold_seconds: float = 1.0) -> None:
+    global _profile_dir, _profile_threshold_seconds
+    if threshold_seconds < 0:
+        raise ValueError("threshold_seconds must be >= 0.")
+    if directory is not None:
+        directory.mkdir(parents=True, exist_ok=True)
+    _profile_dir = directory
+    _profile_threshold_seconds = threshold_seconds
+
+
+def set_response_bytes(enabled: bool) -> None:
+    global _count_response_bytes
+    _count_response_bytes = enabled
+
+
+def record_input_cells(count: int) -> None:
+    call = _current_call.get()
+    if call is not None:
+        call.input_cells += count
+
+
+def record_output_cells(count: int) -> None:
+    call = _current_call.get()
+    if call is not None:
+        call.output_cells += count
+
+
+def instrument_tool(fn: F) -> F:
+    # functools.wraps keeps __wrapped__, so FastMCP still derives the input schema from fn.
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        call = ToolCall()
+        token = _current_call.set(call)
+        profile_dir = _profile_dir
+        profiler = cProfile.Profile() if profile_dir is not None else None
+        failed = True
+        result: Any = None
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                result = profiler.runcall(fn, *args, **kwargs)
+            else:
+                result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_call.reset(token)
+            response_bytes = 0
+            if _count_response_bytes and not failed:
+                response_bytes = len(pydantic_core.to_json(result))
+            get_tool_metrics().record(name, elapsed, call, response_bytes, failed)
+            if profiler is not None and profile_dir is not None:
+                if elapsed >= _profile_threshold_seconds:
+                    _dump_profile(profiler, profile_dir, name, elapsed)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _dump_profile(profiler: cProfile.Profile, directory: Path, name: str, seconds: float) -> None:
+    stamp = f"{time.strftime('%Y%m%dT%H%M%S')}-{time.monotonic_ns()}"
+    profiler.dump_stats(directory / f"{name}-{stamp}-{seconds * 1000:.0f}ms.prof")
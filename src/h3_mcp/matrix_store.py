@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
+import io
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+@dataclass(frozen=True)
+class DistanceMatrix:
+    """Hop distances from the origins cellset (rows) to the destinations cellset.
+
+    Rows and columns follow the sorted order of the two cellsets. For a full matrix,
+    `distances[i, j]` is the hop distance to destination j. For a top-k matrix, `columns`
+    holds the destination positions of each row's k nearest, closest first. -1 marks
+    pairs beyond max_distance or that h3 cannot measure.
+    """
+
+    origins_cellset_id: str
+    destinations_cellset_id: str
+    distances: NDArray[np.int16]
+    columns: NDArray[np.int32] | None = None
+
+    @property
+    def nbytes(self) -> int:
+        columns = 0 if self.columns is None else self.columns.nbytes
+        return int(self.distances.nbytes + columns)
+
+    def to_bytes(self) -> bytes:
+        arrays: dict[str, Any] = {
+            "distances": self.distances,
+            "origins_cellset_id": np.array(self.origins_cellset_id),
+            "destinations_cellset_id": np.array(self.destinations_cellset_id),
+        }
+        if self.columns is not None:
+            arrays["columns"] = self.columns
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+
+def make_matrix_id(*parts: object) -> str:
+    digest = sha256("\n".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f"matrix_{digest}"
+
+
+class MatrixStore:
+    """Short-lived, byte-bounded LRU of computed distance matrices."""
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: int | None = 3600,
+        time_fn: Callable[[], float] | None = None,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1.")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0 when set.")
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._time_fn = time_fn or time.time
+        self._store: OrderedDict[str, tuple[DistanceMatrix, float]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, matrix_id: str, matrix: DistanceMatrix) -> None:
+        expires_at = float("inf")
+        if self._ttl_seconds is not None:
+            expires_at = self._time_fn() + self._ttl_seconds
+        with self._lock:
+            self._pop(matrix_id)
+            self._store[matrix_id] = (matrix, expires_at)
+            self._nbytes += matrix.nbytes
+            # The newest matrix stays even when it alone exceeds the budget.
+            while self._nbytes > self._max_bytes and len(self._store) > 1:
+                self._pop(next(iter(self._store)))
+
+    def get(self, matrix_id: str) -> DistanceMatrix | None:
+        with self._lock:
+            item = self._store.get(matrix_id)
+            if item is None:
+                return None
+            matrix, expires_at = item
+            if expires_at <= self._time_fn():
+                self._pop(matrix_id)
+                return None
+            self._store.move_to_end(matrix_id)
+            return matrix
+
+    def _pop(self, matrix_id: str) -> None:
+        item = self._store.pop(matrix_id, None)
+        if item is not None:
+            self._nbytes -= item[0].nbytes
@@ -99,8 +99,20 @@ class LabeledCellset(StrictModel):
 
 
 class H3GeoToCellsInput(CellOutputControls):
-    geojson: dict[str, Any] = Field(
-        description="GeoJSON FeatureCollection or Feature."
+    geojson: dict[str, Any] | None = Field(
+        default=None,
+        description="GeoJSON FeatureCollection or Feature.",
+    )
+    geojson_seq_path: str | None = Field(
+        default=None,
+        description=(
+            "Path under H3_MCP_DATA_DIR to a newline-delimited GeoJSON (GeoJSONSeq) file "
+            "of Features, streamed with bounded memory."
+        ),
+    )
+    upload_id: str | None = Field(
+        default=None,
+        description="Handle from h3_upload_features for a GeoJSONSeq staged in chunks.",
     )
     cache_cells: bool = Field(
         default=True,
@@ -108,6 +120,13 @@ class H3GeoToCellsInput(CellOutputControls):
     )
     resolution: Resolution
 
+    @model_validator(mode="after")
+    def _require_one_source(self) -> "H3GeoToCellsInput":
+        sources = [self.geojson, self.geojson_seq_path, self.upload_id]
+        if sum(source is not None for source in sources) != 1:
+            raise ValueError("Provide exactly one of geojson, geojson_seq_path or upload_id.")
+        return self
+
 
 class H3GeoToCellsOutput(StrictModel):
     cellset_id: str | None = None
@@ -119,6 +138,23 @@ class H3GeoToCellsOutput(StrictModel):
     summary: str
 
 
+class H3UploadFeaturesInput(StrictModel):
+    features: str = Field(
+        description="Chunk of newline-delimited GeoJSON Features (GeoJSONSeq).",
+    )
+    upload_id: str | None = Field(
+        default=None,
+        description="Existing upload to append to; omit to start a new upload.",
+    )
+
+
+class H3UploadFeaturesOutput(StrictModel):
+    upload_id: str
+    chunk_feature_count: int
+    total_bytes: int
+    summary: str
+
+
 class H3KRingInput(CellOutputControls):
     cellset: CellsetRef
     k: KRing
@@ -362,6 +398,14 @@ class H3DistanceMatrixInput(ListOutputControls):
     origins: LabeledCellset
     destinations: LabeledCellset
     max_distance: int | None = Field(default=None, ge=1)
+    matrix: Literal["nearest", "full", "top_k"] = Field(
+        default="nearest",
+        description=(
+            "nearest: one pair per origin. full/top_k: store an int16 hop matrix (all "
+            "destinations, or the top_k nearest per origin) and return its matrix_id."
+        ),
+    )
+    top_k: int = Field(default=5, ge=1, description="Destinations per origin for matrix='top_k'.")
 
 
 class DistancePair(StrictModel):
@@ -376,4 +420,9 @@ class H3DistanceMatrixOutput(StrictModel):
     max_distance: int
     unreachable_count: int
     pairs: list[DistancePair] | None = None
+    matrix_id: str | None = None
+    matrix_uri: str | None = None
+    matrix_shape: list[int] | None = None
+    origins_cellset_id: str | None = None
+    destinations_cellset_id: str | None = None
     summary: str
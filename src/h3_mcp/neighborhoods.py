@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .grid_search import grid_neighbors, local_ij
+
+_CHUNK_CELLS = 1 << 16
+_DENSE_GRID_FACTOR = 16
+
+
+@dataclass(frozen=True)
+class DiskAdjacency:
+    """k-disk neighbourhoods of a sorted cell array, restricted to the array, in CSR form.
+
+    The members of row i are `indices[indptr[i]:indptr[i + 1]]`, positions into the cell
+    array in ascending order. Every row holds at least the cell itself.
+    """
+
+    indptr: NDArray[np.int64]
+    indices: NDArray[np.int64]
+
+    @classmethod
+    def build(cls, cells: NDArray[np.uint64], k: int) -> DiskAdjacency:
+        if not len(cells):
+            return cls(indptr=np.zeros(1, dtype=np.int64), indices=np.empty(0, dtype=np.int64))
+        coordinates = local_ij(int(cells[0]), cells)
+        if coordinates is None:
+            return cls._build_from_disks(cells, k)
+        return cls._build_from_local_ij(coordinates, k)
+
+    @classmethod
+    def _build_from_local_ij(cls, coordinates: NDArray[np.int32], k: int) -> DiskAdjacency:
+        # In one local IJ frame the k-disk is a fixed set of (di, dj) offsets, so each
+        # offset is one vectorized lookup over all cells instead of a grid_disk per cell.
+        i = coordinates[:, 0].astype(np.int64)
+        j = coordinates[:, 1].astype(np.int64)
+        i -= i.min() - k
+        j -= j.min() - k
+        width = int(j.max()) + k + 1
+        keys = i * width + j
+        offsets = [di * width + dj for di, dj in _disk_offsets(k)]
+        table = np.empty((len(keys), len(offsets)), dtype=np.int64)
+        size = (int(i.max()) + k + 1) * width
+        if size <= _DENSE_GRID_FACTOR * len(keys):
+            # Compact sets (rasters, polygon fills) get a dense key -> position grid, so
+            # each lookup is a plain gather.
+            grid = np.full(size, -1, dtype=np.int64)
+            grid[keys] = np.arange(len(keys), dtype=np.int64)
+            for column, offset in enumerate(offsets):
+                table[:, column] = grid[keys + offset]
+        else:
+            key_order = np.argsort(keys)
+            sorted_keys = keys[key_order]
+            for column, offset in enumerate(offsets):
+                targets = keys + offset
+                positions = np.searchsorted(sorted_keys, targets)
+                positions[positions == len(keys)] = 0
+                table[:, column] = np.where(
+                    sorted_keys[positions] == targets, key_order[positions], -1
+                )
+        table.sort(axis=1)
+        present = table >= 0
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(present.sum(axis=1), out=indptr[1:])
+        return cls(indptr=indptr, indices=table[present])
+
+    @classmethod
+    def _build_from_disks(cls, cells: NDArray[np.uint64], k: int) -> DiskAdjacency:
+        # Sets h3 cannot place in one IJ frame (other faces, pentagon distortion). Disks are
+        # expanded a chunk of cells at a time so only members inside the set are kept.
+        counts = np.zeros(len(cells), dtype=np.int64)
+        chunks: list[NDArray[np.int64]] = []
+        for start in range(0, len(cells), _CHUNK_CELLS):
+            neighbors, owners = grid_neighbors(cells[start : start + _CHUNK_CELLS], k)
+            positions = np.searchsorted(cells, neighbors)
+            positions[positions == len(cells)] = 0
+            present = cells[positions] == neighbors
+            owners = owners[present]
+            positions = positions[present]
+            order = np.lexsort((positions, owners))
+            chunks.append(positions[order])
+            counts[start : start + _CHUNK_CELLS] = np.bincount(
+                owners, minlength=min(_CHUNK_CELLS, len(cells) - start)
+            )
+        indptr = np.zeros(len(cells) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(indptr=indptr, indices=np.concatenate(chunks).astype(np.int64, copy=False))
+
+    @property
+    def counts(self) -> NDArray[np.int64]:
+        return np.diff(self.indptr)
+
+    def sums(self, values: NDArray[np.float64]) -> NDArray[np.float64]:
+        return self._row_sums(values[self.indices])
+
+    def moments(
+        self, values: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        # Local means and population variances. The variance sums squared deviations from
+        # each row's mean rather than using E[x^2] - mean^2, which cancels catastrophically
+        # on flat neighbourhoods and turns rounding noise into large z-scores.
+        counts = self.counts
+        means = self.sums(values) / counts
+        deviations = values[self.indices] - np.repeat(means, counts)
+        return means, self._row_sums(deviations * deviations) / counts
+
+    def _row_sums(self, entries: NDArray[np.float64]) -> NDArray[np.float64]:
+        # A sparse matrix-vector product with an all-ones matrix. reduceat needs non-empty
+        # rows, which every row is.
+        if not len(entries):
+            return np.zeros(len(self.indptr) - 1, dtype=np.float64)
+        return np.add.reduceat(entries, self.indptr[:-1])
+
+
+def _disk_offsets(k: int) -> list[tuple[int, int]]:
+    # IJ offsets within k hops: max(di, dj, 0) - min(di, dj, 0) <= k.
+    return [
+        (di, dj)
+        for di in range(-k, k + 1)
+        for dj in range(-k, k + 1)
+        if max(di, dj, 0) - min(di, dj, 0) <= k
+    ]
+
+
+def component_labels(adjacency: DiskAdjacency) -> NDArray[np.int64]:
+    # Vectorized union-find (Shiloach-Vishkin style): every edge hooks the larger of its two
+    # roots under the smaller, then pointer jumping flattens the trees. Parents only ever
+    # decrease and never exceed their own position, so the forest stays acyclic, and each
+    # cell ends up labelled with the smallest position in its component.
+    parent = np.arange(len(adjacency.indptr) - 1, dtype=np.int64)
+    rows = np.repeat(parent, adjacency.counts)
+    columns = adjacency.indices
+    while True:
+        roots_a = parent[rows]
+        roots_b = parent[columns]
+        pending = roots_a != roots_b
+        if not pending.any():
+            return parent
+        np.minimum.at(parent, roots_a[pending], roots_b[pending])
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+
+from ..runtime import get_cache
+
+_PROMETHEUS_COUNTERS = (
+    "hits",
+    "misses",
+    "expired_lookups",
+    "backend_hits",
+    "evictions",
+    "expirations",
+    "puts",
+    "repeat_puts",
+    "inline_cellsets",
+)
+_PROMETHEUS_GAUGES = ("items", "cells", "nbytes")
+
+
+def cache_stats() -> str:
+    return json.dumps(get_cache().stats(), indent=2)
+
+
+def cache_stats_prometheus() -> str:
+    stats = get_cache().stats(largest=0)
+    lines: list[str] = []
+    for name in _PROMETHEUS_COUNTERS:
+        metric = f"h3_mcp_cache_{name}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {stats[name]}"]
+    for name in _PROMETHEUS_GAUGES:
+        metric = f"h3_mcp_cache_{name}"
+        lines += [f"# TYPE {metric} gauge", f"{metric} {stats[name]}"]
+    return "\n".join(lines) + "\n"
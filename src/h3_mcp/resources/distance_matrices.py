@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from ..runtime import get_matrix_store
+
+
+def distance_matrix(matrix_id: str) -> bytes:
+    # An .npz archive: int16 `distances`, int32 `columns` for top-k matrices, and the ids
+    # of the origin and destination cellsets that order the rows and columns.
+    matrix = get_matrix_store().get(matrix_id)
+    if matrix is None:
+        raise ValueError(f"Unknown or expired matrix_id: {matrix_id}")
+    return matrix.to_bytes()
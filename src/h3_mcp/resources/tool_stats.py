@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import json
+
+from ..instrumentation import get_tool_metrics
+
+
+def tool_stats() -> str:
+    return json.dumps(get_tool_metrics().stats(), indent=2)
+
+
+def tool_stats_prometheus() -> str:
+    return get_tool_metrics().prometheus()
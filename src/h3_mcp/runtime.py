@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
+from pathlib import Path
+
 from .cache import CellsetCache
+from .matrix_store import MatrixStore
+from .uploads import UploadStore
+
+DEFAULT_INDEX_CHUNK_SIZE = 256
 
 _cache: CellsetCache = CellsetCache()
+_index_executor: Executor | None = None
+_index_chunk_size: int = DEFAULT_INDEX_CHUNK_SIZE
+_upload_store: UploadStore = UploadStore()
+_data_dir: Path | None = None
+_matrix_store: MatrixStore = MatrixStore()
 
 
 def get_cache() -> CellsetCache:
@@ -12,3 +24,48 @@ def get_cache() -> CellsetCache:
 def set_cache(cache: CellsetCache) -> None:
     global _cache
     _cache = cache
+
+
+def get_index_executor() -> Executor | None:
+    return _index_executor
+
+
+def get_index_chunk_size() -> int:
+    return _index_chunk_size
+
+
+def set_index_executor(
+    executor: Executor | None, chunk_size: int = DEFAULT_INDEX_CHUNK_SIZE
+) -> None:
+    global _index_executor, _index_chunk_size
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1.")
+    _index_executor = executor
+    _index_chunk_size = chunk_size
+
+
+def get_upload_store() -> UploadStore:
+    return _upload_store
+
+
+def set_upload_store(store: UploadStore) -> None:
+    global _upload_store
+    _upload_store = store
+
+
+def get_data_dir() -> Path | None:
+    return _data_dir
+
+
+def set_data_dir(data_dir: Path | None) -> None:
+    global _data_dir
+    _data_dir = data_dir
+
+
+def get_matrix_store() -> MatrixStore:
+    return _matrix_store
+
+
+def set_matrix_store(store: MatrixStore) -> None:
+    global _matrix_store
+    _matrix_store = store
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import os
 from pathlib import Path
 import sys
 from typing import Literal
 
+import anyio
+import anyio.to_thread
 from dotenv import load_dotenv
 from mcp.server.auth.provider import AccessToken
 from mcp.server.auth.settings import AuthSettings
@@ -17,7 +21,28 @@ if __package__ in (None, ""):
     if str(project_src) not in sys.path:
         sys.path.insert(0, str(project_src))
 
+from h3_mcp.cache import CellsetCache
+from h3_mcp.cellset_store import CellsetBackend, DiskCellsetStore, SqliteCellsetStore
+from h3_mcp.dispatch import (
+    DEFAULT_INLINE_CELL_LIMIT,
+    DEFAULT_TOOL_CONCURRENCY,
+    DEFAULT_TOOL_THREADS,
+    ToolDispatcher,
+)
+from h3_mcp.instrumentation import instrument_tool, set_profiling, set_response_bytes
+from h3_mcp.resources.cache_stats import cache_stats, cache_stats_prometheus
+from h3_mcp.resources.distance_matrices import distance_matrix
 from h3_mcp.resources.resolution import resolution_guide
+from h3_mcp.resources.tool_stats import tool_stats, tool_stats_prometheus
+from h3_mcp.runtime import (
+    DEFAULT_INDEX_CHUNK_SIZE,
+    get_cache,
+    get_upload_store,
+    set_cache,
+    set_data_dir,
+    set_index_executor,
+    set_upload_store,
+)
 from h3_mcp.tools.analysis import h3_aggregate, h3_distance_matrix, h3_find_hotspots
 from h3_mcp.tools.comparison import h3_compare_many, h3_compare_sets
 from h3_mcp.tools.components import h3_connected_components
@@ -26,6 +51,8 @@ from h3_mcp.tools.hierarchy import h3_change_resolution
 from h3_mcp.tools.indexing import h3_geo_to_cells
 from h3_mcp.tools.neighbors import h3_k_ring
 from h3_mcp.tools.stats import h3_cell_stats
+from h3_mcp.tools.uploads import h3_upload_features
+from h3_mcp.uploads import UploadStore
 
 load_dotenv()
 
@@ -37,6 +64,50 @@ transport: Literal["stdio", "sse", "streamable-http"] = _raw_transport  # type:
 host = os.environ.get("H3_MCP_HOST", "127.0.0.1")
 port = int(os.environ.get("H3_MCP_PORT", "8000"))
 api_key = os.environ.get("H3_MCP_API_KEY", "")
+index_workers = int(os.environ.get("H3_MCP_INDEX_WORKERS", "0"))
+index_chunk_size = int(os.environ.get("H3_MCP_INDEX_CHUNK_SIZE", str(DEFAULT_INDEX_CHUNK_SIZE)))
+if index_workers > 1:
+    # Workers start from a forkserver: the first submit comes from a tool thread while the
+    # event loop, other tool threads and any SQLite connection are live, and forking such a
+    # process can deadlock the children.
+    index_context = multiprocessing.get_context("forkserver")
+    set_index_executor(
+        ProcessPoolExecutor(max_workers=index_workers, mp_context=index_context),
+        index_chunk_size,
+    )
+upload_max_bytes = int(os.environ.get("H3_MCP_UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024)))
+upload_ttl_seconds = int(os.environ.get("H3_MCP_UPLOAD_TTL_SECONDS", "3600")) or None
+set_upload_store(UploadStore(max_bytes=upload_max_bytes, ttl_seconds=upload_ttl_seconds))
+data_dir = os.environ.get("H3_MCP_DATA_DIR", "")
+if data_dir:
+    set_data_dir(Path(data_dir))
+cache_dir = os.environ.get("H3_MCP_CACHE_DIR", "")
+cache_sqlite = os.environ.get("H3_MCP_CACHE_SQLITE", "")
+if cache_dir and cache_sqlite:
+    raise ValueError("Set at most one of H3_MCP_CACHE_DIR and H3_MCP_CACHE_SQLITE.")
+cache_backend: CellsetBackend | None = None
+if cache_dir:
+    cache_backend = DiskCellsetStore(Path(cache_dir))
+elif cache_sqlite:
+    cache_backend = SqliteCellsetStore(Path(cache_sqlite))
+cache_max_bytes = int(os.environ.get("H3_MCP_CACHE_MAX_BYTES", "0")) or None
+if cache_backend is not None or cache_max_bytes is not None:
+    set_cache(CellsetCache(backend=cache_backend, max_bytes=cache_max_bytes))
+profile_dir = os.environ.get("H3_MCP_PROFILE_DIR", "")
+if profile_dir:
+    profile_threshold_ms = float(os.environ.get("H3_MCP_PROFILE_THRESHOLD_MS", "1000"))
+    set_profiling(Path(profile_dir), profile_threshold_ms / 1000)
+set_response_bytes(os.environ.get("H3_MCP_TOOL_RESPONSE_BYTES", "0") == "1")
+tool_dispatcher = ToolDispatcher(
+    threads=int(os.environ.get("H3_MCP_TOOL_THREADS", str(DEFAULT_TOOL_THREADS))),
+    tool_concurrency=int(
+        os.environ.get("H3_MCP_TOOL_CONCURRENCY", str(DEFAULT_TOOL_CONCURRENCY))
+    ),
+    inline_cell_limit=int(
+        os.environ.get("H3_MCP_INLINE_CELL_LIMIT", str(DEFAULT_INLINE_CELL_LIMIT))
+    ),
+)
+cache_sweep_seconds = float(os.environ.get("H3_MCP_CACHE_SWEEP_SECONDS", "60"))
 
 
 class ApiKeyVerifier:
@@ -74,77 +145,87 @@ mcp = FastMCP(
 )
 
 
-def register_tools(server: FastMCP) -> None:
+def register_tools(server: FastMCP, dispatcher: ToolDispatcher | None = None) -> None:
+    # Uploads, indexing and resolution changes are always offloaded: their cost (file I/O,
+    # feature count, output size) is not bounded by input cells.
+    dispatcher = dispatcher or ToolDispatcher()
     server.tool(
         name="h3_geo_to_cells",
         description="Convert GeoJSON features to H3 cell sets.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_geo_to_cells)
+    )(dispatcher.offload(instrument_tool(h3_geo_to_cells), always=True))
+    server.tool(
+        name="h3_upload_features",
+        description="Stage newline-delimited GeoJSON Features in chunks for h3_geo_to_cells.",
+        annotations=types.ToolAnnotations(
+            readOnlyHint=False, idempotentHint=False, openWorldHint=False
+        ),
+    )(dispatcher.offload(instrument_tool(h3_upload_features), always=True))
     server.tool(
         name="h3_k_ring",
         description="Expand cell sets by k-ring hops.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_k_ring)
+    )(dispatcher.offload(instrument_tool(h3_k_ring)))
     server.tool(
         name="h3_change_resolution",
         description="Change H3 resolution of a cell set.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_change_resolution)
+    )(dispatcher.offload(instrument_tool(h3_change_resolution), always=True))
     server.tool(
         name="h3_compare_sets",
         description="Compare two cell sets and compute overlaps.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_compare_sets)
+    )(dispatcher.offload(instrument_tool(h3_compare_sets)))
     server.tool(
         name="h3_compare_many",
         description="Compare N cell sets and compute top overlaps.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_compare_many)
+    )(dispatcher.offload(instrument_tool(h3_compare_many)))
     server.tool(
         name="h3_cells_to_geojson",
         description="Convert H3 cell sets to GeoJSON polygons.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_cells_to_geojson)
+    )(dispatcher.offload(instrument_tool(h3_cells_to_geojson)))
     server.tool(
         name="h3_cell_stats",
         description="Compute metadata about H3 cell sets.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_cell_stats)
+    )(dispatcher.offload(instrument_tool(h3_cell_stats)))
     server.tool(
         name="h3_aggregate",
         description="Aggregate numeric values over coarser H3 parents.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_aggregate)
+    )(dispatcher.offload(instrument_tool(h3_aggregate)))
     server.tool(
         name="h3_find_hotspots",
         description="Detect hotspot and coldspot cells by neighborhood z-score.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_find_hotspots)
+    )(dispatcher.offload(instrument_tool(h3_find_hotspots)))
     server.tool(
         name="h3_distance_matrix",
         description="Compute hop distances between two H3 cell sets.",
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_distance_matrix)
+    )(dispatcher.offload(instrument_tool(h3_distance_matrix)))
 
     server.tool(
         name="h3_connected_components",
@@ -152,7 +233,7 @@ def register_tools(server: FastMCP) -> None:
         annotations=types.ToolAnnotations(
             readOnlyHint=True, idempotentHint=True, openWorldHint=False
         ),
-    )(h3_connected_components)
+    )(dispatcher.offload(instrument_tool(h3_connected_components)))
 
     server.resource(
         "h3://resolution-guide",
@@ -160,9 +241,67 @@ def register_tools(server: FastMCP) -> None:
         description="Reference table for H3 resolutions and typical use cases.",
         mime_type="text/plain",
     )(resolution_guide)
+    server.resource(
+        "h3://cache-stats",
+        name="cache-stats",
+        description="Cellset cache size, hit/miss/eviction counters and largest entries.",
+        mime_type="application/json",
+    )(cache_stats)
+    server.resource(
+        "h3://cache-stats/prometheus",
+        name="cache-stats-prometheus",
+        description="Cellset cache counters in Prometheus text exposition format.",
+        mime_type="text/plain",
+    )(cache_stats_prometheus)
+    server.resource(
+        "h3://tool-stats",
+        name="tool-stats",
+        description="Per-tool call counts, latency histograms, cell counts and response bytes.",
+        mime_type="application/json",
+    )(tool_stats)
+    server.resource(
+        "h3://tool-stats/prometheus",
+        name="tool-stats-prometheus",
+        description="Per-tool metrics in Prometheus text exposition format.",
+        mime_type="text/plain",
+    )(tool_stats_prometheus)
+    server.resource(
+        "h3://distance-matrices/{matrix_id}",
+        name="distance-matrix",
+        description="Hop matrix stored by h3_distance_matrix, as a NumPy .npz archive.",
+        mime_type="application/octet-stream",
+    )(distance_matrix)
+
+
+register_tools(mcp, tool_dispatcher)
+
+
+def _prune() -> None:
+    get_cache().prune()
+    get_upload_store().prune()
+
+
+async def sweep_cache(interval_seconds: float) -> None:
+    # Backend pruning is file or SQLite I/O, so it runs on a worker thread. Tool handlers
+    # run on worker threads too; the cache and the stores lock their own state.
+    while True:
+        await anyio.sleep(interval_seconds)
+        await anyio.to_thread.run_sync(_prune)
+
 
+async def serve_http(server: FastMCP) -> None:
+    async with anyio.create_task_group() as task_group:
+        if cache_sweep_seconds > 0:
+            task_group.start_soon(sweep_cache, cache_sweep_seconds)
+        if transport == "sse":
+            await server.run_sse_async()
+        else:
+            await server.run_streamable_http_async()
+        task_group.cancel_scope.cancel()
 
-register_tools(mcp)
 
 if __name__ == "__main__":
-    mcp.run(transport=transport)
+    if transport == "stdio":
+        mcp.run(transport=transport)
+    else:
+        anyio.run(serve_http, mcp)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+@dataclass(frozen=True)
+class PairOverlaps:
+    set_sizes: NDArray[np.int64]
+    # One row per pair of sets that share at least one cell, with first < second.
+    first: NDArray[np.int64]
+    second: NDArray[np.int64]
+    counts: NDArray[np.int64]
+    sets: Sequence[NDArray] = ()
+
+    @property
+    def set_count(self) -> int:
+        return len(self.set_sizes)
+
+    def count_matrix(self) -> NDArray[np.int64]:
+        n = self.set_count
+        matrix = np.zeros((n, n), dtype=np.int64)
+        matrix[self.first, self.second] = self.counts
+        matrix[self.second, self.first] = self.counts
+        matrix[np.arange(n), np.arange(n)] = self.set_sizes
+        return matrix
+
+    def overlap_cells(self, i: int, j: int) -> NDArray:
+        # Built on demand, so only the pairs a caller asks for cost memory.
+        if len(self.sets) != self.set_count:
+            raise ValueError("The compared sets were not retained for this comparison.")
+        return np.intersect1d(self.sets[i], self.sets[j], assume_unique=True)
+
+
+def pair_overlaps(sets: Sequence[NDArray]) -> PairOverlaps:
+    # Sparse incidence product: after one stable sort of all memberships, a cell shared by m
+    # sets occupies m adjacent slots, and comparing slots d apart enumerates each pair once.
+    # Each offset is reduced straight into an n x n count matrix, so memory stays O(cells).
+    # Sets must be sorted and unique (as cached views are) for overlap_cells.
+    n = len(sets)
+    set_sizes = np.array([len(values) for values in sets], dtype=np.int64)
+    values = np.concatenate(sets) if n else np.empty(0, dtype=np.uint64)
+    owners = np.repeat(np.arange(n, dtype=np.int64), set_sizes)
+    order = np.argsort(values, kind="stable")
+    values = values[order]
+    owners = owners[order]
+
+    pair_counts = np.zeros(n * n, dtype=np.int64)
+    for offset in range(1, n):
+        shared = values[:-offset] == values[offset:]
+        if not shared.any():
+            break
+        keys = owners[:-offset][shared] * n + owners[offset:][shared]
+        pair_counts += np.bincount(keys, minlength=n * n)
+
+    first, second = np.nonzero(pair_counts.reshape(n, n))
+    return PairOverlaps(
+        set_sizes=set_sizes,
+        first=first.astype(np.int64),
+        second=second.astype(np.int64),
+        counts=pair_counts.reshape(n, n)[first, second],
+        sets=sets,
+    )
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
 from collections import defaultdict
-import math
-from typing import cast
-
-from ..h3_ops import cell_to_parent, get_resolution, grid_disk, grid_distance
+from typing import Container, TypeVar, cast
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..cache import CellsetView
+from ..cell_arrays import cell_resolutions, encode_cells, try_pack_cells, unpack_cells
+from ..grid_search import (
+    frame_distance_blocks,
+    local_frame,
+    nearest_indexed,
+    nearest_within,
+)
+from ..h3_ops import cell_to_parent, get_resolution
 from ..models.schemas import (
     AggregatedParentCell,
     H3AggregateInput,
@@ -16,8 +26,33 @@ from ..models.schemas import (
     HotspotCell,
     DistancePair,
 )
-from ..output_controls import apply_list_controls
-from .cellsets import resolve_cellset, store_cellset
+from ..matrix_store import DistanceMatrix, make_matrix_id
+from ..neighborhoods import DiskAdjacency
+from ..output_controls import apply_list_controls, apply_sampling
+from ..runtime import get_matrix_store
+from .cellsets import resolve_cellset, store_cellset, store_view
+
+# Full matrices are int16, so this caps one at 100 MB.
+MAX_MATRIX_ENTRIES = 50_000_000
+# Every matrix mode measures all origin x destination pairs before keeping any, so the work
+# is capped separately: vectorized in a local IJ frame, or one grid_distance call per pair
+# when the cells do not fit one frame (other faces, pentagon base cells).
+MAX_MATRIX_PAIRS = 1_000_000_000
+MAX_PAIRWISE_MATRIX_PAIRS = 1_000_000
+
+V = TypeVar("V")
+
+
+def _restrict_to_cellset(values_by_cell: dict[str, V], cells: CellsetView) -> dict[str, V]:
+    allowed: Container[str] = cells
+    if cells.compact is None:
+        allowed = cells.as_frozenset()
+    else:
+        # Match against the compacted cells instead of expanding them into a set.
+        keys = try_pack_cells(list(values_by_cell))
+        if keys is not None:
+            allowed = set(unpack_cells(keys[cells.contains_mask(keys)]))
+    return {cell_id: value for cell_id, value in values_by_cell.items() if cell_id in allowed}
 
 
 def _aggregate_values_from_payload(payload: H3AggregateInput) -> dict[str, dict[str, float]]:
@@ -31,8 +66,7 @@ def _aggregate_values_from_payload(payload: H3AggregateInput) -> dict[str, dict[
         raise ValueError("values_by_cell is required when cell_values is not provided.")
     if cellset is None:
         return values_by_cell
-    allowed = set(resolve_cellset(cellset))
-    return {cell_id: values for cell_id, values in values_by_cell.items() if cell_id in allowed}
+    return _restrict_to_cellset(values_by_cell, resolve_cellset(cellset))
 
 
 def _hotspot_values_from_payload(payload: H3FindHotspotsInput) -> dict[str, float]:
@@ -46,8 +80,7 @@ def _hotspot_values_from_payload(payload: H3FindHotspotsInput) -> dict[str, floa
         raise ValueError("values_by_cell is required when cell_values is not provided.")
     if cellset is None:
         return values_by_cell
-    allowed = set(resolve_cellset(cellset))
-    return {cell_id: value for cell_id, value in values_by_cell.items() if cell_id in allowed}
+    return _restrict_to_cellset(values_by_cell, resolve_cellset(cellset))
 
 
 def h3_aggregate(payload: H3AggregateInput) -> H3AggregateOutput:
@@ -143,27 +176,27 @@ def h3_find_hotspots(payload: H3FindHotspotsInput) -> H3FindHotspotsOutput:
             summary="No values provided for hotspot detection.",
         )
 
-    resolutions = {get_resolution(cell_id) for cell_id in values_map}
-    if len(resolutions) != 1:
+    input_cells = list(values_map)
+    indexes = encode_cells(input_cells)
+    if len(np.unique(cell_resolutions(indexes))) != 1:
         raise ValueError("All input cells must share the same resolution.")
 
-    hotspots: list[HotspotCell] = []
-    coldspots: list[HotspotCell] = []
-
-    for cell_id, value in values_map.items():
-        neighbors = grid_disk(cell_id, payload.k)
-        neighbor_values = [values_map[n] for n in neighbors if n in values_map]
-        if not neighbor_values:
-            continue
-        mean = sum(neighbor_values) / len(neighbor_values)
-        variance = sum((v - mean) ** 2 for v in neighbor_values) / len(neighbor_values)
-        std = math.sqrt(variance)
-        z_score = (value - mean) / std if std > 0 else 0.0
-
-        if z_score >= payload.threshold:
-            hotspots.append(HotspotCell(cell_id=cell_id, value=value, z_score=z_score))
-        elif z_score <= -payload.threshold:
-            coldspots.append(HotspotCell(cell_id=cell_id, value=value, z_score=z_score))
+    # Statistics run over the sorted cells; z-scores are mapped back to input order.
+    order = np.argsort(indexes)
+    values = np.fromiter(values_map.values(), dtype=np.float64, count=len(values_map))
+    adjacency = DiskAdjacency.build(indexes[order], payload.k)
+    means, variances = adjacency.moments(values[order])
+    stds = np.sqrt(variances)
+    sorted_scores = np.zeros(len(order), dtype=np.float64)
+    # Rounding in the mean leaves a flat neighbourhood with a std of a few ulps, which
+    # would otherwise score as a hotspot.
+    spread = stds > adjacency.counts * np.finfo(np.float64).eps * np.abs(means)
+    sorted_scores[spread] = (values[order][spread] - means[spread]) / stds[spread]
+    z_scores = np.empty_like(sorted_scores)
+    z_scores[order] = sorted_scores
+
+    hotspots = _hotspot_cells(input_cells, values, z_scores, z_scores >= payload.threshold)
+    coldspots = _hotspot_cells(input_cells, values, z_scores, z_scores <= -payload.threshold)
 
     hotspot_cellset_id = store_cellset([h.cell_id for h in hotspots]) if hotspots else None
     coldspot_cellset_id = store_cellset([c.cell_id for c in coldspots]) if coldspots else None
@@ -191,6 +224,21 @@ def h3_find_hotspots(payload: H3FindHotspotsInput) -> H3FindHotspotsOutput:
     )
 
 
+def _hotspot_cells(
+    cells: list[str],
+    values: NDArray[np.float64],
+    z_scores: NDArray[np.float64],
+    selected: NDArray[np.bool_],
+) -> list[HotspotCell]:
+    positions = np.flatnonzero(selected)
+    return [
+        HotspotCell(cell_id=cells[position], value=value, z_score=z_score)
+        for position, value, z_score in zip(
+            positions.tolist(), values[positions].tolist(), z_scores[positions].tolist()
+        )
+    ]
+
+
 def h3_distance_matrix(payload: H3DistanceMatrixInput) -> H3DistanceMatrixOutput:
     origins = resolve_cellset(payload.origins.cellset)
     destinations = resolve_cellset(payload.destinations.cellset)
@@ -205,43 +253,48 @@ def h3_distance_matrix(payload: H3DistanceMatrixInput) -> H3DistanceMatrixOutput
             summary="No origins or destinations provided.",
         )
 
-    pairs: list[DistancePair] = []
-    total_distance = 0
-    reachable = 0
-    unreachable_count = 0
-    max_distance = 0
-
-    for origin in origins:
-        best_distance: int | None = None
-        best_destination: str | None = None
-        for dest in destinations:
-            distance = grid_distance(origin, dest)
-            if payload.max_distance is not None and distance > payload.max_distance:
-                continue
-            if best_distance is None or distance < best_distance:
-                best_distance = distance
-                best_destination = dest
-        if best_distance is None:
-            unreachable_count += 1
-            continue
-        if best_destination is None:
-            unreachable_count += 1
-            continue
-        pairs.append(
-            DistancePair(
-                origin=origin,
-                nearest_destination=best_destination,
-                distance_hops=best_distance,
-            )
+    origin_indexes = _packed_or_raise(origins)
+    destination_indexes = _packed_or_raise(destinations)
+    resolutions = np.unique(
+        cell_resolutions(np.concatenate([origin_indexes, destination_indexes]))
+    )
+    if len(resolutions) != 1:
+        raise ValueError("Origins and destinations must share the same resolution.")
+
+    if payload.matrix != "nearest":
+        return _distance_matrix_output(
+            payload, origins, destinations, origin_indexes, destination_indexes
         )
-        total_distance += best_distance
-        reachable += 1
-        max_distance = max(max_distance, best_distance)
 
-    avg_distance = total_distance / reachable if reachable else 0.0
-    pairs_output = apply_list_controls(
-        pairs, payload.return_mode, payload.max_items, payload.sample_items
-    )
+    if payload.max_distance is not None:
+        distances, nearest = nearest_within(
+            origin_indexes, destination_indexes, payload.max_distance
+        )
+    else:
+        distances, nearest = nearest_indexed(origin_indexes, destination_indexes)
+
+    reached = distances >= 0
+    reached_distances = distances[reached]
+    pair_count = len(reached_distances)
+    unreachable_count = len(origin_indexes) - pair_count
+    avg_distance = float(reached_distances.mean()) if pair_count else 0.0
+    max_distance = int(reached_distances.max()) if pair_count else 0
+
+    pairs_output: list[DistancePair] | None = None
+    if payload.return_mode == "items":
+        # Sample positions first so only the returned pairs are unpacked and validated.
+        positions = np.array(
+            apply_sampling(range(pair_count), payload.max_items, payload.sample_items),
+            dtype=np.int64,
+        )
+        pairs_output = [
+            DistancePair(origin=origin, nearest_destination=destination, distance_hops=hops)
+            for origin, destination, hops in zip(
+                unpack_cells(origin_indexes[reached][positions]),
+                unpack_cells(nearest[reached][positions]),
+                reached_distances[positions].tolist(),
+            )
+        ]
 
     summary = (
         f"Average distance from {payload.origins.label} to nearest {payload.destinations.label}: "
@@ -249,10 +302,115 @@ def h3_distance_matrix(payload: H3DistanceMatrixInput) -> H3DistanceMatrixOutput
     )
 
     return H3DistanceMatrixOutput(
-        pair_count=len(pairs),
+        pair_count=pair_count,
         avg_distance=avg_distance,
         max_distance=max_distance,
         unreachable_count=unreachable_count,
         pairs=pairs_output,
         summary=summary,
     )
+
+
+def _distance_matrix_output(
+    payload: H3DistanceMatrixInput,
+    origins: CellsetView,
+    destinations: CellsetView,
+    origin_indexes: NDArray[np.uint64],
+    destination_indexes: NDArray[np.uint64],
+) -> H3DistanceMatrixOutput:
+    top_k = min(payload.top_k, len(destinations)) if payload.matrix == "top_k" else None
+    width = top_k or len(destinations)
+    entries = len(origins) * width
+    if entries > MAX_MATRIX_ENTRIES:
+        raise ValueError(
+            f"Distance matrix would hold {entries} entries (limit {MAX_MATRIX_ENTRIES}); "
+            "use matrix='top_k' or smaller cellsets."
+        )
+    pairs = len(origins) * len(destinations)
+    if pairs > MAX_MATRIX_PAIRS:
+        raise ValueError(
+            f"Distance matrix would measure {pairs} pairs (limit {MAX_MATRIX_PAIRS}); "
+            "use smaller cellsets."
+        )
+
+    origins_cellset_id = payload.origins.cellset.cellset_id or store_view(origins)
+    destinations_cellset_id = payload.destinations.cellset.cellset_id or store_view(destinations)
+    matrix_id = make_matrix_id(
+        origins_cellset_id, destinations_cellset_id, top_k, payload.max_distance
+    )
+    store = get_matrix_store()
+    matrix = store.get(matrix_id)
+    if matrix is None:
+        distances, columns = _build_matrix(
+            origin_indexes, destination_indexes, top_k, payload.max_distance
+        )
+        matrix = DistanceMatrix(
+            origins_cellset_id=origins_cellset_id,
+            destinations_cellset_id=destinations_cellset_id,
+            distances=distances,
+            columns=columns,
+        )
+        store.put(matrix_id, matrix)
+
+    measured = matrix.distances[matrix.distances >= 0]
+    pair_count = len(measured)
+    unreachable_count = int((matrix.distances < 0).all(axis=1).sum()) if width else len(origins)
+    avg_distance = float(measured.mean()) if pair_count else 0.0
+    matrix_uri = f"h3://distance-matrices/{matrix_id}"
+    summary = (
+        f"Stored {len(origins)}x{width} hop matrix from {payload.origins.label} to "
+        f"{payload.destinations.label} at {matrix_uri}. Average {avg_distance:.2f} hops; "
+        f"{unreachable_count} origins with no destination in range."
+    )
+    return H3DistanceMatrixOutput(
+        pair_count=pair_count,
+        avg_distance=avg_distance,
+        max_distance=int(measured.max()) if pair_count else 0,
+        unreachable_count=unreachable_count,
+        matrix_id=matrix_id,
+        matrix_uri=matrix_uri,
+        matrix_shape=[len(origins), width],
+        origins_cellset_id=origins_cellset_id,
+        destinations_cellset_id=destinations_cellset_id,
+        summary=summary,
+    )
+
+
+def _build_matrix(
+    origins: NDArray[np.uint64],
+    destinations: NDArray[np.uint64],
+    top_k: int | None,
+    max_distance: int | None,
+) -> tuple[NDArray[np.int16], NDArray[np.int32] | None]:
+    frame = local_frame(origins, destinations)
+    pairs = len(origins) * len(destinations)
+    if frame is None and pairs > MAX_PAIRWISE_MATRIX_PAIRS:
+        raise ValueError(
+            f"These cells span icosahedron faces or pentagons, so all {pairs} pairs would be "
+            f"measured one by one (limit {MAX_PAIRWISE_MATRIX_PAIRS}); use smaller cellsets."
+        )
+    width = top_k or len(destinations)
+    distances = np.empty((len(origins), width), dtype=np.int16)
+    columns = None if top_k is None else np.empty((len(origins), width), dtype=np.int32)
+    for start, block in frame_distance_blocks(frame, origins, destinations):
+        if max_distance is not None:
+            block[block > max_distance] = -1
+        if block.size and int(block.max()) > np.iinfo(np.int16).max:
+            raise ValueError("Hop distances exceed the int16 matrix range; use a coarser resolution.")
+        stop = start + len(block)
+        if columns is None:
+            distances[start:stop] = block
+            continue
+        # A stable sort keeps ties in destination order; unmeasured pairs sort last.
+        keys = np.where(block >= 0, block, np.iinfo(np.int32).max)
+        nearest = np.argsort(keys, axis=1, kind="stable")[:, :width]
+        distances[start:stop] = np.take_along_axis(block, nearest, axis=1)
+        columns[start:stop] = nearest
+    return distances, columns
+
+
+def _packed_or_raise(cells: CellsetView) -> NDArray[np.uint64]:
+    packed = cells.packed
+    if packed is None:
+        raise ValueError("Cells must be valid H3 cell IDs.")
+    return packed
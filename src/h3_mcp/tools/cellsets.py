@@ -2,23 +2,35 @@ from __future__ import annotations
 
 from typing import Iterable
 
-from ..cache import CellsetCache, normalize_cells
+from ..cache import CellsetCache, CellsetView
+from ..instrumentation import record_input_cells, record_output_cells
 from ..models.schemas import CellsetRef
 from ..runtime import get_cache
 
 
-def resolve_cellset(cellset: CellsetRef, cache: CellsetCache | None = None) -> list[str]:
+def resolve_cellset(cellset: CellsetRef, cache: CellsetCache | None = None) -> CellsetView:
+    if cache is None:
+        cache = get_cache()
     if cellset.cells is not None:
-        return normalize_cells(cellset.cells)
+        cache.note_inline_cellset()
+        view = CellsetView.from_cells(cellset.cells)
+        record_input_cells(len(view))
+        return view
     if not cellset.cellset_id:
         raise ValueError("cellset_id is required when cells are not provided.")
-    cache = cache or get_cache()
-    cells = cache.get_cells(cellset.cellset_id)
+    cells = cache.get_view(cellset.cellset_id)
     if cells is None:
         raise ValueError(f"Unknown or expired cellset_id: {cellset.cellset_id}")
+    record_input_cells(len(cells))
     return cells
 
 
 def store_cellset(cells: Iterable[str], cache: CellsetCache | None = None) -> str:
-    cache = cache or get_cache()
-    return cache.put_cells(cells)
+    return store_view(CellsetView.from_cells(cells), cache)
+
+
+def store_view(view: CellsetView, cache: CellsetCache | None = None) -> str:
+    if cache is None:
+        cache = get_cache()
+    record_output_cells(len(view))
+    return cache.put_view(view)
@@ -1,5 +1,13 @@
 from __future__ import annotations
 
+from typing import cast
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..cache import CellsetView
+from ..cell_arrays import cell_resolutions, split_sorted
+from ..compaction import intersect_compact, subtract_compact
 from ..models.schemas import (
     H3CompareManyInput,
     H3CompareManyOutput,
@@ -9,20 +17,60 @@ from ..models.schemas import (
     OverlapPair,
     SetStats,
 )
-from .cellsets import resolve_cellset, store_cellset
+from ..set_overlap import pair_overlaps
+from .cellsets import resolve_cellset, store_view
+
+
+def _compact_at(
+    cells: CellsetView, packed: NDArray[np.uint64] | None, resolution: int
+) -> NDArray[np.uint64] | None:
+    # Compacted cells of a view at `resolution`; a plain packed view at that resolution
+    # already is a (non-canonical) compacted set.
+    if cells.compact is not None:
+        return cells.compact if cells.resolution == resolution else None
+    if packed is None or not bool((cell_resolutions(packed) == resolution).all()):
+        return None
+    return packed
+
+
+def _split_cellsets(
+    cells_a: CellsetView, cells_b: CellsetView
+) -> tuple[CellsetView, CellsetView, CellsetView]:
+    # Plain views are read once here; a compacted side is expanded only if it has to be.
+    packed_a = cells_a.packed if cells_a.compact is None else None
+    packed_b = cells_b.packed if cells_b.compact is None else None
+    resolution = cells_a.resolution if cells_a.compact is not None else cells_b.resolution
+    if resolution is not None:
+        # Either side is compacted: stay compacted when both share one resolution.
+        compact_a = _compact_at(cells_a, packed_a, resolution)
+        compact_b = _compact_at(cells_b, packed_b, resolution)
+        if compact_a is not None and compact_b is not None:
+            return (
+                CellsetView.from_compact(intersect_compact(compact_a, compact_b), resolution),
+                CellsetView.from_compact(subtract_compact(compact_a, compact_b), resolution),
+                CellsetView.from_compact(subtract_compact(compact_b, compact_a), resolution),
+            )
+        packed_a = cells_a.packed if packed_a is None else packed_a
+        packed_b = cells_b.packed if packed_b is None else packed_b
+    if packed_a is not None and packed_b is not None:
+        overlap, only_a, only_b = split_sorted(packed_a, packed_b)
+        return CellsetView(overlap), CellsetView(only_a), CellsetView(only_b)
+    set_a = cells_a.as_frozenset()
+    set_b = cells_b.as_frozenset()
+    return (
+        CellsetView(tuple(sorted(set_a & set_b))),
+        CellsetView(tuple(sorted(set_a - set_b))),
+        CellsetView(tuple(sorted(set_b - set_a))),
+    )
 
 
 def h3_compare_sets(payload: H3CompareSetsInput) -> H3CompareSetsOutput:
     cells_a = resolve_cellset(payload.set_a.cellset)
     cells_b = resolve_cellset(payload.set_b.cellset)
-    set_a = set(cells_a)
-    set_b = set(cells_b)
-    overlap = set_a & set_b
-    only_a = set_a - set_b
-    only_b = set_b - set_a
-
-    set_a_count = len(set_a)
-    set_b_count = len(set_b)
+    overlap, only_a, only_b = _split_cellsets(cells_a, cells_b)
+
+    set_a_count = len(cells_a)
+    set_b_count = len(cells_b)
     overlap_count = len(overlap)
     only_a_count = len(only_a)
     only_b_count = len(only_b)
@@ -32,13 +80,13 @@ def h3_compare_sets(payload: H3CompareSetsInput) -> H3CompareSetsOutput:
     overlap_ratio_b = overlap_count / set_b_count if set_b_count else 0.0
     jaccard_index = overlap_count / union_count if union_count else 0.0
 
-    overlap_cellset_id = store_cellset(sorted(overlap)) if overlap_count else None
-    only_a_cellset_id = store_cellset(sorted(only_a)) if only_a_count else None
-    only_b_cellset_id = store_cellset(sorted(only_b)) if only_b_count else None
+    overlap_cellset_id = store_view(overlap) if overlap_count else None
+    only_a_cellset_id = store_view(only_a) if only_a_count else None
+    only_b_cellset_id = store_view(only_b) if only_b_count else None
 
-    overlap_cells = sorted(overlap) if payload.include_cells else None
-    only_a_cells = sorted(only_a) if payload.include_cells else None
-    only_b_cells = sorted(only_b) if payload.include_cells else None
+    overlap_cells = list(overlap) if payload.include_cells else None
+    only_a_cells = list(only_a) if payload.include_cells else None
+    only_b_cells = list(only_b) if payload.include_cells else None
 
     summary = (
         f"{overlap_count} of {set_a_count} {payload.set_a.label} cells overlap with "
@@ -67,92 +115,55 @@ def h3_compare_sets(payload: H3CompareSetsInput) -> H3CompareSetsOutput:
     )
 
 
-def h3_compare_many(payload: H3CompareManyInput) -> H3CompareManyOutput:
-    labels: list[str] = []
-    cell_sets: list[set[str]] = []
-    set_stats: list[SetStats] = []
-
-    for labeled in payload.sets:
-        cells = resolve_cellset(labeled.cellset)
-        labels.append(labeled.label)
-        cell_sets.append(set(cells))
-        set_stats.append(SetStats(label=labeled.label, cell_count=len(set(cells))))
-
-    if len(set(labels)) != len(labels):
-        raise ValueError("Set labels must be unique for h3_compare_many.")
-
-    label_to_index = {label: idx for idx, label in enumerate(labels)}
+def _overlap_arrays(cellsets: list[CellsetView]) -> list[NDArray]:
+    packed = [cells.packed for cells in cellsets]
+    if all(values is not None for values in packed):
+        return cast(list[NDArray], packed)
+    return [np.array(cells.sorted_cells(), dtype=np.str_) for cells in cellsets]
 
-    n = len(cell_sets)
-    overlap_counts_matrix: list[list[int]] = []
-    overlap_score_matrix: list[list[float]] = []
 
-    overlap_pairs: list[OverlapPair] = []
-    overlap_cellsets: list[OverlapCellset] | None = [] if payload.include_cells else None
+def _overlap_view(values: NDArray) -> CellsetView:
+    if values.dtype == np.uint64:
+        return CellsetView(values)
+    return CellsetView(tuple(values.tolist()))
 
-    if payload.return_mode == "stats":
-        overlap_counts_matrix = [[0 for _ in range(n)] for _ in range(n)]
-        overlap_score_matrix = [[0.0 for _ in range(n)] for _ in range(n)]
-        for i in range(n):
-            overlap_counts_matrix[i][i] = len(cell_sets[i])
-            if payload.matrix_metric == "jaccard":
-                overlap_score_matrix[i][i] = 1.0 if len(cell_sets[i]) else 0.0
-            else:
-                overlap_score_matrix[i][i] = 1.0 if len(cell_sets[i]) else 0.0
-
-    for i in range(n):
-        for j in range(i + 1, n):
-            overlap = cell_sets[i] & cell_sets[j]
-            overlap_count = len(overlap)
-
-            if payload.return_mode == "stats":
-                overlap_counts_matrix[i][j] = overlap_counts_matrix[j][i] = overlap_count
-                if payload.matrix_metric == "jaccard":
-                    union_count = len(cell_sets[i]) + len(cell_sets[j]) - overlap_count
-                    score = overlap_count / union_count if union_count else 0.0
-                    overlap_score_matrix[i][j] = overlap_score_matrix[j][i] = score
-                else:
-                    a_score = overlap_count / len(cell_sets[i]) if len(cell_sets[i]) else 0.0
-                    b_score = overlap_count / len(cell_sets[j]) if len(cell_sets[j]) else 0.0
-                    overlap_score_matrix[i][j] = a_score
-                    overlap_score_matrix[j][i] = b_score
-
-            if overlap_count == 0:
-                continue
 
-            if payload.matrix_metric == "jaccard":
-                union_count = len(cell_sets[i]) + len(cell_sets[j]) - overlap_count
-                score = overlap_count / union_count if union_count else 0.0
-                overlap_pairs.append(
-                    OverlapPair(
-                        a=labels[i],
-                        b=labels[j],
-                        overlap_count=overlap_count,
-                        score=score,
-                    )
-                )
-            else:
-                a_score = overlap_count / len(cell_sets[i]) if len(cell_sets[i]) else 0.0
-                b_score = overlap_count / len(cell_sets[j]) if len(cell_sets[j]) else 0.0
-                overlap_pairs.append(
-                    OverlapPair(
-                        a=labels[i],
-                        b=labels[j],
-                        overlap_count=overlap_count,
-                        score=a_score,
-                    )
-                )
-                overlap_pairs.append(
-                    OverlapPair(
-                        a=labels[j],
-                        b=labels[i],
-                        overlap_count=overlap_count,
-                        score=b_score,
-                    )
-                )
+def h3_compare_many(payload: H3CompareManyInput) -> H3CompareManyOutput:
+    labels = [labeled.label for labeled in payload.sets]
+    if len(set(labels)) != len(labels):
+        raise ValueError("Set labels must be unique for h3_compare_many.")
 
-    overlap_pairs.sort(key=lambda pair: (pair.score, pair.overlap_count), reverse=True)
-    top_overlaps = overlap_pairs[: payload.top_k]
+    cellsets = [resolve_cellset(labeled.cellset) for labeled in payload.sets]
+    set_stats = [
+        SetStats(label=label, cell_count=len(cells)) for label, cells in zip(labels, cellsets)
+    ]
+
+    overlaps = pair_overlaps(_overlap_arrays(cellsets))
+    sizes = overlaps.set_sizes
+    first, second, counts = overlaps.first, overlaps.second, overlaps.counts
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if payload.matrix_metric == "jaccard":
+            unions = sizes[first] + sizes[second] - counts
+            pair_a, pair_b, pair_counts = first, second, counts
+            pair_scores = np.where(unions > 0, counts / unions, 0.0)
+        else:
+            # Directional ratios: each overlapping pair is reported from both sides.
+            pair_a = np.column_stack((first, second)).ravel()
+            pair_b = np.column_stack((second, first)).ravel()
+            pair_counts = np.repeat(counts, 2)
+            pair_scores = pair_counts / sizes[pair_a]
+
+    ranked = np.lexsort((-pair_counts, -pair_scores))[: payload.top_k]
+    top_overlaps = [
+        OverlapPair(
+            a=labels[pair_a[idx]],
+            b=labels[pair_b[idx]],
+            overlap_count=int(pair_counts[idx]),
+            score=float(pair_scores[idx]),
+        )
+        for idx in ranked
+    ]
 
     if not top_overlaps:
         summary = "No overlaps between sets."
@@ -162,23 +173,33 @@ def h3_compare_many(payload: H3CompareManyInput) -> H3CompareManyOutput:
             f"({payload.matrix_metric} {top_overlaps[0].score:.2f})."
         )
 
+    overlap_cellsets: list[OverlapCellset] | None = None
     if payload.include_cells:
-        overlap_cellsets = []
-        for pair in top_overlaps:
-            overlap = cell_sets[label_to_index[pair.a]] & cell_sets[label_to_index[pair.b]]
-            overlap_cellsets.append(
-                OverlapCellset(
-                    a=pair.a,
-                    b=pair.b,
-                    cellset_id=store_cellset(sorted(overlap)),
-                )
+        overlap_cellsets = [
+            OverlapCellset(
+                a=labels[pair_a[idx]],
+                b=labels[pair_b[idx]],
+                cellset_id=store_view(
+                    _overlap_view(overlaps.overlap_cells(int(pair_a[idx]), int(pair_b[idx])))
+                ),
             )
+            for idx in ranked
+        ]
 
     overlap_counts: list[list[int]] | None = None
     overlap_matrix: list[list[float]] | None = None
     if payload.return_mode == "stats":
-        overlap_counts = overlap_counts_matrix
-        overlap_matrix = overlap_score_matrix
+        count_matrix = overlaps.count_matrix()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if payload.matrix_metric == "jaccard":
+                unions = sizes[:, None] + sizes[None, :] - count_matrix
+                score_matrix = np.where(unions > 0, count_matrix / unions, 0.0)
+            else:
+                score_matrix = np.where(
+                    sizes[:, None] > 0, count_matrix / sizes[:, None], 0.0
+                )
+        overlap_counts = count_matrix.tolist()
+        overlap_matrix = score_matrix.tolist()
 
     return H3CompareManyOutput(
         set_stats=set_stats,
@@ -1,55 +1,81 @@
 from __future__ import annotations
 
-from collections import deque
+import numpy as np
+from numpy.typing import NDArray
 
-from ..h3_ops import cell_area_km2, cell_to_latlng, get_resolution, grid_disk
+from ..cache import CellsetView
+from ..cell_arrays import cell_resolutions
+from ..geometry import CellsetGeometry, remember_geometry
+from ..h3_ops import cell_areas_km2, cell_centers
 from ..models.schemas import (
     ConnectedComponent,
     H3ConnectedComponentsInput,
     H3ConnectedComponentsOutput,
     LatLng,
 )
-from .cellsets import resolve_cellset, store_cellset
+from ..neighborhoods import DiskAdjacency, component_labels
+from .cellsets import resolve_cellset, store_view
 
 
-def _find_components(cells: list[str]) -> list[list[str]]:
-    unvisited = set(cells)
-    components: list[list[str]] = []
-    while unvisited:
-        seed = next(iter(unvisited))
-        component: list[str] = []
-        queue = deque([seed])
-        while queue:
-            current = queue.popleft()
-            if current not in unvisited:
-                continue
-            unvisited.discard(current)
-            component.append(current)
-            for neighbor in grid_disk(current, 1):
-                if neighbor in unvisited:
-                    queue.append(neighbor)
-        components.append(component)
-    return components
+def _find_components(cells: NDArray[np.uint64]) -> list[NDArray[np.uint64]]:
+    # Largest first; equal sizes keep the order of their smallest cell. Each component is
+    # a sorted slice of the input.
+    labels = component_labels(DiskAdjacency.build(cells, 1))
+    # Labels are positions of each component's smallest cell, so bincount groups them.
+    label_sizes = np.bincount(labels, minlength=len(cells))
+    roots = np.flatnonzero(label_sizes)
+    sizes = label_sizes[roots]
+    ranks = np.empty(len(cells), dtype=np.int64)
+    ranks[roots[np.lexsort((roots, -sizes))]] = np.arange(len(roots))
+    order = np.argsort(ranks[labels], kind="stable")
+    bounds = np.cumsum(np.sort(sizes)[::-1])[:-1]
+    return np.split(cells[order], bounds)
 
 
-def _compute_component(
-    component_id: int, cells: list[str]
-) -> ConnectedComponent:
-    centers = [cell_to_latlng(c) for c in cells]
-    lats = [lat for lat, _ in centers]
-    lngs = [lng for _, lng in centers]
-    center = LatLng(lat=sum(lats) / len(lats), lng=sum(lngs) / len(lngs))
-    bounding_box = [min(lngs), min(lats), max(lngs), max(lats)]
-    total_area_km2 = round(cell_area_km2(cells[0]) * len(cells), 2)
-    cellset_id = store_cellset(cells)
-    return ConnectedComponent(
-        component_id=component_id,
-        cell_count=len(cells),
-        center=center,
-        bounding_box=bounding_box,
-        total_area_km2=total_area_km2,
-        cellset_id=cellset_id,
-    )
+def _compute_components(components: list[NDArray[np.uint64]]) -> list[ConnectedComponent]:
+    # One pass for every cell center, then per-component means and extents as grouped
+    # reductions over the concatenated cells.
+    if not components:
+        return []
+    sizes = np.array([len(component) for component in components], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    cells = np.concatenate(components)
+    centers = cell_centers(cells)
+    areas = np.add.reduceat(cell_areas_km2(cells), starts)
+    lats, lngs = centers[:, 0], centers[:, 1]
+    mean_lats = np.add.reduceat(lats, starts) / sizes
+    mean_lngs = np.add.reduceat(lngs, starts) / sizes
+    min_lats = np.minimum.reduceat(lats, starts)
+    max_lats = np.maximum.reduceat(lats, starts)
+    min_lngs = np.minimum.reduceat(lngs, starts)
+    max_lngs = np.maximum.reduceat(lngs, starts)
+    results: list[ConnectedComponent] = []
+    for component_id, component in enumerate(components):
+        view = CellsetView(component)
+        geometry = CellsetGeometry(
+            resolution=int(cell_resolutions(component[:1])[0]),
+            center=(float(mean_lats[component_id]), float(mean_lngs[component_id])),
+            bounding_box=(
+                float(min_lngs[component_id]),
+                float(min_lats[component_id]),
+                float(max_lngs[component_id]),
+                float(max_lats[component_id]),
+            ),
+            total_area_km2=float(areas[component_id]),
+        )
+        # Stats or GeoJSON summaries on a component's cellset_id then skip the cell walk.
+        remember_geometry(view, geometry, contiguous=True)
+        results.append(
+            ConnectedComponent(
+                component_id=component_id,
+                cell_count=len(component),
+                center=LatLng(lat=geometry.center[0], lng=geometry.center[1]),
+                bounding_box=list(geometry.bounding_box),
+                total_area_km2=round(geometry.total_area_km2, 2),
+                cellset_id=store_view(view),
+            )
+        )
+    return results
 
 
 def h3_connected_components(
@@ -64,17 +90,16 @@ def h3_connected_components(
             summary="0 cells, no connected components.",
         )
 
-    resolutions = {get_resolution(c) for c in cells}
-    if len(resolutions) != 1:
+    indexes = cells.packed
+    if indexes is None:
+        raise ValueError("Cells must be valid H3 cell IDs.")
+    if len(np.unique(cell_resolutions(indexes))) != 1:
         raise ValueError("All input cells must share the same resolution.")
 
-    raw_components = _find_components(cells)
-    filtered = [c for c in raw_components if len(c) >= payload.min_cells]
-    filtered.sort(key=len, reverse=True)
-
-    components = [
-        _compute_component(i, comp) for i, comp in enumerate(filtered)
-    ]
+    raw_components = _find_components(indexes)
+    components = _compute_components(
+        [c for c in raw_components if len(c) >= payload.min_cells]
+    )
 
     parts: list[str] = []
     for comp in components[:5]:
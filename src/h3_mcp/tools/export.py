@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from ..h3_ops import cell_area_km2, cell_to_boundary, cell_to_latlng
+from ..geometry import cellset_geometry
+from ..h3_ops import cell_to_boundary
 from ..models.schemas import H3CellsToGeojsonInput, H3CellsToGeojsonOutput, LatLng
 from ..output_controls import apply_sampling
 from .cellsets import resolve_cellset
@@ -11,7 +12,7 @@ def h3_cells_to_geojson(payload: H3CellsToGeojsonInput) -> H3CellsToGeojsonOutpu
     if payload.return_mode == "cells":
         return H3CellsToGeojsonOutput(
             feature_count=len(cells),
-            cells=cells,
+            cells=list(cells),
             features=None,
             summary=f"{len(cells)} cell IDs returned.",
         )
@@ -23,12 +24,10 @@ def h3_cells_to_geojson(payload: H3CellsToGeojsonInput) -> H3CellsToGeojsonOutpu
         summary = f"Generated {len(cells)} hexagonal polygons."
 
         if cells:
-            centers = [cell_to_latlng(c) for c in cells]
-            lats = [lat for lat, _ in centers]
-            lngs = [lng for _, lng in centers]
-            center = LatLng(lat=sum(lats) / len(lats), lng=sum(lngs) / len(lngs))
-            bounding_box = [min(lngs), min(lats), max(lngs), max(lats)]
-            total_area_km2 = round(cell_area_km2(cells[0]) * len(cells), 2)
+            geometry = cellset_geometry(cells)
+            center = LatLng(lat=geometry.center[0], lng=geometry.center[1])
+            bounding_box = list(geometry.bounding_box)
+            total_area_km2 = round(geometry.total_area_km2, 2)
             summary = (
                 f"Generated {len(cells)} hexagonal polygons covering "
                 f"~{total_area_km2} km², centered on ({center.lat:.4f}, {center.lng:.4f})."
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+import random
 from typing import Literal
 
-from ..h3_ops import cell_to_children, cell_to_parent, compact_cells, get_resolution
+import numpy as np
+from numpy.typing import NDArray
+
+from ..cache import CellsetView
+from ..cell_arrays import cell_parents, cell_resolutions, sort_unique, unpack_cells
+from ..compaction import canonical_compact, descendant_counts
 from ..models.schemas import H3ChangeResolutionInput, H3ChangeResolutionOutput
 from ..output_controls import apply_cell_controls
-from .cellsets import resolve_cellset, store_cellset
+from .cellsets import resolve_cellset, store_view
+
+# Finer outputs are stored compacted, but hashing the id still walks every cell.
+MAX_OUTPUT_CELLS = 200_000_000
+# Cells returned inline become Python strings; larger outputs go by cellset_id.
+MAX_INLINE_CELLS = 100_000
 
 
 def h3_change_resolution(payload: H3ChangeResolutionInput) -> H3ChangeResolutionOutput:
@@ -22,47 +33,88 @@ def h3_change_resolution(payload: H3ChangeResolutionInput) -> H3ChangeResolution
             summary="No input cells provided.",
         )
 
-    resolutions = {get_resolution(cell) for cell in cells}
-    if len(resolutions) != 1:
-        raise ValueError("All input cells must share the same resolution.")
-    input_resolution = resolutions.pop()
+    # Work on the compacted cells where the view has them; a plain view is its own
+    # (uncompacted) form.
+    compact, input_resolution = _compact_cells(cells)
+    target = payload.target_resolution
 
-    output_cells: set[str] = set()
     direction: Literal["coarser", "finer"]
-    if payload.target_resolution > input_resolution:
+    if target > input_resolution:
         direction = "finer"
-        for cell in cells:
-            output_cells.update(cell_to_children(cell, payload.target_resolution))
-    elif payload.target_resolution < input_resolution:
+        output_count = int(descendant_counts(compact, target).sum())
+        if output_count > MAX_OUTPUT_CELLS:
+            raise ValueError(
+                f"Resolution {target} would produce {output_count} cells; the limit is "
+                f"{MAX_OUTPUT_CELLS}. Use a coarser target_resolution or fewer input cells."
+            )
+        output = CellsetView.from_compact(canonical_compact(compact), target)
+    elif target < input_resolution:
         direction = "coarser"
-        for cell in cells:
-            output_cells.add(cell_to_parent(cell, payload.target_resolution))
-        output_cells = set(compact_cells(output_cells))
+        output = CellsetView.from_compact(canonical_compact(_coarsen(compact, target)), target)
     else:
         direction = "coarser"
-        output_cells = set(cells)
-
-    output_cells_sorted = sorted(output_cells)
-    cellset_id = store_cellset(output_cells_sorted) if output_cells_sorted else None
-    output_cells_payload = apply_cell_controls(
-        output_cells_sorted,
-        payload.return_mode,
-        payload.max_cells,
-        payload.sample_cells,
-    )
+        output = cells
+
+    returned = len(output) if payload.max_cells is None else min(payload.max_cells, len(output))
+    if payload.return_mode == "cells" and returned > MAX_INLINE_CELLS:
+        raise ValueError(
+            f"return_mode='cells' would return {returned} cells (limit {MAX_INLINE_CELLS}); "
+            f"set max_cells to at most {MAX_INLINE_CELLS} or use the cellset_id."
+        )
+    cellset_id = store_view(output) if output else None
+    output_cells_payload = _output_cells(output, payload)
 
     summary = (
-        f"{len(cells)} cells at res {input_resolution} → {len(output_cells)} cells "
-        f"at res {payload.target_resolution}"
+        f"{len(cells)} cells at res {input_resolution} → {len(output)} cells "
+        f"at res {target}"
     )
 
     return H3ChangeResolutionOutput(
         input_resolution=input_resolution,
-        target_resolution=payload.target_resolution,
+        target_resolution=target,
         input_cell_count=len(cells),
-        output_cell_count=len(output_cells),
+        output_cell_count=len(output),
         direction=direction,
         cellset_id=cellset_id,
         cells=output_cells_payload,
         summary=summary,
     )
+
+
+def _compact_cells(cells: CellsetView) -> tuple[NDArray[np.uint64], int]:
+    if cells.compact is not None and cells.resolution is not None:
+        return cells.compact, cells.resolution
+    packed = cells.packed
+    if packed is None:
+        raise ValueError("Cells must be valid H3 cell IDs.")
+    resolutions = np.unique(cell_resolutions(packed))
+    if len(resolutions) != 1:
+        raise ValueError("All input cells must share the same resolution.")
+    return packed, int(resolutions[0])
+
+
+def _coarsen(compact: NDArray[np.uint64], target: int) -> NDArray[np.uint64]:
+    # Cells at or below the target collapse onto their ancestors; coarser compacted cells
+    # already stand for all of their descendants at the target.
+    fine = cell_resolutions(compact) >= target
+    coarse = compact[~fine]
+    parents = cell_parents(compact[fine], target)
+    return sort_unique(np.sort(np.concatenate([coarse, parents])))
+
+
+def _output_cells(output: CellsetView, payload: H3ChangeResolutionInput) -> list[str] | None:
+    max_cells = payload.max_cells
+    if (
+        payload.return_mode != "cells"
+        or output.compact is None
+        or max_cells is None
+        or len(output) <= max_cells
+    ):
+        return apply_cell_controls(output, payload.return_mode, max_cells, payload.sample_cells)
+    # Expand only the sampled cells; positions match what apply_cell_controls would pick.
+    if payload.sample_cells == "random":
+        positions = np.array(random.Random(0).sample(range(len(output)), max_cells))
+    else:
+        positions = np.arange(max_cells)
+    return unpack_cells(output.take(positions))
+
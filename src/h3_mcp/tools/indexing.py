@@ -1,78 +1,215 @@
 from __future__ import annotations
 
-from ..geojson_utils import bounding_box_from_geojson, iter_features
-from ..h3_ops import latlng_to_cell, line_to_cells, polygon_to_cells, cell_area_km2
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from itertools import chain, islice
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..cache import CellsetView
+from ..cell_arrays import empty_indexes, encode_cells, unpack_cells
+from ..geojson_utils import (
+    Bounds,
+    BoundsAccumulator,
+    iter_feature_lines,
+    iter_features,
+    prepare_geometry,
+)
+from ..h3_ops import cell_area_km2, line_to_cells, points_to_cells, polygon_to_cells
 from ..models.schemas import H3GeoToCellsInput, H3GeoToCellsOutput, CellWithSource
 from ..output_controls import apply_sampling
-from .cellsets import store_cellset
+from ..runtime import get_data_dir, get_index_chunk_size, get_index_executor, get_upload_store
+from .cellsets import store_view
+
+_MAX_PENDING_BATCHES = 2 * (os.cpu_count() or 1)
+
+# (encoded cells, geometry count, coordinate bounds) for one feature.
+_FeatureResult = tuple[NDArray[np.uint64], int, Bounds | None]
+
+
+def _index_feature(feature: dict[str, Any], resolution: int) -> _FeatureResult:
+    geometry = prepare_geometry(feature.get("geometry") or {})
+    if geometry.geom_type in {"Point", "MultiPoint"}:
+        cells = points_to_cells(geometry, resolution)
+    elif geometry.geom_type in {"LineString", "MultiLineString"}:
+        cells = line_to_cells(geometry, resolution)
+    else:
+        cells = polygon_to_cells(geometry, resolution)
+    return encode_cells(cells), geometry.geometry_count, geometry.bounds()
+
+
+def _index_chunk(features: list[dict[str, Any]], resolution: int) -> list[_FeatureResult]:
+    return [_index_feature(feature, resolution) for feature in features]
+
+
+def _batched(
+    features: Iterable[dict[str, Any]], size: int
+) -> Iterator[tuple[dict[str, Any], ...]]:
+    iterator = iter(features)
+    while batch := tuple(islice(iterator, size)):
+        yield batch
+
+
+def _index_features(
+    features: Iterable[dict[str, Any]], resolution: int
+) -> Iterator[tuple[dict[str, Any], _FeatureResult]]:
+    # Batches are consumed in submission order, so merged results match the serial path
+    # exactly; at most _MAX_PENDING_BATCHES are in flight to keep streamed input bounded.
+    executor = get_index_executor()
+    batches = _batched(features, get_index_chunk_size())
+    first_batch = next(batches, ())
+    if executor is None or len(first_batch) < get_index_chunk_size():
+        for feature in chain(first_batch, chain.from_iterable(batches)):
+            yield feature, _index_feature(feature, resolution)
+        return
+
+    pending: deque[tuple[tuple[dict[str, Any], ...], Future]] = deque()
+    for batch in chain([first_batch], batches):
+        pending.append((batch, executor.submit(_index_chunk, list(batch), resolution)))
+        if len(pending) >= _MAX_PENDING_BATCHES:
+            done_batch, future = pending.popleft()
+            yield from _zip_batch(done_batch, future.result())
+    while pending:
+        done_batch, future = pending.popleft()
+        yield from _zip_batch(done_batch, future.result())
+
+
+def _zip_batch(
+    batch: tuple[dict[str, Any], ...], results: list[_FeatureResult]
+) -> Iterator[tuple[dict[str, Any], _FeatureResult]]:
+    return zip(batch, results)
+
+
+def _iter_payload_features(payload: H3GeoToCellsInput) -> Iterator[dict[str, Any]]:
+    if payload.geojson is not None:
+        yield from iter_features(payload.geojson)
+        return
+    if payload.upload_id is not None:
+        path = get_upload_store().path(payload.upload_id)
+    else:
+        path = _resolve_data_path(payload.geojson_seq_path or "")
+    with path.open(encoding="utf-8") as handle:
+        yield from iter_feature_lines(handle)
+
+
+def _resolve_data_path(raw_path: str) -> Path:
+    data_dir = get_data_dir()
+    if data_dir is None:
+        raise ValueError("File ingestion is disabled; set H3_MCP_DATA_DIR to enable it.")
+    root = data_dir.resolve()
+    path = (root / raw_path).resolve()
+    if not path.is_relative_to(root):
+        raise ValueError("geojson_seq_path must point inside H3_MCP_DATA_DIR.")
+    if not path.is_file():
+        raise ValueError(f"GeoJSONSeq file not found: {raw_path}")
+    return path
+
+
+@dataclass(frozen=True)
+class _CellSources:
+    # Provenance as parallel arrays: unique cell i was produced by the features
+    # feature_indexes[starts[i]:starts[i] + counts[i]], in feature order.
+    cells: NDArray[np.uint64]
+    starts: NDArray[np.int64]
+    counts: NDArray[np.int64]
+    feature_indexes: NDArray[np.int64]
+
+    @classmethod
+    def build(cls, cell_parts: list[NDArray[np.uint64]]) -> _CellSources:
+        all_cells = np.concatenate(cell_parts) if cell_parts else empty_indexes()
+        owners = np.repeat(
+            np.arange(len(cell_parts), dtype=np.int64), [len(part) for part in cell_parts]
+        )
+        order = np.argsort(all_cells, kind="stable")
+        sorted_cells = all_cells[order]
+        is_start = np.ones(len(sorted_cells), dtype=bool)
+        is_start[1:] = sorted_cells[1:] != sorted_cells[:-1]
+        starts = np.flatnonzero(is_start)
+        counts = np.diff(starts, append=len(sorted_cells))
+        return cls(
+            cells=sorted_cells[starts],
+            starts=starts,
+            counts=counts,
+            feature_indexes=owners[order],
+        )
+
+    def first_feature(self, position: int) -> int:
+        return int(self.feature_indexes[self.starts[position]])
+
+    def features(self, position: int) -> list[int]:
+        start = int(self.starts[position])
+        return self.feature_indexes[start : start + int(self.counts[position])].tolist()
 
 
 def h3_geo_to_cells(payload: H3GeoToCellsInput) -> H3GeoToCellsOutput:
-    cell_sources: dict[str, dict[str, list]] = {}
-    cell_ids: set[str] = set()
+    # Provenance is only materialized for return_mode="cells", and then only for the
+    # sampled output cells.
+    track_sources = payload.return_mode == "cells"
+    cell_parts: list[NDArray[np.uint64]] = []
+    feature_properties: list[dict[str, Any]] = []
     feature_count = 0
     geometry_count = 0
+    bounds = BoundsAccumulator()
 
-    for idx, feature in enumerate(iter_features(payload.geojson)):
+    indexed = _index_features(_iter_payload_features(payload), payload.resolution)
+    for feature, (cells, feature_geometry_count, feature_bounds) in indexed:
         feature_count += 1
-        geometry = feature.get("geometry") or {}
-        geom_type = geometry.get("type")
-        properties = feature.get("properties") or {}
-
-        cells: list[str] = []
-        if geom_type == "Point":
-            lng, lat = geometry.get("coordinates", [])
-            cells = [latlng_to_cell(lat, lng, payload.resolution)]
-            geometry_count += 1
-        elif geom_type == "MultiPoint":
-            for lng, lat in geometry.get("coordinates", []):
-                cells.append(latlng_to_cell(lat, lng, payload.resolution))
-            geometry_count += len(geometry.get("coordinates", []))
-        elif geom_type in {"LineString", "MultiLineString"}:
-            cells = line_to_cells(geometry, payload.resolution)
-            geometry_count += len(geometry.get("coordinates", []))
-        elif geom_type in {"Polygon", "MultiPolygon"}:
-            cells = polygon_to_cells(geometry, payload.resolution)
-            geometry_count += len(geometry.get("coordinates", []))
-        else:
-            raise ValueError(f"Unsupported geometry type: {geom_type}")
-
-        for cell_id in cells:
-            cell_ids.add(cell_id)
-            entry = cell_sources.setdefault(cell_id, {"indices": [], "properties": []})
-            entry["indices"].append(idx)
-            entry["properties"].append(properties)
-
-    cellset_id = store_cellset(cell_ids) if cell_ids and payload.cache_cells else None
-    bounding_box = bounding_box_from_geojson(payload.geojson)
+        geometry_count += feature_geometry_count
+        bounds.add_bounds(feature_bounds)
+        cell_parts.append(cells)
+        if track_sources:
+            feature_properties.append(feature.get("properties") or {})
+
+    sources: _CellSources | None = None
+    if track_sources:
+        sources = _CellSources.build(cell_parts)
+        cell_ids = sources.cells
+    else:
+        cell_ids = np.unique(np.concatenate(cell_parts)) if cell_parts else empty_indexes()
+    cell_parts.clear()
+
+    cell_count = len(cell_ids)
+    cellset_id = store_view(CellsetView(cell_ids)) if cell_count and payload.cache_cells else None
+    bounding_box = bounds.bounding_box()
     approx_cell_area = (
-        f"{cell_area_km2(next(iter(cell_ids))):.3f} km² per cell" if cell_ids else "0 km² per cell"
+        f"{cell_area_km2(unpack_cells(cell_ids[:1])[0]):.3f} km² per cell"
+        if cell_count
+        else "0 km² per cell"
     )
 
     cells_output: list[CellWithSource] | None = None
-    if payload.return_mode == "cells":
-        cell_objects: list[CellWithSource] = []
-        for cell_id in sorted(cell_sources.keys()):
-            indices = cell_sources[cell_id]["indices"]
-            properties = cell_sources[cell_id]["properties"]
-            cell_objects.append(
+    if sources is not None:
+        positions = apply_sampling(range(cell_count), payload.max_cells, payload.sample_cells)
+        cell_strings = unpack_cells(cell_ids[positions])
+        cells_output = []
+        for position, cell_id in zip(positions, cell_strings):
+            properties = [feature_properties[idx] for idx in sources.features(position)]
+            cells_output.append(
                 CellWithSource(
                     cell_id=cell_id,
-                    source_feature_index=indices[0],
+                    source_feature_index=sources.first_feature(position),
                     source_properties=properties[0] if len(properties) == 1 else properties,
                 )
             )
-        cells_output = apply_sampling(cell_objects, payload.max_cells, payload.sample_cells)
+
+    if payload.upload_id is not None:
+        # A staged upload is consumed once it has been indexed.
+        get_upload_store().delete(payload.upload_id)
 
     summary = (
-        f"{feature_count} features indexed to {len(cell_ids)} "
+        f"{feature_count} features indexed to {cell_count} "
         f"unique cells at res {payload.resolution}. "
         f"{geometry_count} geometries processed."
     )
 
     return H3GeoToCellsOutput(
         cellset_id=cellset_id,
-        cell_count=len(cell_ids),
+        cell_count=cell_count,
         resolution=payload.resolution,
         approx_cell_area=approx_cell_area,
         bounding_box=bounding_box,
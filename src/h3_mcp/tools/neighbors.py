@@ -19,13 +19,15 @@ def h3_k_ring(payload: H3KRingInput) -> H3KRingOutput:
             summary="No input cells provided.",
         )
 
-    resolutions = {get_resolution(cell) for cell in cells}
+    # Fetched once: a compacted view expands on every pass.
+    cell_list = cells.sorted_cells()
+    resolutions = {get_resolution(cell) for cell in cell_list}
     if len(resolutions) != 1:
         raise ValueError("All input cells must share the same resolution.")
     res = resolutions.pop()
 
     ring_cells_set: set[str] = set()
-    for cell in cells:
+    for cell in cell_list:
         ring_cells_set.update(grid_disk(cell, payload.k))
 
     ring_cells = sorted(ring_cells_set)
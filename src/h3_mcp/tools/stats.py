@@ -1,29 +1,10 @@
 from __future__ import annotations
 
-from collections import deque
-
-from ..h3_ops import cell_area_km2, cell_to_latlng, grid_disk, get_resolution
+from ..geometry import cellset_geometry, is_contiguous
 from ..models.schemas import H3CellStatsInput, H3CellStatsOutput, LatLng
 from .cellsets import resolve_cellset
 
 
-def _is_contiguous(cells: list[str]) -> bool:
-    if not cells:
-        return False
-    cell_set = set(cells)
-    visited = set()
-    queue = deque([cells[0]])
-    while queue:
-        current = queue.popleft()
-        if current in visited:
-            continue
-        visited.add(current)
-        for neighbor in grid_disk(current, 1):
-            if neighbor in cell_set and neighbor not in visited:
-                queue.append(neighbor)
-    return len(visited) == len(cell_set)
-
-
 def h3_cell_stats(payload: H3CellStatsInput) -> H3CellStatsOutput:
     cells = resolve_cellset(payload.cellset)
     if not cells:
@@ -38,20 +19,16 @@ def h3_cell_stats(payload: H3CellStatsInput) -> H3CellStatsOutput:
             summary="No cells provided.",
         )
 
-    resolutions = {get_resolution(cell) for cell in cells}
-    if len(resolutions) != 1:
+    geometry = cellset_geometry(cells)
+    if geometry.resolution is None:
         raise ValueError("All input cells must share the same resolution.")
-    resolution = resolutions.pop()
-
-    centers = [cell_to_latlng(cell) for cell in cells]
-    latitudes = [lat for lat, _ in centers]
-    longitudes = [lng for _, lng in centers]
-    bounding_box = [min(longitudes), min(latitudes), max(longitudes), max(latitudes)]
-    center = LatLng(lat=sum(latitudes) / len(latitudes), lng=sum(longitudes) / len(longitudes))
+    resolution = geometry.resolution
 
-    avg_area_km2 = cell_area_km2(cells[0])
-    total_area_km2 = avg_area_km2 * len(cells)
-    contiguous = _is_contiguous(cells)
+    bounding_box = list(geometry.bounding_box)
+    center = LatLng(lat=geometry.center[0], lng=geometry.center[1])
+    total_area_km2 = geometry.total_area_km2
+    avg_area_km2 = total_area_km2 / len(cells)
+    contiguous = is_contiguous(cells)
 
     summary = (
         f"{len(cells)} cells at res {resolution}, covering ~{total_area_km2:.2f} km² "
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from ..models.schemas import H3UploadFeaturesInput, H3UploadFeaturesOutput
+from ..runtime import get_upload_store
+
+
+def h3_upload_features(payload: H3UploadFeaturesInput) -> H3UploadFeaturesOutput:
+    # Lines are only counted here; h3_geo_to_cells parses and validates them.
+    chunk_feature_count = sum(
+        1 for line in payload.features.splitlines() if line.strip().lstrip("\x1e").strip()
+    )
+    upload_id, total_bytes = get_upload_store().append(payload.upload_id, payload.features)
+    return H3UploadFeaturesOutput(
+        upload_id=upload_id,
+        chunk_feature_count=chunk_feature_count,
+        total_bytes=total_bytes,
+        summary=(
+            f"Appended {chunk_feature_count} features to {upload_id} "
+            f"({total_bytes} bytes staged)."
+        ),
+    )
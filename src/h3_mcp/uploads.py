@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import re
+from tempfile import TemporaryDirectory
+import threading
+import time
+from typing import Callable
+import uuid
+
+_UPLOAD_ID_PATTERN = re.compile(r"upload_[0-9a-f]{32}")
+_SUFFIX = ".geojsonl"
+
+
+class UploadStore:
+    """Staging area for GeoJSON sequences uploaded in chunks."""
+
+    # Uploads expire ttl_seconds after their last append and are deleted once indexed.
+    # max_bytes bounds all staged uploads together, so clients cannot fill the disk.
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        max_bytes: int = 1024 * 1024 * 1024,
+        ttl_seconds: int | None = 3600,
+        time_fn: Callable[[], float] | None = None,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1.")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0 when set.")
+        self._directory = directory
+        self._tempdir: TemporaryDirectory[str] | None = None
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._time_fn = time_fn or time.time
+        self._lock = threading.Lock()
+
+    def _root(self) -> Path:
+        if self._directory is None:
+            self._tempdir = TemporaryDirectory(prefix="h3-mcp-uploads-")
+            self._directory = Path(self._tempdir.name)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        return self._directory
+
+    def _path(self, upload_id: str) -> Path:
+        if not _UPLOAD_ID_PATTERN.fullmatch(upload_id):
+            raise ValueError(f"Unknown upload_id: {upload_id}")
+        return self._root() / f"{upload_id}{_SUFFIX}"
+
+    def _is_expired(self, path: Path, now: float) -> bool:
+        if self._ttl_seconds is None:
+            return False
+        return path.stat().st_mtime + self._ttl_seconds <= now
+
+    def _staged_bytes(self) -> int:
+        total = 0
+        for path in self._root().glob(f"upload_*{_SUFFIX}"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                continue
+        return total
+
+    def append(self, upload_id: str | None, text: str) -> tuple[str, int]:
+        data = text.encode("utf-8")
+        if data and not data.endswith(b"\n"):
+            data += b"\n"
+        with self._lock:
+            if upload_id is None:
+                upload_id = f"upload_{uuid.uuid4().hex}"
+                path = self._path(upload_id)
+            else:
+                path = self.path(upload_id)
+            self.prune()
+            staged = self._staged_bytes()
+            if staged + len(data) > self._max_bytes:
+                raise ValueError(
+                    f"Staged uploads would reach {staged + len(data)} bytes "
+                    f"(limit {self._max_bytes}); index or let earlier uploads expire first."
+                )
+            with path.open("ab") as handle:
+                handle.write(data)
+            now = self._time_fn()
+            os.utime(path, (now, now))
+            return upload_id, path.stat().st_size
+
+    def path(self, upload_id: str) -> Path:
+        path = self._path(upload_id)
+        try:
+            expired = self._is_expired(path, self._time_fn())
+        except FileNotFoundError:
+            raise ValueError(f"Unknown upload_id: {upload_id}") from None
+        if expired:
+            path.unlink(missing_ok=True)
+            raise ValueError(f"Unknown or expired upload_id: {upload_id}")
+        return path
+
+    def delete(self, upload_id: str) -> None:
+        self._path(upload_id).unlink(missing_ok=True)
+
+    def prune(self) -> None:
+        now = self._time_fn()
+        for path in self._root().glob(f"upload_*{_SUFFIX}"):
+            try:
+                if self._is_expired(path, now):
+                    path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from h3_mcp.cache import CellsetCache
+import h3
+import pytest
+
+from h3_mcp.cache import CellsetCache, CellsetView, make_cellset_id, view_cellset_id
 
 
 def test_cellset_id_is_order_independent() -> None:
@@ -25,6 +28,41 @@ def test_cache_ttl_expiration() -> None:
     assert len(cache) == 0
 
 
+def test_cache_expiry_follows_put_time_not_lru_order() -> None:
+    now = [1000.0]
+
+    def time_fn() -> float:
+        return now[0]
+
+    cache = CellsetCache(max_items=10, ttl_seconds=10, time_fn=time_fn)
+    first_id = cache.put_cells(["a"])
+    now[0] = 1005.0
+    second_id = cache.put_cells(["b"])
+    assert cache.get_view(first_id) is not None
+    now[0] = 1010.0
+    assert len(cache) == 1
+    assert cache.get_cells(second_id) == ["b"]
+    cache.put_cells(["b"])
+    now[0] = 1016.0
+    assert cache.get_cells(second_id) == ["b"]
+    now[0] = 1020.0
+    assert len(cache) == 0
+
+
+def test_cache_expiry_heap_stays_bounded() -> None:
+    now = [1000.0]
+
+    def time_fn() -> float:
+        return now[0]
+
+    cache = CellsetCache(max_items=10, ttl_seconds=10, time_fn=time_fn)
+    for step in range(1000):
+        now[0] += 0.001
+        cache.put_cells([f"c{step % 5}"])
+    assert len(cache) == 5
+    assert len(cache._expiry_heap) <= 2 * len(cache) + 65
+
+
 def test_cache_lru_eviction() -> None:
     cache = CellsetCache(max_items=2, ttl_seconds=None)
     id_a = cache.put_cells(["a"])
@@ -44,3 +82,161 @@ def test_cache_returns_copy() -> None:
     assert cells is not None
     cells.append("c")
     assert cache.get_cells(cellset_id) == ["a", "b"]
+
+
+def test_cache_packs_h3_cells() -> None:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 1))
+    cache = CellsetCache(max_items=5, ttl_seconds=None)
+    cellset_id = cache.put_cells(cells)
+    assert cellset_id == make_cellset_id(cells)
+    assert cache.get_cells(cellset_id) == sorted(cells)
+
+
+def test_cellset_id_matches_across_packed_inputs() -> None:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 2))
+    expected = make_cellset_id(cells)
+    assert make_cellset_id(sorted(cells)) == expected
+    assert make_cellset_id(reversed(cells + cells[:4])) == expected
+    assert view_cellset_id(CellsetView.from_cells(cells)) == expected
+    assert make_cellset_id(["a", "b"]) == make_cellset_id(["b", "a", "b"])
+    assert make_cellset_id([]) != make_cellset_id(cells)
+
+
+def test_cache_view_is_shared_and_read_only() -> None:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 1))
+    cache = CellsetCache(max_items=5, ttl_seconds=None)
+    cellset_id = cache.put_cells(cells)
+    view = cache.get_view(cellset_id)
+    assert view is not None
+    assert cache.get_view(cellset_id) is view
+    assert len(view) == len(cells)
+    assert list(view) == sorted(cells)
+    assert view[0] == sorted(cells)[0]
+    assert view[-1] == sorted(cells)[-1]
+    assert cells[3] in view
+    assert "a" not in view
+    assert view.as_frozenset() is view.as_frozenset()
+    assert view.packed is not None
+    assert not view.packed.flags.writeable
+
+
+def test_cache_byte_budget_evicts_least_recent() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    small = list(h3.grid_disk(center, 1))
+    large = list(h3.grid_disk(center, 10))
+    cache = CellsetCache(max_items=100, ttl_seconds=None, max_bytes=8 * (len(large) + 2 * len(small)))
+    small_id = cache.put_cells(small)
+    large_id = cache.put_cells(large)
+    assert cache.nbytes == 8 * (len(small) + len(large))
+    assert cache.get_view(small_id) is not None
+    cache.put_cells(h3.grid_disk(h3.latlng_to_cell(40.0, -74.0, 9), 2))
+    assert cache.get_view(large_id) is None
+    assert cache.get_view(small_id) is not None
+    assert cache.counters.evictions == 1
+    assert cache.nbytes <= 8 * (len(large) + 2 * len(small))
+
+
+def test_cache_keeps_newest_entry_over_byte_budget() -> None:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 3))
+    cache = CellsetCache(max_items=100, ttl_seconds=None, max_bytes=16)
+    cache.put_cells(["a"])
+    cellset_id = cache.put_cells(cells)
+    assert len(cache) == 1
+    assert cache.nbytes == 8 * len(cells)
+    assert cache.get_cells(cellset_id) == sorted(cells)
+
+
+def test_cache_charges_memoized_string_forms() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    first = list(h3.grid_disk(center, 10))
+    second = list(h3.grid_disk(h3.latlng_to_cell(40.0, -74.0, 9), 10))
+    iterated = CellsetView.from_cells(first)
+    iterated.as_frozenset()
+    cache = CellsetCache(
+        max_items=100, ttl_seconds=None, max_bytes=iterated.nbytes + 8 * len(second) + 1024
+    )
+    first_id = cache.put_cells(first)
+    view = cache.get_view(first_id)
+    assert view is not None
+    assert cache.nbytes == 8 * len(first)
+    assert list(view) == sorted(first)
+    assert view.nbytes > 8 * len(first)
+    assert cache.nbytes == view.nbytes
+    view.as_frozenset()
+    assert cache.nbytes == view.nbytes
+
+    second_id = cache.put_cells(second)
+    assert cache.counters.evictions == 0
+    second_view = cache.get_view(second_id)
+    assert second_view is not None
+    list(second_view)
+    assert cache.counters.evictions == 1
+    assert cache.get_view(first_id) is None
+    assert cache.nbytes == second_view.nbytes
+
+
+def test_repeat_put_keeps_cached_view_and_derived_values() -> None:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 1))
+    cache = CellsetCache(max_items=5, ttl_seconds=None)
+    cellset_id = cache.put_cells(cells)
+    view = cache.get_view(cellset_id)
+    assert view is not None
+    assert view.derived("count", len) == len(cells)
+    assert view.derived("count", lambda _: -1) == len(cells)
+    cache.put_cells(reversed(cells))
+    assert cache.get_view(cellset_id) is view
+
+
+def test_cache_stores_large_sets_compacted() -> None:
+    cells = sorted(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 40))
+    cache = CellsetCache(max_items=5, ttl_seconds=None)
+    cellset_id = cache.put_cells(cells)
+    assert cellset_id == make_cellset_id(cells)
+    view = cache.get_view(cellset_id)
+    assert view is not None
+    assert view.compact is not None
+    assert view.nbytes < 8 * len(cells) // 2
+    assert len(view) == len(cells)
+    assert list(view) == cells
+    assert view[100] == cells[100]
+    assert cells[7] in view
+    assert h3.cell_to_parent(cells[7], 8) not in view
+
+
+def test_reput_of_expired_entry_is_compacted() -> None:
+    now = [1000.0]
+    cells = sorted(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 40))
+    cache = CellsetCache(max_items=5, ttl_seconds=10, time_fn=lambda: now[0])
+    cellset_id = cache.put_cells(cells)
+    now[0] = 1011.0
+    assert cache.put_cells(cells) == cellset_id
+    assert cache.counters.repeat_puts == 0
+    view = cache.get_view(cellset_id)
+    assert view is not None
+    assert view.compact is not None
+
+
+def test_compacted_view_indexes_without_expanding() -> None:
+    from h3_mcp.cell_arrays import pack_cells
+    from h3_mcp.compaction import compact_indexes
+
+    pentagon = h3.get_pentagons(5)[0]
+    hexagons = h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 5), 1)
+    cells = sorted(
+        child for parent in [pentagon, *hexagons] for child in h3.cell_to_children(parent, 8)
+    )
+    view = CellsetView.from_compact(compact_indexes(pack_cells(cells)), 8)
+    assert view.compact is not None
+    for position in (0, 1, 400, 2400, len(cells) - 1, -1, -700):
+        assert view[position] == cells[position]
+    assert list(view[10:40:3]) == cells[10:40:3]
+    for position in (0, 5, 2401, len(cells) - 1):
+        assert view.index(cells[position]) == position
+    assert view.count(cells[9]) == 1
+    assert view.count(h3.cell_to_parent(cells[9], 7)) == 0
+    assert list(reversed(view)) == cells[::-1]
+    assert list(view) == cells
+    with pytest.raises(IndexError):
+        view[len(cells)]
+    with pytest.raises(ValueError):
+        view.index(cells[5], 6)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from h3_mcp.cache import CellsetCache
+from h3_mcp.models.schemas import CellsetRef
+from h3_mcp.resources.cache_stats import cache_stats, cache_stats_prometheus
+from h3_mcp.tools.cellsets import resolve_cellset
+
+
+def test_cache_stats_counts_lookups(cellset_cache: CellsetCache) -> None:
+    cellset_id = cellset_cache.put_cells(["a", "b"])
+    cellset_cache.put_cells(["b", "a"])
+    resolve_cellset(CellsetRef(cellset_id=cellset_id))
+    resolve_cellset(CellsetRef(cells=["c"]))
+    with pytest.raises(ValueError, match="Unknown or expired"):
+        resolve_cellset(CellsetRef(cellset_id="cellset_missing"))
+    cellset_cache.put_cells(["c"])
+
+    stats = json.loads(cache_stats())
+    assert stats["items"] == 2
+    assert stats["cells"] == 3
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["inline_cellsets"] == 1
+    assert stats["puts"] == 3
+    assert stats["repeat_puts"] == 1
+    assert stats["evictions"] == 0
+    assert stats["largest_entries"][0]["cellset_id"] == cellset_id
+    assert stats["largest_entries"][0]["cells"] == 2
+
+
+def test_cache_stats_prometheus_text(cellset_cache: CellsetCache) -> None:
+    cellset_cache.put_cells(["a"])
+    text = cache_stats_prometheus()
+    assert "# TYPE h3_mcp_cache_hits_total counter" in text
+    assert "h3_mcp_cache_puts_total 1" in text
+    assert "h3_mcp_cache_items 1" in text
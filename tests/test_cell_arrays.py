@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import h3
+import numpy as np
+import pytest
+
+from h3_mcp.cell_arrays import (
+    pack_cells,
+    sort_unique,
+    split_sorted,
+    try_pack_cells,
+    unpack_cells,
+)
+
+
+def test_pack_cells_sorts_and_dedupes() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    cells = list(h3.grid_disk(center, 2))
+    packed = pack_cells(cells + cells[:3])
+    assert packed.dtype == np.uint64
+    assert packed.tolist() == sorted(h3.str_to_int(cell) for cell in cells)
+
+
+def test_unpack_cells_round_trip() -> None:
+    cells = [
+        h3.latlng_to_cell(0.0, 0.0, 0),
+        h3.latlng_to_cell(52.37, 4.89, 9),
+        h3.latlng_to_cell(-33.86, 151.2, 15),
+    ]
+    assert unpack_cells(pack_cells(cells)) == sorted(cells)
+
+
+def test_try_pack_cells_rejects_non_h3_strings() -> None:
+    assert try_pack_cells(["a", "b"]) is None
+    assert try_pack_cells(["8928308280GFFFF"]) is None
+    assert try_pack_cells(["0928308280fffff"]) is None
+    with pytest.raises(ValueError, match="valid H3"):
+        pack_cells(["not-a-cell"])
+
+
+def test_pack_cells_accepts_uppercase_hex() -> None:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 1))
+    packed = try_pack_cells([cell.upper() for cell in cells])
+    assert packed is not None
+    assert unpack_cells(packed) == sorted(cells)
+
+
+def test_sort_unique_keeps_sorted_input() -> None:
+    packed = pack_cells(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 1))
+    assert sort_unique(packed) is packed
+    assert sort_unique(packed[::-1]).tolist() == packed.tolist()
+    assert sort_unique(np.repeat(packed, 2)).tolist() == packed.tolist()
+
+
+def test_split_sorted_matches_set_algebra() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    cells_a = set(h3.grid_disk(center, 3))
+    cells_b = set(h3.grid_disk(h3.grid_disk(center, 3)[-1], 2))
+    overlap, only_a, only_b = split_sorted(pack_cells(cells_a), pack_cells(cells_b))
+    assert unpack_cells(overlap) == sorted(cells_a & cells_b)
+    assert unpack_cells(only_a) == sorted(cells_a - cells_b)
+    assert unpack_cells(only_b) == sorted(cells_b - cells_a)
+
+
+def test_split_sorted_with_empty_side() -> None:
+    packed = pack_cells(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 1))
+    overlap, only_a, only_b = split_sorted(packed, pack_cells([]))
+    assert len(overlap) == 0
+    assert only_a.tolist() == packed.tolist()
+    assert len(only_b) == 0
+
+
+def test_pack_cells_accepts_other_h3_spellings() -> None:
+    cell = h3.latlng_to_cell(37.775, -122.418, 9)
+    packed = try_pack_cells(["0" + cell, "0x" + cell, f" {cell} ", cell])
+    assert packed is not None
+    assert unpack_cells(packed) == [cell]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import h3
+import numpy as np
+
+from h3_mcp.cache import CellsetCache, CellsetView, make_cellset_id
+from h3_mcp.cellset_store import DiskCellsetStore, SqliteCellsetStore
+
+
+def _cells() -> list[str]:
+    return list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 2))
+
+
+def test_backend_survives_new_cache(tmp_path) -> None:
+    cells = _cells()
+    first = CellsetCache(max_items=5, ttl_seconds=None, backend=DiskCellsetStore(tmp_path))
+    cellset_id = first.put_cells(cells)
+    assert (tmp_path / f"{cellset_id}.u64").stat().st_size == 8 * len(cells)
+
+    second = CellsetCache(max_items=5, ttl_seconds=None, backend=DiskCellsetStore(tmp_path))
+    view = second.get_view(cellset_id)
+    assert view is not None
+    assert isinstance(view.packed, np.ndarray)
+    assert not view.packed.flags.writeable
+    assert list(view) == sorted(cells)
+    assert second.get_view(cellset_id) is view
+
+
+def test_backend_expires_by_ttl(tmp_path) -> None:
+    now = [1000.0]
+    store = DiskCellsetStore(tmp_path, ttl_seconds=10, time_fn=lambda: now[0])
+    cache = CellsetCache(max_items=5, ttl_seconds=None, backend=store)
+    cellset_id = cache.put_cells(_cells())
+    assert store.get(cellset_id) is not None
+    now[0] = 1011.0
+    assert store.get(cellset_id) is None
+    assert not (tmp_path / f"{cellset_id}.u64").exists()
+
+
+def test_backend_ignores_malformed_ids(tmp_path) -> None:
+    store = DiskCellsetStore(tmp_path)
+    assert store.get("../../etc/passwd") is None
+    assert store.get("cellset_abc") is None
+
+
+def test_sqlite_store_shares_cellsets_between_caches(tmp_path) -> None:
+    path = tmp_path / "cellsets.sqlite"
+    replica_a = CellsetCache(ttl_seconds=None, backend=SqliteCellsetStore(path))
+    replica_b = CellsetCache(ttl_seconds=None, backend=SqliteCellsetStore(path))
+    h3_id = replica_a.put_cells(_cells())
+    label_id = replica_a.put_cells(["b", "a"])
+    assert replica_b.get_cells(h3_id) == sorted(_cells())
+    assert replica_b.get_cells(label_id) == ["a", "b"]
+
+
+def test_sqlite_store_ttl_and_lru(tmp_path) -> None:
+    now = [1000.0]
+    store = SqliteCellsetStore(
+        tmp_path / "cellsets.sqlite", max_items=2, ttl_seconds=10, time_fn=lambda: now[0]
+    )
+    cache = CellsetCache(max_items=1, ttl_seconds=None, backend=store)
+    id_a = cache.put_cells(["a"])
+    id_b = cache.put_cells(["b"])
+    assert store.get(id_a) is not None
+    id_c = cache.put_cells(["c"])
+    assert store.get(id_b) is None
+    assert store.get(id_a) is not None
+    now[0] = 1011.0
+    assert store.get(id_c) is None
+    assert len(store) == 0
+
+
+def test_sqlite_store_round_trips_compacted_cellsets(tmp_path) -> None:
+    cells = sorted(h3.cell_to_children(h3.latlng_to_cell(37.775, -122.418, 6), 11))
+    path = tmp_path / "cellsets.sqlite"
+    writer = CellsetCache(ttl_seconds=None, backend=SqliteCellsetStore(path))
+    cellset_id = writer.put_cells(cells)
+    assert writer.get_view(cellset_id).compact is not None
+    reader = CellsetCache(ttl_seconds=None, backend=SqliteCellsetStore(path))
+    assert reader.get_cells(cellset_id) == cells
+
+
+def test_sqlite_store_round_trips_arbitrary_strings(tmp_path) -> None:
+    store = SqliteCellsetStore(tmp_path / "cellsets.sqlite")
+    for cells in [(), ("",), ("a\nb", "c"), ("", "\n")]:
+        cellset_id = make_cellset_id(cells)
+        store.put(cellset_id, CellsetView.from_cells(cells))
+        view = store.get(cellset_id)
+        assert view is not None
+        assert view.sorted_cells() == tuple(sorted(set(cells)))
+
+
+def test_sqlite_store_repeat_put_only_refreshes_expiry(tmp_path) -> None:
+    now = [1000.0]
+    store = SqliteCellsetStore(tmp_path / "cellsets.sqlite", ttl_seconds=10, time_fn=lambda: now[0])
+    cellset_id = make_cellset_id(["a"])
+    store.put(cellset_id, CellsetView.from_cells(["a"]))
+    now[0] = 1008.0
+    # A repeat put must not rewrite the stored cells.
+    store.put(cellset_id, CellsetView.from_cells(["b"]))
+    now[0] = 1015.0
+    view = store.get(cellset_id)
+    assert view is not None
+    assert view.sorted_cells() == ("a",)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import h3
+import numpy as np
+
+from h3_mcp.cell_arrays import cell_resolutions, pack_cells
+from h3_mcp.compaction import (
+    canonical_compact,
+    compact_indexes,
+    contains_mask,
+    descendant_counts,
+    intersect_compact,
+    iter_uncompacted,
+    subtract_compact,
+    uncompact_indexes,
+)
+
+
+def _disk(lat: float, lng: float, resolution: int, k: int) -> np.ndarray:
+    return pack_cells(h3.grid_disk(h3.latlng_to_cell(lat, lng, resolution), k))
+
+
+def test_compact_round_trip_is_sorted() -> None:
+    cells = _disk(37.775, -122.418, 9, 20)
+    compact = compact_indexes(cells)
+    assert len(compact) < len(cells)
+    assert len(np.unique(cell_resolutions(compact))) > 1
+    assert np.array_equal(uncompact_indexes(compact, 9), cells)
+    assert descendant_counts(compact, 9).sum() == len(cells)
+
+
+def test_descendant_counts_under_pentagons() -> None:
+    pentagon = h3.get_pentagons(2)[0]
+    compact = pack_cells([pentagon])
+    for resolution in (2, 3, 5):
+        expected = len(h3.cell_to_children(pentagon, resolution))
+        assert descendant_counts(compact, resolution).tolist() == [expected]
+    assert len(uncompact_indexes(compact, 5)) == len(h3.cell_to_children(pentagon, 5))
+    children = pack_cells(h3.cell_to_children(pentagon, 4))
+    assert np.array_equal(canonical_compact(children), compact)
+
+
+def test_contains_mask_matches_descendants() -> None:
+    cells = _disk(37.775, -122.418, 9, 10)
+    compact = compact_indexes(cells)
+    outside = _disk(40.7, -74.0, 9, 1)
+    mask = contains_mask(compact, np.concatenate([cells, outside]))
+    assert mask[: len(cells)].all()
+    assert not mask[len(cells) :].any()
+
+
+def test_set_operations_match_uncompacted_sets() -> None:
+    a = _disk(37.775, -122.418, 9, 15)
+    b = _disk(37.79, -122.41, 9, 15)
+    compact_a, compact_b = compact_indexes(a), compact_indexes(b)
+    overlap = intersect_compact(compact_a, compact_b)
+    only_a = subtract_compact(compact_a, compact_b)
+    assert np.array_equal(uncompact_indexes(overlap, 9), np.intersect1d(a, b))
+    assert np.array_equal(uncompact_indexes(only_a, 9), np.setdiff1d(a, b))
+    # Results stay canonical, so equal sets compact to equal arrays.
+    assert np.array_equal(only_a, compact_indexes(np.setdiff1d(a, b)))
+    assert np.array_equal(overlap, compact_indexes(np.intersect1d(a, b)))
+
+
+def test_iter_uncompacted_streams_bounded_sorted_chunks() -> None:
+    cells = _disk(37.775, -122.418, 7, 3)
+    compact = np.concatenate([compact_indexes(cells), pack_cells(h3.get_pentagons(5)[:1])])
+    compact = canonical_compact(np.sort(compact))
+    chunks = list(iter_uncompacted(compact, 9, chunk_cells=500))
+    assert max(len(chunk) for chunk in chunks) <= 500
+    assert np.array_equal(np.concatenate(chunks), uncompact_indexes(compact, 9))
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import h3
 import pytest
 
+from h3_mcp.cache import make_cellset_id
 from h3_mcp.models.schemas import CellsetRef, H3CompareManyInput, H3CompareSetsInput, LabeledCellset
 from h3_mcp.tools.comparison import h3_compare_many, h3_compare_sets
 
@@ -77,3 +79,65 @@ def test_compare_many_overlap_ratio_directional(cellset_cache) -> None:
     assert result.top_overlaps[0].a == "B"
     assert result.top_overlaps[0].b == "A"
     assert result.top_overlaps[0].score == 1.0
+
+
+def test_compare_sets_h3_cells_stores_sorted_results(cellset_cache) -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    cells_a = set(h3.grid_disk(center, 2))
+    cells_b = set(h3.grid_disk(h3.grid_ring(center, 2)[0], 2))
+    payload = H3CompareSetsInput(
+        set_a=LabeledCellset(label="A", cellset=CellsetRef(cells=list(cells_a))),
+        set_b=LabeledCellset(label="B", cellset=CellsetRef(cells=list(cells_b))),
+        include_cells=True,
+    )
+    result = h3_compare_sets(payload)
+    assert result.overlap_cells == sorted(cells_a & cells_b)
+    assert result.only_a_cells == sorted(cells_a - cells_b)
+    assert result.only_b_cells == sorted(cells_b - cells_a)
+    assert result.overlap_cellset_id == make_cellset_id(cells_a & cells_b)
+    assert cellset_cache.get_cells(result.only_b_cellset_id) == sorted(cells_b - cells_a)
+
+
+def test_compare_many_matches_pairwise_sets(cellset_cache) -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 8)
+    ring = h3.grid_ring(center, 3)
+    cell_sets = [set(h3.grid_disk(cell, 2)) for cell in ring[:6]]
+    payload = H3CompareManyInput(
+        sets=[
+            LabeledCellset(label=f"S{i}", cellset=CellsetRef(cells=sorted(cells)))
+            for i, cells in enumerate(cell_sets)
+        ],
+        matrix_metric="overlap_ratio",
+        include_cells=True,
+        return_mode="stats",
+        top_k=4,
+    )
+    result = h3_compare_many(payload)
+    assert result.overlap_counts == [[len(a & b) for b in cell_sets] for a in cell_sets]
+    assert result.overlap_cellsets is not None
+    for pair, overlap_entry in zip(result.top_overlaps, result.overlap_cellsets):
+        a = cell_sets[int(pair.a[1:])]
+        b = cell_sets[int(pair.b[1:])]
+        assert pair.overlap_count == len(a & b)
+        assert pair.score == pytest.approx(len(a & b) / len(a))
+        assert cellset_cache.get_cells(overlap_entry.cellset_id) == sorted(a & b)
+
+
+def test_compare_sets_on_compacted_cellsets(cellset_cache) -> None:
+    a = h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 40)
+    b = h3.grid_disk(h3.latlng_to_cell(37.79, -122.41, 9), 40)
+    set_a_id = cellset_cache.put_cells(a)
+    set_b_id = cellset_cache.put_cells(b)
+    assert cellset_cache.get_view(set_a_id).compact is not None
+    payload = H3CompareSetsInput(
+        set_a=LabeledCellset(label="A", cellset=CellsetRef(cellset_id=set_a_id)),
+        set_b=LabeledCellset(label="B", cellset=CellsetRef(cellset_id=set_b_id)),
+        include_cells=False,
+    )
+    result = h3_compare_sets(payload)
+    overlap = sorted(set(a) & set(b))
+    assert result.overlap_count == len(overlap)
+    assert result.only_a_count == len(set(a) - set(b))
+    assert result.only_b_count == len(set(b) - set(a))
+    assert result.overlap_cellset_id == make_cellset_id(overlap)
+    assert cellset_cache.get_cells(result.overlap_cellset_id) == overlap
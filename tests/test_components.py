@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import random
+
 import h3
 import pytest
 
@@ -75,3 +77,47 @@ def test_mixed_resolution_raises(cellset_cache) -> None:
     payload = H3ConnectedComponentsInput(cellset=CellsetRef(cells=[cell_a, cell_b]))
     with pytest.raises(ValueError, match="same resolution"):
         h3_connected_components(payload)
+
+
+def test_components_match_breadth_first_search(cellset_cache) -> None:
+    rng = random.Random(3)
+    disk = list(h3.grid_disk(h3.latlng_to_cell(52.37, 4.89, 9), 10))
+    cells = rng.sample(disk, len(disk) // 2)
+    remaining = set(cells)
+    expected = []
+    while remaining:
+        seed = remaining.pop()
+        component, queue = {seed}, [seed]
+        while queue:
+            for neighbor in h3.grid_disk(queue.pop(), 1):
+                if neighbor in remaining:
+                    remaining.discard(neighbor)
+                    component.add(neighbor)
+                    queue.append(neighbor)
+        expected.append(component)
+    expected.sort(key=lambda component: (-len(component), min(component)))
+
+    result = h3_connected_components(H3ConnectedComponentsInput(cellset=CellsetRef(cells=cells)))
+    found = [
+        set(resolve_cellset(CellsetRef(cellset_id=comp.cellset_id)))
+        for comp in result.components
+    ]
+    assert found == expected
+    largest = result.components[0]
+    centers = [h3.cell_to_latlng(cell) for cell in expected[0]]
+    assert largest.center.lat == pytest.approx(sum(lat for lat, _ in centers) / len(centers))
+    assert largest.bounding_box == pytest.approx(
+        [
+            min(lng for _, lng in centers),
+            min(lat for lat, _ in centers),
+            max(lng for _, lng in centers),
+            max(lat for lat, _ in centers),
+        ]
+    )
+
+
+def test_components_accept_non_canonical_cell_ids(cellset_cache) -> None:
+    cells = ["0x" + cell for cell in h3.grid_disk(h3.latlng_to_cell(52.37, 4.89, 9), 1)]
+    result = h3_connected_components(H3ConnectedComponentsInput(cellset=CellsetRef(cells=cells)))
+    assert result.component_count == 1
+    assert result.total_cells == len(cells)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import anyio
+import h3
+import pytest
+
+from h3_mcp.dispatch import ToolDispatcher
+from h3_mcp.instrumentation import ToolMetrics, get_tool_metrics, instrument_tool, set_tool_metrics
+from h3_mcp.models.schemas import CellsetRef, H3CellStatsInput, H3KRingInput
+from h3_mcp.tools.neighbors import h3_k_ring
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+def _payload(cell_count: int) -> H3CellStatsInput:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 5))[:cell_count]
+    return H3CellStatsInput(cellset=CellsetRef(cells=cells))
+
+
+def h3_fake_tool(payload: H3CellStatsInput) -> int:
+    return threading.get_ident()
+
+
+@pytest.mark.anyio
+async def test_small_inputs_run_inline_and_large_ones_offload() -> None:
+    tool = ToolDispatcher(inline_cell_limit=10).offload(h3_fake_tool)
+    assert await tool(_payload(5)) == threading.get_ident()
+    assert await tool(_payload(50)) != threading.get_ident()
+    always = ToolDispatcher(inline_cell_limit=10).offload(h3_fake_tool, always=True)
+    assert await always(_payload(1)) != threading.get_ident()
+
+
+@pytest.mark.anyio
+async def test_unknown_cellset_ids_offload(cellset_cache) -> None:
+    tool = ToolDispatcher(inline_cell_limit=10).offload(h3_fake_tool)
+    payload = H3CellStatsInput(cellset=CellsetRef(cellset_id="cellset_missing"))
+    assert await tool(payload) != threading.get_ident()
+    cellset_id = cellset_cache.put_cells(_payload(5).cellset.cells or [])
+    assert await tool(H3CellStatsInput(cellset=CellsetRef(cellset_id=cellset_id))) == (
+        threading.get_ident()
+    )
+
+
+@pytest.mark.anyio
+async def test_per_tool_concurrency_limit() -> None:
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def h3_slow_tool(payload: H3CellStatsInput) -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    tool = ToolDispatcher(threads=4, tool_concurrency=2, inline_cell_limit=0).offload(
+        h3_slow_tool
+    )
+    async with anyio.create_task_group() as task_group:
+        for _ in range(6):
+            task_group.start_soon(tool, _payload(3))
+    assert peak == 2
+
+
+@pytest.mark.anyio
+async def test_offloaded_tools_keep_instrumentation(cellset_cache) -> None:
+    previous = get_tool_metrics()
+    metrics = ToolMetrics()
+    set_tool_metrics(metrics)
+    try:
+        tool = ToolDispatcher(inline_cell_limit=0).offload(instrument_tool(h3_k_ring))
+        cell = h3.latlng_to_cell(37.775, -122.418, 9)
+        await tool(H3KRingInput(cellset=CellsetRef(cells=[cell]), k=1))
+    finally:
+        set_tool_metrics(previous)
+    assert metrics.stats()["h3_k_ring"]["output_cells"] == 7
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import io
+
 import h3
+import numpy as np
+import pytest
 
 from h3_mcp.models.schemas import CellsetRef, H3DistanceMatrixInput, LabeledCellset
+from h3_mcp.resources.distance_matrices import distance_matrix
+from h3_mcp.tools import analysis
 from h3_mcp.tools.analysis import h3_distance_matrix
 
 
@@ -18,3 +24,141 @@ def test_h3_distance_matrix_basic() -> None:
     result = h3_distance_matrix(payload)
     assert result.pairs is not None
     assert result.pairs[0].distance_hops == expected
+
+
+def test_h3_distance_matrix_max_distance_marks_unreachable() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    origins = list(h3.grid_disk(center, 4))
+    payload = H3DistanceMatrixInput(
+        origins=LabeledCellset(label="origins", cellset=CellsetRef(cells=origins)),
+        destinations=LabeledCellset(label="destinations", cellset=CellsetRef(cells=[center])),
+        max_distance=2,
+        return_mode="items",
+    )
+    result = h3_distance_matrix(payload)
+    assert result.pair_count == len(h3.grid_disk(center, 2))
+    assert result.unreachable_count == len(origins) - result.pair_count
+    assert result.max_distance == 2
+    assert result.pairs is not None
+    assert all(pair.nearest_destination == center for pair in result.pairs)
+
+
+def test_h3_distance_matrix_rejects_mixed_resolutions() -> None:
+    origin = h3.latlng_to_cell(37.775, -122.418, 9)
+    payload = H3DistanceMatrixInput(
+        origins=LabeledCellset(label="origins", cellset=CellsetRef(cells=[origin])),
+        destinations=LabeledCellset(
+            label="destinations", cellset=CellsetRef(cells=[h3.cell_to_parent(origin, 8)])
+        ),
+    )
+    with pytest.raises(ValueError, match="same resolution"):
+        h3_distance_matrix(payload)
+
+
+def _matrix_payload(origins, destinations, **kwargs) -> H3DistanceMatrixInput:
+    return H3DistanceMatrixInput(
+        origins=LabeledCellset(label="origins", cellset=CellsetRef(cells=origins)),
+        destinations=LabeledCellset(label="destinations", cellset=CellsetRef(cells=destinations)),
+        **kwargs,
+    )
+
+
+def _load(matrix_id: str):
+    return np.load(io.BytesIO(distance_matrix(matrix_id)))
+
+
+def test_h3_distance_matrix_full_matrix_matches_grid_distance(cellset_cache) -> None:
+    disk = sorted(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 3))
+    origins, destinations = disk[::4], disk[1::5]
+    result = h3_distance_matrix(_matrix_payload(origins, destinations, matrix="full"))
+    assert result.matrix_id is not None
+    assert result.matrix_uri == f"h3://distance-matrices/{result.matrix_id}"
+    assert result.matrix_shape == [len(origins), len(destinations)]
+    assert cellset_cache.get_view(result.origins_cellset_id) is not None
+    archive = _load(result.matrix_id)
+    assert archive["distances"].dtype == np.int16
+    assert archive["distances"].tolist() == [
+        [h3.grid_distance(o, d) for d in destinations] for o in origins
+    ]
+    assert str(archive["destinations_cellset_id"]) == result.destinations_cellset_id
+    assert "columns" not in archive.files
+
+
+def test_h3_distance_matrix_full_matrix_masks_beyond_max_distance(cellset_cache) -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    origins = sorted(h3.grid_disk(center, 3))
+    result = h3_distance_matrix(
+        _matrix_payload(origins, [center], matrix="full", max_distance=2)
+    )
+    assert result.pair_count == len(h3.grid_disk(center, 2))
+    assert result.unreachable_count == len(origins) - result.pair_count
+    distances = _load(result.matrix_id)["distances"][:, 0]
+    assert sorted(set(distances.tolist())) == [-1, 0, 1, 2]
+
+
+def test_h3_distance_matrix_top_k_orders_by_distance_then_cell(cellset_cache) -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    destinations = sorted(h3.grid_disk(center, 2))
+    result = h3_distance_matrix(
+        _matrix_payload([center], destinations, matrix="top_k", top_k=3)
+    )
+    assert result.matrix_shape == [1, 3]
+    archive = _load(result.matrix_id)
+    assert archive["distances"].tolist() == [[0, 1, 1]]
+    ring = sorted(h3.grid_ring(center, 1))
+    nearest = [destinations[column] for column in archive["columns"][0].tolist()]
+    assert nearest == [center, ring[0], ring[1]]
+
+
+def test_h3_distance_matrix_caps_measured_pairs_for_top_k(cellset_cache, monkeypatch) -> None:
+    disk = sorted(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 3))
+    monkeypatch.setattr(analysis, "MAX_MATRIX_PAIRS", len(disk) * len(disk) - 1)
+    with pytest.raises(ValueError, match="measure"):
+        h3_distance_matrix(_matrix_payload(disk, disk, matrix="top_k", top_k=1))
+
+
+def test_h3_distance_matrix_caps_pairwise_fallback(cellset_cache, monkeypatch) -> None:
+    disk = sorted(h3.grid_disk(h3.get_pentagons(9)[0], 2))
+    monkeypatch.setattr(analysis, "MAX_PAIRWISE_MATRIX_PAIRS", len(disk) * len(disk) - 1)
+    with pytest.raises(ValueError, match="one by one"):
+        h3_distance_matrix(_matrix_payload(disk, disk, matrix="top_k", top_k=1))
+    monkeypatch.setattr(analysis, "MAX_PAIRWISE_MATRIX_PAIRS", len(disk) * len(disk))
+    assert h3_distance_matrix(_matrix_payload(disk, disk, matrix="top_k", top_k=1)).matrix_id
+
+
+def test_h3_distance_matrix_reuses_stored_matrix(cellset_cache) -> None:
+    disk = sorted(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 2))
+    payload = _matrix_payload(disk, disk[:3], matrix="top_k", top_k=2)
+    first = h3_distance_matrix(payload)
+    second = h3_distance_matrix(
+        H3DistanceMatrixInput(
+            origins=LabeledCellset(
+                label="origins", cellset=CellsetRef(cellset_id=first.origins_cellset_id)
+            ),
+            destinations=LabeledCellset(
+                label="destinations", cellset=CellsetRef(cellset_id=first.destinations_cellset_id)
+            ),
+            matrix="top_k",
+            top_k=2,
+        )
+    )
+    assert second.matrix_id == first.matrix_id
+    assert second.summary == first.summary
+
+
+def test_distance_matrix_resource_rejects_unknown_ids() -> None:
+    with pytest.raises(ValueError, match="Unknown or expired"):
+        distance_matrix("matrix_missing")
+
+
+def test_h3_distance_matrix_accepts_non_canonical_cell_ids() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    origins = ["0" + cell for cell in h3.grid_disk(center, 1)]
+    payload = H3DistanceMatrixInput(
+        origins=LabeledCellset(label="origins", cellset=CellsetRef(cells=origins)),
+        destinations=LabeledCellset(label="destinations", cellset=CellsetRef(cells=[center])),
+        return_mode="items",
+    )
+    result = h3_distance_matrix(payload)
+    assert result.pairs is not None
+    assert sorted(pair.distance_hops for pair in result.pairs) == [0] + [1] * 6
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
-from h3_mcp.geojson_utils import bounding_box_from_geojson, iter_features
+import pytest
+
+from h3_mcp.geojson_utils import (
+    bounding_box_from_geojson,
+    iter_feature_lines,
+    iter_features,
+    prepare_geometry,
+)
 
 
 def test_iter_features_single() -> None:
@@ -23,3 +30,33 @@ def test_bounding_box_from_geojson() -> None:
         ],
     }
     assert bounding_box_from_geojson(geojson) == [-1, 0, 2, 5]
+
+
+def test_iter_feature_lines_rejects_non_features() -> None:
+    lines = ['{"type": "Feature", "geometry": null}', "", '{"type": "Point"}']
+    features = iter_feature_lines(lines)
+    assert next(features)["type"] == "Feature"
+    with pytest.raises(ValueError, match="line 3"):
+        next(features)
+
+
+def test_prepare_geometry_multipolygon() -> None:
+    outer = [[0, 0], [4, 0], [4, 4], [0, 0]]
+    hole = [[1, 1], [2, 1], [2, 2], [1, 1]]
+    other = [[10, -3], [11, -3], [11, -2], [10, -3]]
+    prepared = prepare_geometry(
+        {"type": "MultiPolygon", "coordinates": [[outer, hole], [other]]}
+    )
+    assert prepared.coords.shape == (12, 2)
+    assert prepared.geometry_count == 2
+    assert prepared.bounds() == (0, -3, 11, 4)
+    polygons = prepared.polygons()
+    assert [len(rings) for rings in polygons] == [2, 1]
+    assert polygons[0][1].tolist() == hole
+
+
+def test_prepare_geometry_rejects_bad_coordinates() -> None:
+    with pytest.raises(ValueError, match="lng, lat"):
+        prepare_geometry({"type": "LineString", "coordinates": [[1, 2, 3], [4, 5, 6]]})
+    with pytest.raises(ValueError, match="Unsupported geometry type"):
+        prepare_geometry({"type": "GeometryCollection", "geometries": []})
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import h3
+import pytest
+
+from h3_mcp import geometry
+from h3_mcp.cache import CellsetView
+from h3_mcp.models.schemas import (
+    CellsetRef,
+    H3CellStatsInput,
+    H3CellsToGeojsonInput,
+    H3ConnectedComponentsInput,
+)
+from h3_mcp.tools.components import h3_connected_components
+from h3_mcp.tools.export import h3_cells_to_geojson
+from h3_mcp.tools.stats import h3_cell_stats
+
+
+@pytest.fixture
+def center_calls(monkeypatch) -> list[int]:
+    calls: list[int] = []
+    cell_centers = geometry.cell_centers
+
+    def counting(indexes):
+        calls.append(len(indexes))
+        return cell_centers(indexes)
+
+    monkeypatch.setattr(geometry, "cell_centers", counting)
+    return calls
+
+
+def test_stats_and_geojson_summary_share_one_geometry_pass(cellset_cache, center_calls) -> None:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(52.37, 4.89, 9), 2))
+    cellset_id = cellset_cache.put_cells(cells)
+    ref = CellsetRef(cellset_id=cellset_id)
+    stats = h3_cell_stats(H3CellStatsInput(cellset=ref))
+    again = h3_cell_stats(H3CellStatsInput(cellset=ref))
+    summary = h3_cells_to_geojson(H3CellsToGeojsonInput(cellset=ref, return_mode="summary"))
+    assert center_calls == [len(cells)]
+    assert again == stats
+    assert stats.is_contiguous
+    assert summary.center == stats.center
+    assert summary.bounding_box == stats.bounding_box
+
+
+def test_component_cellsets_come_with_geometry(cellset_cache, center_calls) -> None:
+    a = list(h3.grid_disk(h3.latlng_to_cell(52.37, 4.89, 9), 1))
+    b = list(h3.grid_disk(h3.latlng_to_cell(40.71, -74.01, 9), 2))
+    result = h3_connected_components(H3ConnectedComponentsInput(cellset=CellsetRef(cells=a + b)))
+    largest = result.components[0]
+    stats = h3_cell_stats(H3CellStatsInput(cellset=CellsetRef(cellset_id=largest.cellset_id)))
+    assert center_calls == []
+    assert stats.cell_count == len(b)
+    assert stats.is_contiguous
+    assert stats.center == largest.center
+    assert stats.bounding_box == largest.bounding_box
+
+
+def test_is_contiguous_detects_gaps() -> None:
+    center = h3.latlng_to_cell(52.37, 4.89, 9)
+    assert geometry.is_contiguous(CellsetView.from_cells(h3.grid_disk(center, 1)))
+    assert not geometry.is_contiguous(CellsetView.from_cells([center, *h3.grid_ring(center, 2)]))
+
+
+def test_areas_sum_every_cell(cellset_cache) -> None:
+    cells = sorted(h3.grid_disk(h3.latlng_to_cell(60.0, 10.0, 3), 8))
+    exact = sum(h3.cell_area(cell, unit="km^2") for cell in cells)
+    assert abs(h3.cell_area(cells[0], unit="km^2") * len(cells) - exact) > 0.01 * exact
+    ref = CellsetRef(cellset_id=cellset_cache.put_cells(cells))
+    stats = h3_cell_stats(H3CellStatsInput(cellset=ref))
+    assert stats.total_area_km2 == pytest.approx(exact)
+    assert stats.avg_area_km2 == pytest.approx(exact / len(cells))
+    summary = h3_cells_to_geojson(H3CellsToGeojsonInput(cellset=ref, return_mode="summary"))
+    assert summary.total_area_km2 == round(stats.total_area_km2, 2)
+    components = h3_connected_components(H3ConnectedComponentsInput(cellset=ref))
+    assert components.components[0].total_area_km2 == pytest.approx(exact, abs=0.01)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import random
+
+import h3
+import numpy as np
+
+from h3_mcp.cell_arrays import pack_cells
+from h3_mcp.grid_search import (
+    distance_blocks,
+    nearest_indexed,
+    nearest_pairwise,
+    nearest_within,
+)
+
+
+def _brute_force(origins: list[str], destinations: list[str], max_distance: int | None):
+    results = {}
+    for origin in origins:
+        candidates = [
+            (h3.grid_distance(origin, destination), destination)
+            for destination in destinations
+        ]
+        candidates = [item for item in candidates if max_distance is None or item[0] <= max_distance]
+        if candidates:
+            results[origin] = min(candidates)
+    return results
+
+
+def _as_dict(origins, result) -> dict[str, tuple[int, str]]:
+    distances, nearest = result
+    return {
+        h3.int_to_str(int(origin)): (int(hops), h3.int_to_str(int(destination)))
+        for origin, hops, destination in zip(origins, distances, nearest)
+        if hops >= 0
+    }
+
+
+def test_nearest_within_matches_brute_force() -> None:
+    rng = random.Random(7)
+    disk = list(h3.grid_disk(h3.latlng_to_cell(52.37, 4.89, 9), 12))
+    origins = rng.sample(disk, 60)
+    destinations = rng.sample(disk, 8)
+    origin_indexes = pack_cells(origins)
+    for max_distance in (0, 3, None):
+        result = nearest_within(origin_indexes, pack_cells(destinations), max_distance)
+        assert _as_dict(origin_indexes, result) == _brute_force(
+            origins, destinations, max_distance
+        )
+
+
+def test_nearest_within_breaks_ties_by_smallest_destination() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    ring = sorted(h3.grid_ring(center, 2))
+    result = nearest_within(pack_cells([center]), pack_cells(ring), None)
+    assert _as_dict(pack_cells([center]), result) == {center: (2, ring[0])}
+
+
+def test_nearest_within_handles_pentagons() -> None:
+    pentagon = h3.get_pentagons(6)[0]
+    disk = sorted(h3.grid_disk(pentagon, 3))
+    result = nearest_within(pack_cells(disk), pack_cells([pentagon]), 3)
+    distances, _ = result
+    assert (distances >= 0).all()
+    assert sorted(set(distances.tolist())) == [0, 1, 2, 3]
+
+
+def test_nearest_within_measures_sparse_far_sets_pairwise() -> None:
+    origin = h3.latlng_to_cell(37.775, -122.418, 11)
+    destination = h3.latlng_to_cell(37.9, -122.2, 11)
+    hops = h3.grid_distance(origin, destination)
+    assert hops > 100
+    for max_distance in (5000, hops - 1):
+        result = nearest_within(pack_cells([origin]), pack_cells([destination]), max_distance)
+        assert _as_dict(pack_cells([origin]), result) == _brute_force(
+            [origin], [destination], max_distance
+        )
+
+
+def test_nearest_within_stops_expanding_past_the_pairwise_cost() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    near = sorted(h3.grid_disk(center, 2))
+    far = h3.latlng_to_cell(37.9, -122.2, 9)
+    origins = [*near[::3], far]
+    destinations = near[1::4]
+    result = nearest_within(pack_cells(origins), pack_cells(destinations), 5000)
+    assert _as_dict(pack_cells(origins), result) == _brute_force(origins, destinations, 5000)
+
+
+def test_nearest_pairwise_matches_brute_force() -> None:
+    disk = list(h3.grid_disk(h3.latlng_to_cell(52.37, 4.89, 9), 4))
+    origins, destinations = disk[::3], disk[1::7]
+    result = nearest_pairwise(pack_cells(origins), pack_cells(destinations))
+    assert _as_dict(pack_cells(origins), result) == _brute_force(origins, destinations, None)
+    assert result[0].dtype == np.int64
+
+
+def test_nearest_indexed_matches_brute_force_on_sparse_sets() -> None:
+    rng = random.Random(11)
+    cells = [
+        h3.latlng_to_cell(rng.uniform(45.0, 55.0), rng.uniform(-5.0, 15.0), 6)
+        for _ in range(400)
+    ]
+    origins = sorted(set(cells[:120]))
+    destinations = sorted(set(cells[120:]))
+    origin_indexes = pack_cells(origins)
+    result = nearest_indexed(origin_indexes, pack_cells(destinations))
+    assert _as_dict(origin_indexes, result) == _brute_force(origins, destinations, None)
+
+
+def test_nearest_indexed_resolves_ties_beyond_the_bfs_prepass() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 8)
+    destinations = sorted(h3.grid_disk(center, 5))
+    origins = sorted(h3.grid_ring(center, 12))
+    origin_indexes = pack_cells(origins)
+    result = nearest_indexed(origin_indexes, pack_cells(destinations))
+    assert _as_dict(origin_indexes, result) == _brute_force(origins, destinations, None)
+
+
+def _matrix(origins, destinations, block_entries: int) -> np.ndarray:
+    blocks = distance_blocks(pack_cells(origins), pack_cells(destinations), block_entries)
+    return np.concatenate([block for _, block in blocks])
+
+
+def test_distance_blocks_match_grid_distance() -> None:
+    disk = sorted(h3.grid_disk(h3.latlng_to_cell(52.37, 4.89, 9), 6))
+    origins, destinations = disk[::5], disk[2::3]
+    expected = [[h3.grid_distance(o, d) for d in destinations] for o in origins]
+    assert _matrix(origins, destinations, 50).tolist() == expected
+
+
+def test_distance_blocks_fall_back_across_faces() -> None:
+    origins = [h3.latlng_to_cell(52.37, 4.89, 2)]
+    near, far = h3.latlng_to_cell(52.5, 5.0, 2), h3.latlng_to_cell(-33.87, 151.21, 2)
+    assert near < far
+    matrix = _matrix(origins, [near, far], 1)
+    assert matrix.tolist() == [[h3.grid_distance(origins[0], near), -1]]
+
+
+def test_distance_blocks_match_grid_distance_around_pentagons() -> None:
+    cells = sorted(h3.grid_disk(h3.get_pentagons(3)[2], 4))
+    origins, destinations = cells[::3], cells[1::4]
+    expected = [[_hops(o, d) for d in destinations] for o in origins]
+    assert any(-1 not in row for row in expected)
+    assert _matrix(origins, destinations, 64).tolist() == expected
+
+
+def _hops(origin: str, destination: str) -> int:
+    try:
+        return h3.grid_distance(origin, destination)
+    except h3.H3FailedError:
+        return -1
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import h3
+import pytest
 
+from h3_mcp.cache import make_cellset_id
 from h3_mcp.models.schemas import CellsetRef, H3ChangeResolutionInput
+from h3_mcp.output_controls import apply_cell_controls
 from h3_mcp.tools.hierarchy import h3_change_resolution
 
 
@@ -19,3 +22,92 @@ def test_h3_change_resolution_coarser() -> None:
     assert result.output_cell_count == 1
     assert result.cells is not None
     assert result.cells == [parent]
+
+
+def test_h3_change_resolution_coarser_keeps_one_resolution(cellset_cache) -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    cells = list(h3.grid_disk(center, 12))
+    parents = sorted({h3.cell_to_parent(cell, 7) for cell in cells})
+    result = h3_change_resolution(
+        H3ChangeResolutionInput(
+            cellset=CellsetRef(cells=cells), target_resolution=7, return_mode="cells"
+        )
+    )
+    assert result.cells == parents
+    assert result.output_cell_count == len(parents)
+    assert result.cellset_id is not None
+    assert cellset_cache.get_cells(result.cellset_id) == parents
+
+
+def test_h3_change_resolution_finer_is_stored_compacted(cellset_cache) -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 6)
+    cells = list(h3.grid_disk(center, 1))
+    children = sorted(child for cell in cells for child in h3.cell_to_children(cell, 10))
+    result = h3_change_resolution(
+        H3ChangeResolutionInput(cellset=CellsetRef(cells=cells), target_resolution=10)
+    )
+    assert result.direction == "finer"
+    assert result.output_cell_count == len(children)
+    assert result.cellset_id is not None
+    view = cellset_cache.get_view(result.cellset_id)
+    assert view is not None
+    assert view.compact is not None and len(view.compact) == len(cells)
+    assert list(view) == children
+
+    back = h3_change_resolution(
+        H3ChangeResolutionInput(
+            cellset=CellsetRef(cellset_id=result.cellset_id), target_resolution=8
+        )
+    )
+    assert back.output_cell_count == 7 * 7 * len(cells)
+
+
+def test_h3_change_resolution_finer_samples_without_expanding(cellset_cache) -> None:
+    cells = [h3.latlng_to_cell(37.775, -122.418, 5)]
+    children = sorted(h3.cell_to_children(cells[0], 9))
+    for sample in ("first", "random"):
+        result = h3_change_resolution(
+            H3ChangeResolutionInput(
+                cellset=CellsetRef(cells=cells),
+                target_resolution=9,
+                return_mode="cells",
+                max_cells=25,
+                sample_cells=sample,
+            )
+        )
+        expected = apply_cell_controls(children, "cells", 25, sample)
+        assert result.cells == expected
+    assert result.cellset_id == make_cellset_id(children)
+
+
+def test_h3_change_resolution_rejects_oversized_output(cellset_cache) -> None:
+    payload = H3ChangeResolutionInput(
+        cellset=CellsetRef(cells=[h3.latlng_to_cell(37.775, -122.418, 0)]),
+        target_resolution=15,
+    )
+    with pytest.raises(ValueError, match="limit"):
+        h3_change_resolution(payload)
+    assert len(cellset_cache) == 0
+
+
+def test_h3_change_resolution_caps_inline_cells(cellset_cache) -> None:
+    payload = H3ChangeResolutionInput(
+        cellset=CellsetRef(cells=[h3.latlng_to_cell(37.775, -122.418, 6)]),
+        target_resolution=13,
+        return_mode="cells",
+    )
+    with pytest.raises(ValueError, match="max_cells"):
+        h3_change_resolution(payload)
+    assert len(cellset_cache) == 0
+    capped = h3_change_resolution(payload.model_copy(update={"max_cells": 10}))
+    assert capped.cells is not None and len(capped.cells) == 10
+
+
+def test_h3_change_resolution_accepts_non_canonical_cell_ids() -> None:
+    cell = h3.latlng_to_cell(37.775, -122.418, 9)
+    result = h3_change_resolution(
+        H3ChangeResolutionInput(
+            cellset=CellsetRef(cells=["0" + cell]), target_resolution=8, return_mode="cells"
+        )
+    )
+    assert result.cells == [h3.cell_to_parent(cell, 8)]
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import math
+import random
+
 import h3
+import pytest
 
 from h3_mcp.models.schemas import H3FindHotspotsInput
 from h3_mcp.tools.analysis import h3_find_hotspots
@@ -20,3 +24,59 @@ def test_h3_find_hotspots_detects_center() -> None:
     result = h3_find_hotspots(payload)
     assert result.hotspots is not None
     assert any(h.cell_id == center for h in result.hotspots)
+
+
+def _reference_z_scores(values_by_cell: dict[str, float], k: int) -> dict[str, float]:
+    scores = {}
+    for cell_id, value in values_by_cell.items():
+        neighbor_values = [
+            values_by_cell[n] for n in h3.grid_disk(cell_id, k) if n in values_by_cell
+        ]
+        mean = sum(neighbor_values) / len(neighbor_values)
+        variance = sum((v - mean) ** 2 for v in neighbor_values) / len(neighbor_values)
+        std = math.sqrt(variance)
+        scores[cell_id] = (value - mean) / std if std > 0 else 0.0
+    return scores
+
+
+def test_h3_find_hotspots_matches_per_cell_statistics() -> None:
+    rng = random.Random(5)
+    disk = list(h3.grid_disk(h3.latlng_to_cell(52.37, 4.89, 9), 8))
+    values_by_cell = {cell: rng.uniform(0.0, 10.0) for cell in rng.sample(disk, 150)}
+    expected = _reference_z_scores(values_by_cell, 2)
+    payload = H3FindHotspotsInput(
+        values_by_cell=values_by_cell, k=2, threshold=0.5, return_mode="items", max_items=1000
+    )
+    result = h3_find_hotspots(payload)
+    assert result.hotspots is not None and result.coldspots is not None
+    expected_hotspots = [cell for cell, z in expected.items() if z >= 0.5]
+    assert [h.cell_id for h in result.hotspots] == expected_hotspots
+    assert [c.cell_id for c in result.coldspots] == [
+        cell for cell, z in expected.items() if z <= -0.5
+    ]
+    for hotspot in result.hotspots:
+        assert hotspot.z_score == pytest.approx(expected[hotspot.cell_id])
+
+
+def test_h3_find_hotspots_ignores_flat_neighbourhoods() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    payload = H3FindHotspotsInput(
+        values_by_cell={cell: 0.1 for cell in h3.grid_disk(center, 3)},
+        k=1,
+        threshold=0.5,
+    )
+    result = h3_find_hotspots(payload)
+    assert result.hotspot_count == 0
+    assert result.coldspot_count == 0
+
+
+def test_h3_find_hotspots_accepts_non_canonical_cell_ids() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    values_by_cell = {"0" + cell: 1.0 for cell in h3.grid_disk(center, 1)}
+    values_by_cell["0" + center] = 10.0
+    payload = H3FindHotspotsInput(
+        values_by_cell=values_by_cell, k=1, threshold=1.0, return_mode="items"
+    )
+    result = h3_find_hotspots(payload)
+    assert result.hotspots is not None
+    assert [hotspot.cell_id for hotspot in result.hotspots] == ["0" + center]
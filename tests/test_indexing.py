@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+import json
+import multiprocessing
+
 import h3
+import pytest
+from pydantic import ValidationError
 
-from h3_mcp.models.schemas import H3GeoToCellsInput
+from h3_mcp.models.schemas import H3GeoToCellsInput, H3UploadFeaturesInput
+from h3_mcp.runtime import get_upload_store, set_data_dir, set_index_executor
 from h3_mcp.tools.indexing import h3_geo_to_cells
+from h3_mcp.tools.uploads import h3_upload_features
+from h3_mcp.uploads import UploadStore
 
 
 def test_h3_geo_to_cells_point() -> None:
@@ -38,3 +47,143 @@ def test_h3_geo_to_cells_cache_toggle() -> None:
     )
     result = h3_geo_to_cells(payload)
     assert result.cellset_id is None
+
+
+def test_h3_geo_to_cells_process_pool_matches_serial() -> None:
+    features = []
+    for i in range(9):
+        lng, lat = -122.42 + i * 0.01, 37.77
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {"id": i},
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [
+                        [[lng, lat], [lng + 0.015, lat], [lng + 0.015, lat + 0.01], [lng, lat]]
+                    ],
+                },
+            }
+        )
+    payload = H3GeoToCellsInput(
+        geojson={"type": "FeatureCollection", "features": features},
+        resolution=9,
+        return_mode="cells",
+    )
+    serial = h3_geo_to_cells(payload)
+    context = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        set_index_executor(executor, chunk_size=2)
+        try:
+            parallel = h3_geo_to_cells(payload)
+        finally:
+            set_index_executor(None)
+    assert parallel.model_dump_json() == serial.model_dump_json()
+
+
+def _point_feature_lines(count: int) -> list[str]:
+    return [
+        json.dumps(
+            {
+                "type": "Feature",
+                "properties": {"id": i},
+                "geometry": {"type": "Point", "coordinates": [-122.42 + i * 0.01, 37.77]},
+            }
+        )
+        for i in range(count)
+    ]
+
+
+def test_h3_geo_to_cells_streams_geojson_seq_file(tmp_path) -> None:
+    lines = _point_feature_lines(3)
+    (tmp_path / "points.geojsonl").write_text("\n".join("\x1e" + line for line in lines))
+    set_data_dir(tmp_path)
+    try:
+        result = h3_geo_to_cells(
+            H3GeoToCellsInput(geojson_seq_path="points.geojsonl", resolution=9)
+        )
+        with pytest.raises(ValueError, match="inside H3_MCP_DATA_DIR"):
+            h3_geo_to_cells(H3GeoToCellsInput(geojson_seq_path="../x.geojsonl", resolution=9))
+    finally:
+        set_data_dir(None)
+    inline = h3_geo_to_cells(
+        H3GeoToCellsInput(
+            geojson={"type": "FeatureCollection", "features": [json.loads(x) for x in lines]},
+            resolution=9,
+        )
+    )
+    assert result.model_dump() == inline.model_dump()
+    assert result.bounding_box == [-122.42, 37.77, -122.4, 37.77]
+
+
+def test_h3_geo_to_cells_from_chunked_upload() -> None:
+    lines = _point_feature_lines(4)
+    first = h3_upload_features(H3UploadFeaturesInput(features="\n".join(lines[:2])))
+    second = h3_upload_features(
+        H3UploadFeaturesInput(features="\n".join(lines[2:]), upload_id=first.upload_id)
+    )
+    assert second.upload_id == first.upload_id
+    assert second.chunk_feature_count == 2
+    result = h3_geo_to_cells(H3GeoToCellsInput(upload_id=first.upload_id, resolution=9))
+    assert result.cell_count == 4
+    assert "4 features indexed" in result.summary
+
+
+def test_h3_geo_to_cells_requires_single_source() -> None:
+    with pytest.raises(ValidationError, match="exactly one"):
+        H3GeoToCellsInput(resolution=9)
+
+
+def test_h3_geo_to_cells_source_provenance() -> None:
+    lat, lng = 37.775, -122.418
+    shared_cell = h3.latlng_to_cell(lat, lng, 9)
+    geojson = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"id": "a"},
+                "geometry": {"type": "MultiPoint", "coordinates": [[lng, lat], [lng, 37.9]]},
+            },
+            {
+                "type": "Feature",
+                "properties": {"id": "b"},
+                "geometry": {"type": "Point", "coordinates": [lng, lat]},
+            },
+        ],
+    }
+    result = h3_geo_to_cells(H3GeoToCellsInput(geojson=geojson, resolution=9, return_mode="cells"))
+    assert result.cells is not None
+    by_cell = {cell.cell_id: cell for cell in result.cells}
+    assert by_cell[shared_cell].source_feature_index == 0
+    assert by_cell[shared_cell].source_properties == [{"id": "a"}, {"id": "b"}]
+    other = next(cell for cell_id, cell in by_cell.items() if cell_id != shared_cell)
+    assert other.source_properties == {"id": "a"}
+
+    sampled = h3_geo_to_cells(
+        H3GeoToCellsInput(
+            geojson=geojson, resolution=9, return_mode="cells", max_cells=1, sample_cells="first"
+        )
+    )
+    assert sampled.cells == [result.cells[0]]
+
+
+def test_upload_store_caps_bytes_and_expires(tmp_path) -> None:
+    now = [1000.0]
+    store = UploadStore(tmp_path, max_bytes=100, ttl_seconds=10, time_fn=lambda: now[0])
+    upload_id, size = store.append(None, "x" * 59)
+    assert size == 60
+    with pytest.raises(ValueError, match="limit 100"):
+        store.append(None, "y" * 50)
+    now[0] = 1011.0
+    with pytest.raises(ValueError, match="expired"):
+        store.path(upload_id)
+    assert not list(tmp_path.iterdir())
+    store.append(None, "y" * 50)
+
+
+def test_indexed_upload_is_deleted() -> None:
+    upload = h3_upload_features(H3UploadFeaturesInput(features="\n".join(_point_feature_lines(2))))
+    h3_geo_to_cells(H3GeoToCellsInput(upload_id=upload.upload_id, resolution=9))
+    with pytest.raises(ValueError, match="Unknown"):
+        get_upload_store().path(upload.upload_id)
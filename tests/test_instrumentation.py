@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import inspect
+from pathlib import Path
+
+import h3
+import pytest
+
+from h3_mcp.instrumentation import (
+    ToolMetrics,
+    get_tool_metrics,
+    instrument_tool,
+    set_profiling,
+    set_response_bytes,
+    set_tool_metrics,
+)
+from h3_mcp.models.schemas import CellsetRef, H3KRingInput
+from h3_mcp.tools.neighbors import h3_k_ring
+
+
+@pytest.fixture
+def tool_metrics():
+    previous = get_tool_metrics()
+    metrics = ToolMetrics()
+    set_tool_metrics(metrics)
+    try:
+        yield metrics
+    finally:
+        set_tool_metrics(previous)
+        set_profiling(None)
+        set_response_bytes(False)
+
+
+def test_instrumented_tool_records_cells_and_bytes(tool_metrics, cellset_cache) -> None:
+    set_response_bytes(True)
+    tool = instrument_tool(h3_k_ring)
+    cell = h3.latlng_to_cell(37.775, -122.418, 9)
+    result = tool(H3KRingInput(cellset=CellsetRef(cells=[cell]), k=1, return_mode="cells"))
+    with pytest.raises(ValueError):
+        tool(H3KRingInput(cellset=CellsetRef(cellset_id="cellset_missing"), k=1))
+
+    stats = tool_metrics.stats()["h3_k_ring"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == 1
+    assert stats["input_cells"] == 1
+    assert stats["output_cells"] == result.ring_cell_count == 7
+    assert stats["response_bytes"] == len(result.model_dump_json())
+    assert sum(stats["latency_buckets"].values()) == 2
+    text = tool_metrics.prometheus()
+    assert 'h3_mcp_tool_latency_seconds_bucket{tool="h3_k_ring",le="+Inf"} 2' in text
+    assert 'h3_mcp_tool_output_cells_total{tool="h3_k_ring"} 7' in text
+
+
+def test_response_bytes_are_opt_in(tool_metrics, cellset_cache) -> None:
+    tool = instrument_tool(h3_k_ring)
+    cell = h3.latlng_to_cell(37.775, -122.418, 9)
+    tool(H3KRingInput(cellset=CellsetRef(cells=[cell]), k=1, return_mode="cells"))
+    assert tool_metrics.stats()["h3_k_ring"]["response_bytes"] == 0
+
+
+def test_instrumented_tool_keeps_signature() -> None:
+    tool = instrument_tool(h3_k_ring)
+    assert tool.__name__ == "h3_k_ring"
+    signature = inspect.signature(tool, eval_str=True)
+    assert signature.parameters["payload"].annotation is H3KRingInput
+
+
+def test_slow_calls_dump_profiles(tool_metrics, cellset_cache, tmp_path: Path) -> None:
+    set_profiling(tmp_path, threshold_seconds=0)
+    tool = instrument_tool(h3_k_ring)
+    cell = h3.latlng_to_cell(37.775, -122.418, 9)
+    tool(H3KRingInput(cellset=CellsetRef(cells=[cell]), k=1))
+    assert len(list(tmp_path.glob("h3_k_ring-*.prof"))) == 1
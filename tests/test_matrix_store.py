@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import numpy as np
+
+from h3_mcp.matrix_store import DistanceMatrix, MatrixStore, make_matrix_id
+
+
+def _matrix(rows: int) -> DistanceMatrix:
+    return DistanceMatrix("cs_a", "cs_b", np.zeros((rows, 10), dtype=np.int16))
+
+
+def test_matrix_store_evicts_least_recently_used_over_budget() -> None:
+    store = MatrixStore(max_bytes=2 * _matrix(10).nbytes)
+    store.put("a", _matrix(10))
+    store.put("b", _matrix(10))
+    assert store.get("a") is not None
+    store.put("c", _matrix(10))
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    store.put("huge", _matrix(100))
+    assert store.get("huge") is not None
+    assert store.get("a") is None
+
+
+def test_matrix_store_expires_entries() -> None:
+    now = [0.0]
+    store = MatrixStore(ttl_seconds=10, time_fn=lambda: now[0])
+    store.put("a", _matrix(1))
+    now[0] = 11.0
+    assert store.get("a") is None
+
+
+def test_make_matrix_id_depends_on_every_part() -> None:
+    assert make_matrix_id("a", "b", None) != make_matrix_id("a", "b", 3)
+    assert make_matrix_id("a", "b", None).startswith("matrix_")
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import h3
+import numpy as np
+
+from h3_mcp.cell_arrays import pack_cells
+from h3_mcp.neighborhoods import DiskAdjacency, component_labels
+
+
+def test_disk_adjacency_lists_disk_members_inside_the_set() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    cells = sorted(h3.grid_disk(center, 3))[::2]
+    adjacency = DiskAdjacency.build(pack_cells(cells), 2)
+    for row, cell in enumerate(cells):
+        members = adjacency.indices[adjacency.indptr[row] : adjacency.indptr[row + 1]]
+        expected = sorted(cells.index(n) for n in h3.grid_disk(cell, 2) if n in cells)
+        assert members.tolist() == expected
+
+
+def test_disk_adjacency_moments() -> None:
+    center = h3.latlng_to_cell(37.775, -122.418, 9)
+    cells = sorted(h3.grid_disk(center, 1))
+    adjacency = DiskAdjacency.build(pack_cells(cells), 1)
+    values = np.arange(len(cells), dtype=np.float64)
+    means, variances = adjacency.moments(values)
+    row = cells.index(center)
+    assert means[row] == values.mean()
+    assert variances[row] == values.var()
+    assert adjacency.counts[row] == 7
+
+
+def test_disk_adjacency_handles_empty_input() -> None:
+    adjacency = DiskAdjacency.build(np.empty(0, dtype=np.uint64), 1)
+    means, variances = adjacency.moments(np.empty(0, dtype=np.float64))
+    assert adjacency.indptr.tolist() == [0]
+    assert len(means) == len(variances) == 0
+
+
+def test_disk_adjacency_matches_grid_disk_around_pentagons() -> None:
+    pentagon = h3.get_pentagons(3)[2]
+    cells = sorted(h3.grid_disk(pentagon, 5))
+    adjacency = DiskAdjacency.build(pack_cells(cells), 2)
+    for row, cell in enumerate(cells):
+        members = adjacency.indices[adjacency.indptr[row] : adjacency.indptr[row + 1]]
+        expected = sorted(cells.index(n) for n in h3.grid_disk(cell, 2) if n in cells)
+        assert members.tolist() == expected
+
+
+def test_component_labels_use_smallest_position() -> None:
+    a = h3.latlng_to_cell(37.775, -122.418, 9)
+    b = h3.latlng_to_cell(40.71, -74.01, 9)
+    cells = sorted([*h3.grid_ring(a, 1), b, *h3.grid_disk(h3.grid_ring(b, 3)[0], 1)])
+    labels = component_labels(DiskAdjacency.build(pack_cells(cells), 1))
+    ring = sorted(h3.grid_ring(a, 1))
+    assert {labels[cells.index(cell)] for cell in ring} == {cells.index(ring[0])}
+    assert labels[cells.index(b)] == cells.index(b)
+    assert len(set(labels.tolist())) == 3
@@ -12,3 +12,29 @@ def test_server_module_can_load_from_file_path() -> None:
     module = module_from_spec(spec)
     spec.loader.exec_module(module)
     assert getattr(module, "mcp", None) is not None
+
+
+def test_sweep_cache_prunes_on_a_worker_thread() -> None:
+    import threading
+
+    import anyio
+
+    server_path = Path(__file__).resolve().parents[1] / "src" / "h3_mcp" / "server.py"
+    spec = spec_from_file_location("h3_server_sweep", server_path)
+    assert spec is not None and spec.loader is not None
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    pruned_on: list[int] = []
+
+    async def main() -> None:
+        loop_thread = threading.get_ident()
+        with anyio.move_on_after(5):
+            module._prune = lambda: pruned_on.append(threading.get_ident())
+            async with anyio.create_task_group() as task_group:
+                task_group.start_soon(module.sweep_cache, 0.01)
+                while not pruned_on:
+                    await anyio.sleep(0.01)
+                task_group.cancel_scope.cancel()
+        assert pruned_on and pruned_on[0] != loop_thread
+
+    anyio.run(main)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import numpy as np
+
+from h3_mcp.set_overlap import pair_overlaps
+
+
+def test_pair_overlaps_counts_and_cells() -> None:
+    sets = [
+        np.array([1, 2, 3, 4], dtype=np.uint64),
+        np.array([2, 3, 9], dtype=np.uint64),
+        np.array([3, 4, 9], dtype=np.uint64),
+        np.array([7], dtype=np.uint64),
+    ]
+    overlaps = pair_overlaps(sets)
+    expected = [[len(a & b) for b in map(set, sets)] for a in map(set, sets)]
+    for i, values in enumerate(sets):
+        expected[i][i] = len(values)
+    assert overlaps.count_matrix().tolist() == expected
+    assert list(zip(overlaps.first.tolist(), overlaps.second.tolist())) == [
+        (0, 1),
+        (0, 2),
+        (1, 2),
+    ]
+    assert overlaps.overlap_cells(2, 0).tolist() == [3, 4]
+    assert overlaps.overlap_cells(1, 2).tolist() == [3, 9]
+    assert overlaps.overlap_cells(0, 3).tolist() == []
+
+
+def test_pair_overlaps_without_shared_cells() -> None:
+    overlaps = pair_overlaps([np.array(["a"]), np.array(["b"])])
+    assert len(overlaps.counts) == 0
+    assert overlaps.count_matrix().tolist() == [[1, 0], [0, 1]]
+
+
+def test_pair_overlaps_many_heavily_overlapping_sets() -> None:
+    base = np.arange(0, 60_000, 3, dtype=np.uint64)
+    sets = [base] * 30 + [np.arange(0, 60_000, 5, dtype=np.uint64)] * 10
+    overlaps = pair_overlaps(sets)
+    matrix = overlaps.count_matrix()
+    assert len(overlaps.counts) == 40 * 39 // 2
+    assert matrix[0, 29] == len(base)
+    assert matrix[0, 35] == len(np.arange(0, 60_000, 15))
+    assert matrix[30, 39] == 12_000
+    assert np.array_equal(overlaps.overlap_cells(3, 31), np.arange(0, 60_000, 15))
@@ -19,3 +19,10 @@ def test_h3_cell_stats_basic() -> None:
     assert result.bounding_box == pytest.approx(
         [min(lng_a, lng_b), min(lat_a, lat_b), max(lng_a, lng_b), max(lat_a, lat_b)]
     )
+
+
+def test_h3_cell_stats_accepts_uppercase_cells() -> None:
+    cells = list(h3.grid_disk(h3.latlng_to_cell(37.775, -122.418, 9), 1))
+    result = h3_cell_stats(H3CellStatsInput(cellset=CellsetRef(cells=[c.upper() for c in cells])))
+    assert result.cell_count == len(cells)
+    assert result.resolution == 9